@@ -1,9 +1,16 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, g
 from flask_cors import CORS
 from config import Config
 from chatbot.rag_pipeline import RAGPipeline
+from chatbot.indexing_jobs import IndexingJobManager
+from chatbot.cache_warmup import CacheWarmer
+from data_fetcher.registry import DATASETS
+from utils.admission import ConcurrencyLimiter, DeadlineExceeded, Overloaded, deadline
+from utils.metrics import metrics, span, trace
+from utils.query_log import QueryLog
+import atexit
 import os
-import threading
+import time
 import logging
 
 # Configure structured logging for Cloud Run
@@ -18,22 +25,61 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": ["https://gov-chatbot-bfe73.web.app"]}})
 
-# Initialize RAG pipeline
+# Initialize RAG pipeline. Under gunicorn with preload_app this runs once in
+# the master and the loaded model/index pages are shared copy-on-write.
 print("Initializing Samarth backend...")
+_startup_begin = time.perf_counter()
 rag_pipeline = RAGPipeline()
+startup_seconds = time.perf_counter() - _startup_begin
 
-# --- Async data indexing function ---
-def start_indexing_async():
-    try:
-        rag_pipeline.index_data()
-    except Exception as e:
-        print(f"Error during background indexing: {e}")
+# Single-writer manager for background indexing runs
+indexing_jobs = IndexingJobManager(rag_pipeline)
+
+# Hot answers persisted across restarts; restored here so preloaded workers inherit them
+cache_warmer = CacheWarmer(rag_pipeline)
+cache_warmer.restore()
+
+# Bounds the uncached queries a worker runs at once so a slow LLM provider
+# sheds load instead of tying up every thread (and the health checks)
+query_limiter = ConcurrencyLimiter(Config.MAX_CONCURRENT_QUERIES, Config.QUERY_QUEUE_SIZE,
+                                   Config.QUERY_QUEUE_TIMEOUT_SECONDS)
+
+# Sampled queries with their timings, replayable with benchmarks/replay.py
+query_log = QueryLog()
 
-# --- Startup indexing if needed, in background ---
-if not rag_pipeline.is_indexed:
-    print("Vector store not found. Indexing data in background...")
-    thread = threading.Thread(target=start_indexing_async, daemon=True)
-    thread.start()
+def start_background_tasks():
+    """Start per-process background work; threads do not survive a fork"""
+    # --- Startup indexing if needed, in background ---
+    if not rag_pipeline.is_indexed:
+        print("Vector store not found. Indexing data in background...")
+        indexing_jobs.start()
+    # --- Cache warm-up and periodic snapshots ---
+    cache_warmer.start()
+    atexit.register(cache_warmer.stop)
+
+# When preloading, gunicorn's post_fork hook starts these in each worker
+if not Config.PRELOAD_APP:
+    start_background_tasks()
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    g.request_arrived_at = time.time()
+
+@app.after_request
+def record_request_metrics(response):
+    start = getattr(g, 'request_start', None)
+    if start is not None:
+        elapsed = time.perf_counter() - start
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.observe('samarth_http_request_seconds', elapsed,
+                        endpoint=endpoint, method=request.method)
+        metrics.inc('samarth_http_requests_total', endpoint=endpoint,
+                    method=request.method, status=response.status_code)
+        if getattr(g, 'logged_query', None) is not None:
+            query_log.write(g.request_arrived_at, g.logged_query, response.status_code,
+                            elapsed, g.get('query_trace'))
+    return response
 
 @app.route('/')
 def home():
@@ -46,6 +92,33 @@ def home():
         'vector_store_stats': rag_pipeline.vector_store.get_stats()
     })
 
+@app.route('/healthz')
+def liveness():
+    """Liveness probe: the process is up and serving requests"""
+    return jsonify({'status': 'alive'})
+
+@app.route('/readyz')
+def readiness():
+    """Readiness probe: models are loaded and the index can answer queries"""
+    ready = rag_pipeline.is_indexed
+    return jsonify({
+        'ready': ready,
+        'indexed': rag_pipeline.is_indexed,
+        'startup_seconds': round(startup_seconds, 3),
+        'startup_phases': {
+            phase: round(seconds, 3)
+            for phase, seconds in rag_pipeline.startup_timings.items()
+        },
+        'index_bundle': rag_pipeline.bundle.version if rag_pipeline.bundle else None,
+        'warmup': cache_warmer.get_status()
+    }), 200 if ready else 503
+
+def busy_response(reason: str, retry_after: int, status: int):
+    """Fast rejection telling the client when to come back"""
+    response = jsonify({'error': 'The service is busy, please retry shortly', 'reason': reason})
+    response.headers['Retry-After'] = str(retry_after)
+    return response, status
+
 @app.route('/api/query', methods=['POST'])
 def query():
     """
@@ -56,8 +129,28 @@ def query():
         if not data or 'query' not in data:
             return jsonify({'error': 'No query provided'}), 400
         user_query = data['query']
-        result = rag_pipeline.answer_query(user_query)
-        return jsonify(result)
+        cache_warmer.frequency.record(user_query)
+        logged = query_log.sample()
+        if logged:
+            g.logged_query = user_query
+        with trace('query_request', force_sample=logged) as request_trace:
+            g.query_trace = request_trace
+            try:
+                # Cached answers skip admission control, so they are served while shedding
+                result = rag_pipeline.cached_answer(user_query)
+                if result is None:
+                    with query_limiter.slot(), deadline(Config.QUERY_DEADLINE_SECONDS):
+                        result = rag_pipeline.answer_query(user_query, check_cache=False)
+            except Overloaded as e:
+                request_trace.annotate(shed=e.reason)
+                return busy_response(e.reason, e.retry_after, 429 if e.reason == 'queue_full' else 503)
+            except DeadlineExceeded as e:
+                request_trace.annotate(shed='deadline', stage=e.stage)
+                metrics.inc('samarth_shed_requests_total', reason='deadline', limiter=query_limiter.name)
+                print(f"Query deadline exceeded before {e.stage}")
+                return busy_response('deadline', query_limiter.retry_after(), 503)
+            with span('serialize'):
+                return jsonify(result)
     except Exception as e:
         print(f"Error processing query: {e}")
         return jsonify({'error': str(e)}), 500
@@ -67,25 +160,60 @@ def index_data():
     """
     Endpoint to trigger data indexing asynchronously
     """
-    if rag_pipeline.is_indexed:
+    data = request.get_json(silent=True) or {}
+    force = bool(data.get('force', False))
+    source = data.get('source', 'api')
+    if source not in ('api', 'lake'):
+        return jsonify({'error': f"Unknown source: {source}; use 'api' or 'lake'"}), 400
+    datasets = data.get('datasets')
+    unknown = [name for name in datasets or [] if name not in DATASETS]
+    if unknown:
+        return jsonify({'error': f"Unknown datasets: {', '.join(unknown)}",
+                        'available': DATASETS.names()}), 400
+    
+    # Indexing specific datasets only rebuilds their shards
+    if rag_pipeline.is_indexed and not force and not datasets:
         return jsonify({
             'status': 'done',
             'message': 'Already indexed',
             'stats': rag_pipeline.vector_store.get_stats()
         })
-    else:
-        # Start background thread to index data
-        thread = threading.Thread(target=start_indexing_async, daemon=True)
-        thread.start()
+    
+    job, created = indexing_jobs.start(force=force, source=source, datasets=datasets)
+    if not created:
         return jsonify({
-            'status': 'indexing',
-            'message': 'Indexing started, check /api/stats for progress'
-        }), 202
+            'status': 'busy',
+            'message': 'An indexing job is already running',
+            'job': job.to_dict()
+        }), 409
+    
+    return jsonify({
+        'status': 'indexing',
+        'message': f'Indexing started, check /api/index/{job.id} for progress',
+        'job': job.to_dict()
+    }), 202
+
+@app.route('/api/index/<job_id>', methods=['GET'])
+def index_status(job_id):
+    """Progress of an indexing job"""
+    job = indexing_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown indexing job: {job_id}'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/index/<job_id>', methods=['DELETE'])
+def cancel_index(job_id):
+    """Cancel a running indexing job; the live index is left untouched"""
+    job = indexing_jobs.cancel(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown indexing job: {job_id}'}), 404
+    return jsonify(job.to_dict()), 202
 
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
     vector_stats = {}
     cache_stats = {}
+    current_job = indexing_jobs.current()
     try:
         if hasattr(rag_pipeline, "vector_store"):
             vector_stats = rag_pipeline.vector_store.get_stats()
@@ -96,11 +224,30 @@ def get_stats():
 
     return jsonify({
         'vector_store': vector_stats,
+        'admission': query_limiter.get_stats(),
         'cache': cache_stats,
-        'is_indexed': rag_pipeline.is_indexed
+        'is_indexed': rag_pipeline.is_indexed,
+        'indexing': current_job.to_dict() if current_job else None,
+        'data_lake': rag_pipeline.data_lake.get_stats(),
+        'trend_arrays': rag_pipeline.trend_engine.get_stats(),
+        'gap_fetch': rag_pipeline.gap_filler.get_stats() if rag_pipeline.gap_filler else None
     })
 
 
+@app.route('/api/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    vector_stats = rag_pipeline.vector_store.get_stats()
+    cache_stats = rag_pipeline.cache_manager.get_stats()
+    metrics.set_gauge('samarth_vector_documents', vector_stats['total_documents'])
+    metrics.set_gauge('samarth_vector_segments', vector_stats.get('segments', 1))
+    metrics.set_gauge('samarth_vector_index_bytes', vector_stats.get('index_bytes', 0))
+    metrics.set_gauge('samarth_cache_entries', cache_stats['size'])
+    metrics.set_gauge('samarth_cache_hit_ratio', cache_stats['hit_rate'])
+    metrics.set_gauge('samarth_indexed', int(rag_pipeline.is_indexed))
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+
 @app.route('/api/search_datasets', methods=['POST'])
 def search_datasets():
     """Search for datasets on data.gov.in"""
@@ -125,4 +272,6 @@ if __name__ == '__main__':
     print(f"Debug Mode: {debug}")
     print(f"Vector Store Indexed: {rag_pipeline.is_indexed}")
     print(f"{'='*60}\n")
+    if Config.PRELOAD_APP:
+        start_background_tasks()
     app.run(host='0.0.0.0', port=port, debug=debug)
@@ -0,0 +1,55 @@
+# backend/benchmarks/compare.py
+"""
+Compare two benchmark result files
+
+Usage (from backend/):
+    python -m benchmarks.compare baseline.json candidate.json [--threshold 0.10]
+
+Prints the relative change of each shared metric and exits non-zero if any
+metric regressed by more than the threshold.
+"""
+import argparse
+import json
+import sys
+
+# Metrics where a larger value is better; all other timing metrics are lower-is-better
+HIGHER_IS_BETTER = ('rows_per_second', 'docs_per_second', 'requests_per_second', 'goodput_rps')
+COMPARED = ('seconds', 'p50_ms', 'p95_ms', 'p99_ms') + HIGHER_IS_BETTER + (
+    'crop_bytes_per_row', 'rainfall_bytes_per_row', 'error_rate')
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        report = json.load(f)
+    return {(r['case'], r['scale']): r for r in report['results']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare benchmark results")
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Relative regression that fails the comparison")
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    regressions = 0
+
+    for key in sorted(set(baseline) & set(candidate)):
+        for metric in COMPARED:
+            old, new = baseline[key].get(metric), candidate[key].get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            flag = ''
+            if worse > args.threshold:
+                flag = '  REGRESSION'
+                regressions += 1
+            print(f"{key[1]:>5} {key[0]:<22} {metric:<22} {old:>12.4g} -> {new:>12.4g} ({change:+.1%}){flag}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
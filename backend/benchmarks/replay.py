@@ -0,0 +1,190 @@
+# backend/benchmarks/replay.py
+"""
+Replay captured query logs against a running backend
+
+Reads the logs written when QUERY_LOG_PATH is set (see utils/query_log.py),
+sends each query to /api/query at its original offset from the first one,
+divided by --speed, and reports throughput, latency percentiles and error
+rates in the same format as benchmarks.run, so two builds can be compared
+with benchmarks.compare.
+
+Typical capacity check (from backend/):
+    python -m benchmarks.stub_llm_server --latency-ms 800 --jitter-ms 300 &
+    LLM_BASE_URL=http://127.0.0.1:8099 GROQ_API_KEY=stub gunicorn app:app &
+    python -m benchmarks.replay query_logs/ --url http://127.0.0.1:8080 --speed 2 --output replay.json
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import requests
+
+from benchmarks.run import git_revision, latency_summary
+
+
+def load_queries(paths: List[str]) -> List[Dict]:
+    """
+    Read query records from log files or directories, ordered by arrival
+
+    Args:
+        paths: Log files, or directories holding queries-*.jsonl and their rotations
+
+    Returns:
+        Records as written by QueryLog, sorted by their 't' field
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, 'queries-*.jsonl*'))))
+        else:
+            files.append(path)
+
+    records, skipped = [], 0
+    for name in files:
+        with open(name, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    if record.get('q') and 't' in record:
+                        records.append(record)
+                        continue
+                except ValueError:
+                    pass
+                skipped += 1
+    if skipped:
+        print(f"Skipped {skipped} malformed log lines", file=sys.stderr)
+    records.sort(key=lambda r: r['t'])
+    return records
+
+
+class Replayer:
+    """Sends logged queries on their original schedule, scaled by speed"""
+
+    def __init__(self, url: str, concurrency: int, timeout: float):
+        self.url = url.rstrip('/') + '/api/query'
+        self.timeout = timeout
+        self.pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='replay')
+        self.outcomes = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _send(self, query: str, scheduled: float):
+        start = time.perf_counter()
+        outcome = {'lag': start - scheduled, 'shed': None}
+        try:
+            response = self._session().post(self.url, json={'query': query}, timeout=self.timeout)
+            outcome['status'] = response.status_code
+            if response.status_code in (429, 503) and 'Retry-After' in response.headers:
+                try:
+                    outcome['shed'] = response.json().get('reason', 'unknown')
+                except ValueError:
+                    outcome['shed'] = 'unknown'
+        except requests.RequestException as e:
+            outcome['status'] = 0
+            outcome['error'] = type(e).__name__
+        outcome['seconds'] = time.perf_counter() - start
+        with self._lock:
+            self.outcomes.append(outcome)
+
+    def run(self, records: List[Dict], speed: float) -> float:
+        """Replay records and wait for every response; returns the wall time"""
+        first = records[0]['t']
+        start = time.perf_counter()
+        for record in records:
+            scheduled = start + (record['t'] - first) / speed
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self.pool.submit(self._send, record['q'], scheduled)
+        self.pool.shutdown(wait=True)
+        return time.perf_counter() - start
+
+
+def summarize(records: List[Dict], outcomes: List[Dict], seconds: float, speed: float) -> Dict:
+    statuses = Counter(o['status'] for o in outcomes)
+    ok = sum(count for status, count in statuses.items() if 200 <= status < 300)
+    shed = Counter(o['shed'] for o in outcomes if o['shed'])
+    span = (records[-1]['t'] - records[0]['t']) / speed
+    summary = {
+        'requests': len(outcomes),
+        'seconds': seconds,
+        'offered_rps': len(records) / span if span > 0 else None,
+        'requests_per_second': len(outcomes) / seconds if seconds > 0 else None,
+        'goodput_rps': ok / seconds if seconds > 0 else None,
+        'error_rate': 1 - ok / len(outcomes),
+        'shed_rate': sum(shed.values()) / len(outcomes),
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'shed': dict(shed),
+        'max_lag_ms': max(o['lag'] for o in outcomes) * 1000
+    }
+    summary.update(latency_summary([o['seconds'] for o in outcomes]))
+    succeeded = [o['seconds'] for o in outcomes if 200 <= o['status'] < 300]
+    if succeeded:
+        summary['ok_p95_ms'] = latency_summary(succeeded)['p95_ms']
+    # Latency the same queries saw when they were captured, for reference
+    logged = [r['ms'] / 1000 for r in records if 'ms' in r]
+    if logged:
+        summary['logged_p95_ms'] = latency_summary(logged)['p95_ms']
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured query logs against a backend")
+    parser.add_argument('logs', nargs='+', help="Query log files or directories")
+    parser.add_argument('--url', default='http://127.0.0.1:8080', help="Backend base URL")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="Replay rate relative to the original (2 = twice as fast)")
+    parser.add_argument('--limit', type=int, help="Replay only the first N queries")
+    parser.add_argument('--concurrency', type=int, default=64, help="Requests in flight at most")
+    parser.add_argument('--timeout', type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument('--output', help="Write JSON results to this file")
+    args = parser.parse_args()
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    records = load_queries(args.logs)
+    if args.limit:
+        records = records[:args.limit]
+    if not records:
+        parser.error("No queries found in the given logs")
+
+    print(f"Replaying {len(records)} queries at {args.speed:g}x against {args.url}...", file=sys.stderr)
+    replayer = Replayer(args.url, args.concurrency, args.timeout)
+    seconds = replayer.run(records, args.speed)
+    result = {'case': 'replay', 'scale': f"{args.speed:g}x",
+              **summarize(records, replayer.outcomes, seconds, args.speed)}
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'args': vars(args)
+        },
+        'results': [result]
+    }
+    output = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
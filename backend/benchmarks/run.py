@@ -0,0 +1,280 @@
+# backend/benchmarks/run.py
+"""
+Benchmark suite for the RAG hot paths
+
+Cases, each run at every requested scale:
+    clean_crop / clean_rainfall      DataProcessor cleaning
+    format_crop / format_rainfall    DataProcessor.format_for_embedding
+    embed                            embedding throughput (sampled)
+    index_build                      VectorStore adds + lexical index build
+    search_k{K}                      dense search latency per k
+    answer_query                     end-to-end with a stub LLM
+
+Usage (from backend/):
+    python -m benchmarks.run --scales 10k,100k --output results.json
+    python -m benchmarks.run --stub-embeddings --cases clean_crop,search
+    python -m benchmarks.compare baseline.json results.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from typing import Callable, Dict, List
+
+from benchmarks.synthetic import (SCALES, generate_crop_records, generate_rainfall_records,
+                                  sample_queries)
+from benchmarks.stubs import HashingEmbeddingGenerator, StaticDataClient, StubLLMHandler
+
+ALL_CASES = ['clean', 'format', 'embed', 'index_build', 'search', 'answer_query']
+SEARCH_KS = (1, 5, 20, 50)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the pipeline's progress prints while timing"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def time_call(func: Callable, repeat: int = 1) -> float:
+    """Best wall time of func over repeat runs, in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with quiet():
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def latency_summary(samples: List[float]) -> Dict:
+    ms = np.asarray(samples) * 1000
+    return {
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'mean_ms': float(ms.mean()),
+        'samples': len(samples)
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def make_embedder(stub: bool, dim: int):
+    if stub:
+        return HashingEmbeddingGenerator(dim)
+    from embeddings.embedding_generator import EmbeddingGenerator
+    with quiet():
+        return EmbeddingGenerator()
+
+
+class Suite:
+    """Runs the benchmark cases for one scale and collects results"""
+
+    def __init__(self, scale_name: str, args: argparse.Namespace, embedder):
+        from data_fetcher.data_processor import DataProcessor
+
+        self.scale_name = scale_name
+        self.rows = SCALES[scale_name]
+        self.args = args
+        self.embedder = embedder
+        self.processor = DataProcessor()
+        self.results = []
+
+        print(f"[{scale_name}] generating {self.rows} crop and rainfall records...", file=sys.stderr)
+        self.crop_records = generate_crop_records(self.rows, seed=args.seed)
+        self.rainfall_records = generate_rainfall_records(self.rows, seed=args.seed)
+        self.crop_df = None
+        self.rainfall_df = None
+        self.crop_docs = None
+
+    def record(self, case: str, **values):
+        entry = {'case': case, 'scale': self.scale_name, 'rows': self.rows, **values}
+        self.results.append(entry)
+        print(f"[{self.scale_name}] {case}: {json.dumps(values)}", file=sys.stderr)
+
+    def _ensure_cleaned(self):
+        if self.crop_df is None:
+            with quiet():
+                self.crop_df = self.processor.clean_crop_data(self.crop_records)
+                self.rainfall_df = self.processor.clean_rainfall_data(self.rainfall_records)
+
+    def _ensure_docs(self):
+        self._ensure_cleaned()
+        if self.crop_docs is None:
+            with quiet():
+                self.crop_docs = self.processor.format_for_embedding(self.crop_df, 'crop')
+
+    def run_clean(self):
+        for name, func, records in (
+            ('clean_crop', self.processor.clean_crop_data, self.crop_records),
+            ('clean_rainfall', self.processor.clean_rainfall_data, self.rainfall_records),
+        ):
+            seconds = time_call(lambda: func(records), repeat=self.args.repeat)
+            self.record(name, seconds=seconds, rows_per_second=len(records) / seconds)
+
+        self._ensure_cleaned()
+        self.record('clean_memory',
+                    crop_bytes_per_row=self.crop_df.memory_usage(deep=True).sum() / max(len(self.crop_df), 1),
+                    rainfall_bytes_per_row=self.rainfall_df.memory_usage(deep=True).sum() / max(len(self.rainfall_df), 1))
+
+    def run_format(self):
+        self._ensure_cleaned()
+        for name, df, data_type in (('format_crop', self.crop_df, 'crop'),
+                                    ('format_rainfall', self.rainfall_df, 'rainfall')):
+            seconds = time_call(lambda: self.processor.format_for_embedding(df, data_type),
+                                repeat=self.args.repeat)
+            self.record(name, seconds=seconds, docs_per_second=len(df) / seconds)
+
+    def run_embed(self):
+        self._ensure_docs()
+        texts = [doc['text'] for doc in self.crop_docs[:self.args.embed_sample]]
+        seconds = time_call(lambda: self.embedder.generate_embeddings(texts))
+        self.record('embed', seconds=seconds, docs_per_second=len(texts) / seconds,
+                    sample=len(texts), model=self.embedder.model_name)
+
+    def _random_vectors(self, n: int) -> np.ndarray:
+        rng = np.random.default_rng(self.args.seed)
+        vectors = rng.standard_normal((n, self.embedder.get_embedding_dim())).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+    def _build_store(self, vectors: np.ndarray, texts: List[str], metadata: List[Dict]):
+        from embeddings.vector_store import VectorStore
+
+        store = VectorStore(embedding_dim=vectors.shape[1],
+                            index_path=os.path.join(tempfile.mkdtemp(), 'vector_store'))
+        batch_size = 512
+        for start in range(0, len(texts), batch_size):
+            store.add_documents(vectors[start:start + batch_size], texts[start:start + batch_size],
+                                metadata[start:start + batch_size])
+        store.build_lexical_index()
+        return store
+
+    def run_index_build(self):
+        # Index build uses random unit vectors so the cost is independent of the model
+        self._ensure_docs()
+        texts = [doc['text'] for doc in self.crop_docs]
+        metadata = [doc['metadata'] for doc in self.crop_docs]
+        vectors = self._random_vectors(len(texts))
+
+        start = time.perf_counter()
+        with quiet():
+            self.store = self._build_store(vectors, texts, metadata)
+        seconds = time.perf_counter() - start
+        self.record('index_build', seconds=seconds, docs_per_second=len(texts) / seconds,
+                    stats=self.store.get_stats())
+
+    def run_search(self):
+        if not hasattr(self, 'store'):
+            self.run_index_build()
+        queries = self._random_vectors(self.args.queries)
+        for k in SEARCH_KS:
+            samples = []
+            for query in queries:
+                start = time.perf_counter()
+                self.store.search(query, k=k)
+                samples.append(time.perf_counter() - start)
+            self.record(f'search_k{k}', **latency_summary(samples))
+
+        samples = []
+        for query in sample_queries(self.args.queries, seed=self.args.seed):
+            start = time.perf_counter()
+            self.store.search_lexical(query, k=20)
+            samples.append(time.perf_counter() - start)
+        self.record('lexical_search_k20', **latency_summary(samples))
+
+    def run_answer_query(self):
+        from chatbot.rag_pipeline import RAGPipeline
+        from data_fetcher.data_lake import DataLake
+
+        # The end-to-end case indexes a capped subset so it stays practical with a real model
+        n = min(self.rows, self.args.e2e_docs)
+        client = StaticDataClient(self.crop_records[:n], self.rainfall_records[:n])
+        workdir = tempfile.mkdtemp()
+        with quiet():
+            pipeline = RAGPipeline(embedding_generator=self.embedder,
+                                   llm_handler=StubLLMHandler(self.args.llm_latency_ms),
+                                   data_client=client,
+                                   index_path=os.path.join(workdir, 'vector_store'),
+                                   data_lake=DataLake(os.path.join(workdir, 'data_lake')))
+            pipeline.index_data()
+
+        samples = []
+        for query in sample_queries(self.args.queries, seed=self.args.seed + 1):
+            pipeline.cache_manager.clear()
+            start = time.perf_counter()
+            with quiet():
+                pipeline.answer_query(query)
+            samples.append(time.perf_counter() - start)
+        self.record('answer_query', indexed_docs=pipeline.vector_store.get_stats()['total_documents'],
+                    llm_latency_ms=self.args.llm_latency_ms, **latency_summary(samples))
+
+    def run(self, cases: List[str]) -> List[Dict]:
+        for case in cases:
+            getattr(self, f'run_{case}')()
+        return self.results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the RAG hot paths")
+    parser.add_argument('--scales', default='10k', help=f"Comma-separated subset of {','.join(SCALES)}")
+    parser.add_argument('--cases', default=','.join(ALL_CASES), help="Comma-separated cases to run")
+    parser.add_argument('--stub-embeddings', action='store_true',
+                        help="Use a hashing embedder instead of loading the sentence-transformer model")
+    parser.add_argument('--embed-sample', type=int, default=2000, help="Texts embedded in the embed case")
+    parser.add_argument('--queries', type=int, default=200, help="Queries per latency case")
+    parser.add_argument('--e2e-docs', type=int, default=5000, help="Rows indexed for answer_query")
+    parser.add_argument('--llm-latency-ms', type=float, default=0.0, help="Delay injected by the stub LLM")
+    parser.add_argument('--repeat', type=int, default=3, help="Repeats for throughput cases (best is kept)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    scales = [s.strip().lower() for s in args.scales.split(',') if s.strip()]
+    cases = [c.strip() for c in args.cases.split(',') if c.strip()]
+    for name in scales:
+        if name not in SCALES:
+            parser.error(f"Unknown scale {name}; choose from {', '.join(SCALES)}")
+    for case in cases:
+        if case not in ALL_CASES:
+            parser.error(f"Unknown case {case}; choose from {', '.join(ALL_CASES)}")
+
+    embedder = make_embedder(args.stub_embeddings, dim=384)
+    results = []
+    for name in scales:
+        results.extend(Suite(name, args, embedder).run(cases))
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'embedding_model': embedder.model_name,
+            'args': vars(args)
+        },
+        'results': results
+    }
+    output = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# backend/benchmarks/startup.py
+"""
+Startup-time benchmark
+
+Reports the import cost of each heavy dependency (each measured in a fresh
+interpreter so nothing is already cached) separately from the load phases
+of RAGPipeline construction.
+
+Usage (from backend/):
+    python -m benchmarks.startup [--skip-load] [--output startup.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+HEAVY_IMPORTS = ['numpy', 'pandas', 'faiss', 'torch', 'sentence_transformers', 'groq', 'openai']
+APP_IMPORTS = ['config', 'chatbot', 'embeddings', 'data_fetcher']
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import(module: str) -> dict:
+    """Time a single import in a fresh interpreter"""
+    code = (
+        "import time, json\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(json.dumps(time.perf_counter() - start))\n"
+    )
+    proc = subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {'module': module, 'seconds': None, 'error': proc.stderr.strip().splitlines()[-1]}
+    return {'module': module, 'seconds': json.loads(proc.stdout.strip().splitlines()[-1])}
+
+
+def measure_load() -> dict:
+    """Construct RAGPipeline in-process and collect its phase timings"""
+    sys.path.insert(0, BACKEND_DIR)
+    start = time.perf_counter()
+    from chatbot.rag_pipeline import RAGPipeline
+    import_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pipeline = RAGPipeline()
+    total_seconds = time.perf_counter() - start
+
+    return {
+        'import_seconds': import_seconds,
+        'construct_seconds': total_seconds,
+        'phases': pipeline.startup_timings,
+        'indexed': pipeline.is_indexed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backend startup phases")
+    parser.add_argument('--skip-load', action='store_true', help="Only measure imports")
+    parser.add_argument('--output', help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    results = {
+        'python': sys.version.split()[0],
+        'imports': [measure_import(m) for m in HEAVY_IMPORTS + APP_IMPORTS]
+    }
+    if not args.skip_load:
+        results['load'] = measure_load()
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
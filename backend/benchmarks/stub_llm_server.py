@@ -0,0 +1,143 @@
+# backend/benchmarks/stub_llm_server.py
+"""
+Stand-in LLM provider for load tests
+
+Answers OpenAI-compatible chat completion requests (which both the Groq and
+OpenAI SDKs send) after a configurable delay, so a local backend can be
+driven at production rates without provider quotas or cost.
+
+Usage (from backend/):
+    python -m benchmarks.stub_llm_server --port 8099 --latency-ms 800 --jitter-ms 200
+    python -m benchmarks.stub_llm_server --model-latency llama-3.1-8b-instant=250
+    LLM_BASE_URL=http://127.0.0.1:8099 GROQ_API_KEY=stub gunicorn app:app
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubLLMState:
+    """Latency and failure settings plus counters shared by handler threads"""
+
+    def __init__(self, latency_ms: float, jitter_ms: float, error_rate: float, seed: int = 0,
+                 model_latency_ms: dict = None):
+        self.latency_ms = latency_ms
+        self.model_latency_ms = model_latency_ms or {}
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def next_call(self, model: str = None):
+        """Delay in seconds and whether the call fails"""
+        latency_ms = self.model_latency_ms.get(model, self.latency_ms)
+        with self._lock:
+            self.requests += 1
+            delay = max(0.0, latency_ms + self.random.uniform(-self.jitter_ms, self.jitter_ms))
+            failed = self.random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        return delay / 1000, failed
+
+
+def completion(model: str, prompt_chars: int) -> dict:
+    answer = "Stub answer based on the retrieved records."
+    return {
+        'id': f"stub-{time.time_ns()}",
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': model,
+        'choices': [{
+            'index': 0,
+            'message': {'role': 'assistant', 'content': answer},
+            'finish_reason': 'stop'
+        }],
+        'usage': {
+            'prompt_tokens': prompt_chars // 4,
+            'completion_tokens': len(answer) // 4,
+            'total_tokens': (prompt_chars + len(answer)) // 4
+        }
+    }
+
+
+def make_handler(state: StubLLMState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send(self, status: int, payload: dict):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.rstrip('/') == '/stats':
+                self._send(200, {'requests': state.requests, 'errors': state.errors})
+            else:
+                self._send(404, {'error': {'message': 'not found'}})
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            try:
+                request = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError:
+                self._send(400, {'error': {'message': 'invalid JSON'}})
+                return
+            if not self.path.rstrip('/').endswith('/chat/completions'):
+                self._send(404, {'error': {'message': f"unsupported path {self.path}"}})
+                return
+
+            delay, failed = state.next_call(request.get('model'))
+            time.sleep(delay)
+            if failed:
+                self._send(503, {'error': {'message': 'stub provider unavailable', 'type': 'server_error'}})
+                return
+            prompt_chars = sum(len(m.get('content') or '') for m in request.get('messages', []))
+            self._send(200, completion(request.get('model', 'stub'), prompt_chars))
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve stub chat completions with injected latency")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--latency-ms', type=float, default=500.0, help="Mean delay per completion")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="Uniform +/- spread around the mean")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of calls answered with a 503")
+    parser.add_argument('--model-latency', action='append', default=[], metavar='MODEL=MS',
+                        help="Mean delay for one model, e.g. a fast routing target; repeatable")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    model_latency_ms = {}
+    for entry in args.model_latency:
+        model, _, ms = entry.rpartition('=')
+        if not model:
+            parser.error(f"--model-latency expects MODEL=MS, got {entry}")
+        model_latency_ms[model] = float(ms)
+    state = StubLLMState(args.latency_ms, args.jitter_ms, args.error_rate, args.seed, model_latency_ms)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    server.daemon_threads = True
+    print(f"Stub LLM listening on http://{args.host}:{args.port} "
+          f"(latency {args.latency_ms:g}±{args.jitter_ms:g} ms, error rate {args.error_rate:g})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+# backend/benchmarks/synthetic.py
+"""
+Synthetic data.gov.in records for benchmarks
+
+Records use the raw API field names and string-typed values that
+DataProcessor.clean_crop_data / clean_rainfall_data expect, including the
+padded season names and occasional missing values seen in the real feeds.
+"""
+import numpy as np
+from typing import Dict, List
+
+SCALES = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+STATES = [
+    'Andhra Pradesh', 'Assam', 'Bihar', 'Chhattisgarh', 'Gujarat', 'Haryana',
+    'Karnataka', 'Kerala', 'Madhya Pradesh', 'Maharashtra', 'Odisha', 'Punjab',
+    'Rajasthan', 'Tamil Nadu', 'Telangana', 'Uttar Pradesh', 'West Bengal'
+]
+DISTRICTS_PER_STATE = 30
+CROPS = [
+    'Rice', 'Wheat', 'Maize', 'Jowar', 'Bajra', 'Ragi', 'Barley', 'Cotton(lint)',
+    'Jute', 'Sugarcane', 'Groundnut', 'Soyabean', 'Sunflower', 'Arhar/Tur',
+    'Moong(Green Gram)', 'Urad', 'Gram', 'Rapeseed &Mustard', 'Potato', 'Onion'
+]
+SEASONS = ['Kharif     ', 'Rabi       ', 'Whole Year ', 'Summer     ', 'Autumn     ', 'Winter     ']
+SUBDIVISIONS = [
+    'ANDAMAN & NICOBAR ISLANDS', 'ARUNACHAL PRADESH', 'ASSAM & MEGHALAYA', 'NAGA MANI MIZO TRIPURA',
+    'SUB HIMALAYAN WEST BENGAL & SIKKIM', 'GANGETIC WEST BENGAL', 'ORISSA', 'JHARKHAND', 'BIHAR',
+    'EAST UTTAR PRADESH', 'WEST UTTAR PRADESH', 'UTTARAKHAND', 'HARYANA DELHI & CHANDIGARH',
+    'PUNJAB', 'HIMACHAL PRADESH', 'JAMMU & KASHMIR', 'WEST RAJASTHAN', 'EAST RAJASTHAN',
+    'WEST MADHYA PRADESH', 'EAST MADHYA PRADESH', 'GUJARAT REGION', 'SAURASHTRA & KUTCH',
+    'KONKAN & GOA', 'MADHYA MAHARASHTRA', 'MATATHWADA', 'VIDARBHA', 'CHHATTISGARH',
+    'COASTAL ANDHRA PRADESH', 'TELANGANA', 'RAYALSEEMA', 'TAMIL NADU', 'COASTAL KARNATAKA',
+    'NORTH INTERIOR KARNATAKA', 'SOUTH INTERIOR KARNATAKA', 'KERALA', 'LAKSHADWEEP'
+]
+MONTHS = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+# Rough all-India monthly normals in mm, used to shape the synthetic series
+MONTHLY_NORMALS = np.array([18, 22, 28, 38, 62, 165, 290, 260, 175, 80, 30, 15], dtype=np.float64)
+
+
+def _fmt(values: np.ndarray, missing: np.ndarray, decimals: int) -> List[str]:
+    return ['NA' if m else f"{v:.{decimals}f}" for v, m in zip(values, missing)]
+
+
+def generate_crop_records(n: int, seed: int = 0, missing_rate: float = 0.02) -> List[Dict]:
+    """
+    Generate raw crop production records
+
+    Args:
+        n: Number of records
+        seed: Random seed
+        missing_rate: Fraction of production values reported as 'NA'
+
+    Returns:
+        List of records shaped like the data.gov.in crop production API
+    """
+    rng = np.random.default_rng(seed)
+    state_idx = rng.integers(0, len(STATES), n)
+    district_idx = rng.integers(0, DISTRICTS_PER_STATE, n)
+    crop_idx = rng.integers(0, len(CROPS), n)
+    season_idx = rng.integers(0, len(SEASONS), n)
+    years = rng.integers(1997, 2016, n)
+    area = rng.lognormal(7, 1.5, n)
+    yields = rng.lognormal(0.5, 0.6, n)
+    production = area * yields
+    missing = rng.random(n) < missing_rate
+
+    area_str = _fmt(area, np.zeros(n, dtype=bool), 1)
+    production_str = _fmt(production, missing, 1)
+
+    return [
+        {
+            'state_name': STATES[s],
+            'district_name': f"{STATES[s].split()[0].upper()} DISTRICT {d:02d}",
+            'crop_year': str(y),
+            'season': SEASONS[se],
+            'crop': CROPS[c],
+            'area_': a,
+            'production_': p,
+        }
+        for s, d, c, se, y, a, p in zip(state_idx, district_idx, crop_idx, season_idx,
+                                          years, area_str, production_str)
+    ]
+
+
+def generate_rainfall_records(n: int, seed: int = 0, missing_rate: float = 0.01) -> List[Dict]:
+    """
+    Generate raw sub-divisional monthly rainfall records
+
+    Args:
+        n: Number of records
+        seed: Random seed
+        missing_rate: Fraction of monthly values reported as 'NA'
+
+    Returns:
+        List of records shaped like the data.gov.in rainfall API
+    """
+    rng = np.random.default_rng(seed)
+    subdivision_idx = np.arange(n) % len(SUBDIVISIONS)
+    years = 1901 + (np.arange(n) // len(SUBDIVISIONS)) % 120
+    monthly = MONTHLY_NORMALS * rng.gamma(2.0, 0.5, (n, 12))
+    missing = rng.random((n, 12)) < missing_rate
+    annual = monthly.sum(axis=1)
+
+    records = []
+    for i in range(n):
+        m = monthly[i]
+        record = {'SUBDIVISION': SUBDIVISIONS[subdivision_idx[i]], 'YEAR': str(years[i])}
+        record.update(zip(MONTHS, _fmt(m, missing[i], 1)))
+        record['ANNUAL'] = f"{annual[i]:.1f}"
+        record['JF'] = f"{m[0:2].sum():.1f}"
+        record['MAM'] = f"{m[2:5].sum():.1f}"
+        record['JJAS'] = f"{m[5:9].sum():.1f}"
+        record['OND'] = f"{m[9:12].sum():.1f}"
+        records.append(record)
+    return records
+
+
+def sample_queries(n: int, seed: int = 0) -> List[str]:
+    """Generate a mix of user-style questions covering the query types"""
+    rng = np.random.default_rng(seed)
+    templates = [
+        "What was the {crop} production in {state} in {year}?",
+        "Compare {crop} production in {state} and {state2}",
+        "How has rainfall in {subdivision} changed over the last decade?",
+        "Which districts in {state} have the highest {crop} yield?",
+        "Is there a correlation between rainfall and {crop} production in {state}?",
+        "What policy would you recommend to support {crop} farmers in {state}?",
+    ]
+    queries = []
+    for _ in range(n):
+        template = templates[rng.integers(0, len(templates))]
+        queries.append(template.format(
+            crop=CROPS[rng.integers(0, len(CROPS))],
+            state=STATES[rng.integers(0, len(STATES))],
+            state2=STATES[rng.integers(0, len(STATES))],
+            subdivision=SUBDIVISIONS[rng.integers(0, len(SUBDIVISIONS))].title(),
+            year=int(rng.integers(1997, 2016)),
+        ))
+    return queries
@@ -0,0 +1,122 @@
+# backend/benchmarks/vector_store_concurrency.py
+"""
+Concurrency stress test for IndexShard, one per-dataset shard of VectorStore
+
+Writer threads append batches while reader threads search continuously.
+Every document's vector is derived from its id and its text names the id,
+so readers can check each result for torn state: the text, metadata and
+reported distance must all agree with the id FAISS returned, and snapshot
+versions and sizes must never go backwards.
+
+Usage (from backend/):
+    python -m benchmarks.vector_store_concurrency [--readers 8] [--writers 2]
+        [--batches 50] [--batch-size 200] [--dim 64]
+
+Exits non-zero if any inconsistency is observed.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+import numpy as np
+from embeddings.vector_store import IndexShard
+
+
+def vector_for(doc_id: int, dim: int) -> np.ndarray:
+    return np.random.default_rng(doc_id).standard_normal(dim).astype('float32')
+
+
+def run(readers: int, writers: int, batches: int, batch_size: int, dim: int, k: int) -> dict:
+    store = IndexShard(embedding_dim=dim, index_path='/tmp/vector_store_concurrency')
+    id_lock = threading.Lock()
+    next_id = [0]
+    done = threading.Event()
+    errors = []
+    reads = [0] * readers
+    writes = [0] * writers
+
+    def writer(slot: int):
+        for _ in range(batches):
+            # Ids are reserved and the batch appended under one lock so that
+            # a document's global position equals its id
+            with id_lock:
+                ids = range(next_id[0], next_id[0] + batch_size)
+                next_id[0] += batch_size
+                store.add_documents(
+                    np.stack([vector_for(i, dim) for i in ids]),
+                    [f"doc-{i}" for i in ids],
+                    [{'doc_id': i, 'type': 'synthetic'} for i in ids]
+                )
+            writes[slot] += 1
+
+    def reader(slot: int):
+        rng = np.random.default_rng(10_000 + slot)
+        last_version, last_total = -1, -1
+        while not done.is_set():
+            snapshot = store.snapshot()
+            if snapshot.version < last_version or snapshot.total < last_total:
+                errors.append(f"snapshot went backwards: {snapshot.version}/{snapshot.total}")
+            last_version, last_total = snapshot.version, snapshot.total
+
+            query = rng.standard_normal(dim).astype('float32')
+            for result in store.search(query, k=k):
+                doc_id = result['id']
+                if result['document'] != f"doc-{doc_id}" or result['metadata']['doc_id'] != doc_id:
+                    errors.append(f"torn result for id {doc_id}: {result['document']}")
+                    continue
+                vector = vector_for(doc_id, dim)
+                expected = 1.0 - float(np.dot(vector, query) / (np.linalg.norm(vector) * np.linalg.norm(query)))
+                if abs(expected - result['distance']) > 1e-3 * max(1.0, expected):
+                    errors.append(f"distance mismatch for id {doc_id}")
+            reads[slot] += 1
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    write_threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+
+    start = time.perf_counter()
+    for thread in threads + write_threads:
+        thread.start()
+    for thread in write_threads:
+        thread.join()
+    write_seconds = time.perf_counter() - start
+    done.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    stats = store.get_stats()
+    if stats['total_documents'] != writers * batches * batch_size:
+        errors.append(f"expected {writers * batches * batch_size} documents, found {stats['total_documents']}")
+
+    return {
+        'readers': readers,
+        'writers': writers,
+        'documents': stats['total_documents'],
+        'segments': stats['segments'],
+        'searches': sum(reads),
+        'searches_per_second': sum(reads) / elapsed,
+        'batches_per_second': sum(writes) / write_seconds,
+        'elapsed_seconds': elapsed,
+        'errors': len(errors),
+        'first_errors': errors[:5]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress IndexShard with concurrent readers and writers")
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--batches', type=int, default=50)
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--dim', type=int, default=64)
+    parser.add_argument('--k', type=int, default=10)
+    args = parser.parse_args()
+
+    result = run(args.readers, args.writers, args.batches, args.batch_size, args.dim, args.k)
+    print(json.dumps(result, indent=2))
+    sys.exit(1 if result['errors'] else 0)
+
+
+if __name__ == '__main__':
+    main()
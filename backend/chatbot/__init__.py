@@ -2,5 +2,14 @@
 from .llm_handler import LLMHandler
 from .rag_pipeline import RAGPipeline
 from .query_processor import QueryProcessor
+from .gazetteer import Gazetteer
+from .record_lookup import RecordLookup
+from .intent_classifier import IntentClassifier
+from .gap_filler import EntityCoverage, GapFiller
+from .cache_warmup import CacheWarmer, QueryFrequency
+from .indexing_jobs import IndexingJob, IndexingJobManager, IndexingCancelled
 
-__all__ = ['LLMHandler', 'RAGPipeline', 'QueryProcessor']
\ No newline at end of file
+__all__ = ['LLMHandler', 'RAGPipeline', 'QueryProcessor', 'Gazetteer', 'RecordLookup', 'IntentClassifier',
+           'EntityCoverage', 'GapFiller',
+           'CacheWarmer', 'QueryFrequency',
+           'IndexingJob', 'IndexingJobManager', 'IndexingCancelled']
\ No newline at end of file
@@ -0,0 +1,319 @@
+# backend/chatbot/batch_qa.py
+"""
+Offline bulk question answering
+
+Answers a file of questions in chunks: every question in a chunk is parsed,
+embedded in one encode call and searched with one multi-query vector search
+per shard set, then the LLM calls run on a bounded pool paced to the
+provider's rate limit. Results stream to a JSONL file as they complete, and
+a rerun with the same output skips questions already answered.
+
+Usage (from backend/):
+    python -m chatbot.batch_qa questions.csv --output answers.jsonl
+    python -m chatbot.batch_qa questions.txt --rate 0.5 --concurrency 4
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Set, Tuple
+from config import Config
+from data_fetcher.registry import DATASETS
+from utils.admission import RateLimiter
+
+QUESTION_COLUMNS = ('question', 'query')
+
+
+def read_questions(path: str) -> List[Tuple[str, str]]:
+    """
+    Read (id, question) pairs from a question file
+
+    CSV, TSV and Excel files use a 'question' or 'query' column (else the
+    first column) and an 'id' column when present; JSONL lines are objects
+    with the same keys; any other file holds one question per line. Rows
+    without an id are numbered from 1.
+
+    Args:
+        path: Question file
+
+    Returns:
+        List of (id, question) tuples in file order
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.jsonl':
+        with open(path, encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    elif extension in ('.csv', '.tsv', '.xlsx', '.xls'):
+        import pandas as pd
+        if extension in ('.xlsx', '.xls'):
+            df = pd.read_excel(path, dtype=str)
+        else:
+            df = pd.read_csv(path, sep='\t' if extension == '.tsv' else ',', dtype=str)
+        columns = {str(column).strip().lower(): column for column in df.columns}
+        question_column = next((columns[name] for name in QUESTION_COLUMNS if name in columns),
+                               df.columns[0])
+        rows = [{'id': row.get(columns['id']) if 'id' in columns else None,
+                 'question': row[question_column]}
+                for row in df.fillna('').to_dict('records')]
+    else:
+        with open(path, encoding='utf-8') as f:
+            rows = [{'question': line} for line in f]
+
+    questions = []
+    for number, row in enumerate(rows, 1):
+        question = str(row.get('question') or row.get('query') or '').strip()
+        if question:
+            questions.append((str(row.get('id') or number), question))
+    return questions
+
+
+def completed_ids(path: str) -> Set[str]:
+    """Ids already answered in an existing output file"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by an interrupted run
+            if record.get('status') == 'ok':
+                done.add(str(record['id']))
+    return done
+
+
+def truncate_partial_line(path: str):
+    """Drop a last line left unfinished by an interrupted run, so appends start on a new line"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - 65536)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b'\n')
+            if newline >= 0:
+                if start + newline + 1 < end:
+                    f.truncate(start + newline + 1)
+                return
+            position = start
+        f.truncate(0)
+
+
+class BatchAnswerer:
+    """Answers many questions with batched retrieval and rate-limited concurrent LLM calls"""
+
+    def __init__(self, pipeline, concurrency: int = None, rate: float = None,
+                 batch_size: int = None, retries: int = None):
+        """
+        Initialize batch answerer
+
+        Args:
+            pipeline: Indexed RAGPipeline
+            concurrency: LLM calls in flight at most
+            rate: LLM calls started per second at most
+            batch_size: Questions retrieved together
+            retries: Extra attempts for a failed LLM call
+        """
+        self.pipeline = pipeline
+        self.concurrency = concurrency or Config.BATCH_LLM_CONCURRENCY
+        self.rate = rate or Config.BATCH_LLM_RATE
+        self.batch_size = batch_size or Config.BATCH_SIZE
+        self.retries = Config.BATCH_LLM_RETRIES if retries is None else retries
+        self.counts = Counter()
+        self._write_lock = threading.Lock()
+        self._output = None
+
+    def _write(self, question_id: str, question: str, status: str, path: str,
+               result: Dict = None, error: str = None):
+        record = {'id': question_id, 'question': question, 'status': status, 'path': path}
+        if result is not None:
+            record.update(answer=result['answer'], sources=result['sources'],
+                          query_info=result['query_info'])
+        if error is not None:
+            record['error'] = error
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._write_lock:
+            self._output.write(line + '\n')
+            self._output.flush()
+            self.counts[path if status == 'ok' else 'error'] += 1
+
+    def _generate(self, limiter: RateLimiter, question_id: str, question: str,
+                  query_info: Dict, docs: List[Dict]):
+        """LLM call for one question, retried with backoff"""
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(2 ** attempt)
+            limiter.acquire()
+            try:
+                result = self.pipeline.generate_answer(question, query_info, docs, raise_errors=True)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                continue
+            self.pipeline.cache_manager.set('query', result, query=question)
+            self._write(question_id, question, 'ok', 'rag', result)
+            return
+        print(f"Batch: giving up on question {question_id}: {error}")
+        self._write(question_id, question, 'error', 'rag', error=error)
+
+    def _answer_direct(self, question_id: str, question: str, result: Dict):
+        self.pipeline.cache_manager.set('query', result, query=question)
+        self._write(question_id, question, 'ok', 'direct', result)
+
+    def _run_chunk(self, chunk: List[Tuple[str, str]], pool: ThreadPoolExecutor,
+                   limiter: RateLimiter) -> Dict[Future, Tuple[str, str]]:
+        """Answer what a chunk can without the LLM; return futures for the rest, with their questions"""
+        pipeline = self.pipeline
+        unanswered = []
+        for question_id, question in chunk:
+            cached = pipeline.cache_manager.get('query', query=question)
+            if cached:
+                self._write(question_id, question, 'ok', 'cache', cached)
+                continue
+            query_info = pipeline.query_processor.parse_query(question)
+            filters = pipeline.query_processor.build_filters(query_info)
+            datasets = DATASETS.for_query_type(query_info['query_type'])
+            result = pipeline.lookup_answer(question, query_info, filters, datasets)
+            if result is not None:
+                self._answer_direct(question_id, question, result)
+                continue
+            unanswered.append((question_id, question, query_info, filters))
+        if not unanswered:
+            return {}
+
+        # One encode call serves both classification and retrieval; uncertain
+        # questions keep their keyword type rather than spend unthrottled LLM calls
+        embeddings = pipeline.embedding_generator.generate_embeddings([item[1] for item in unanswered])
+        retrieval, rows = [], []
+        for row, (question_id, question, query_info, filters) in enumerate(unanswered):
+            pipeline.classify_query(question, query_info, embeddings[row], llm_fallback=False)
+            result = pipeline.trend_answer(question, query_info)
+            if result is not None:
+                self._answer_direct(question_id, question, result)
+                continue
+            datasets = DATASETS.for_query_type(query_info['query_type'])
+            retrieval.append((question_id, question, query_info, filters, datasets))
+            rows.append(row)
+
+        if not retrieval:
+            return {}
+        retrieved = pipeline.retrieve_batch(
+            [item[1] for item in retrieval],
+            filters=[item[3] for item in retrieval],
+            datasets=[item[4] for item in retrieval],
+            quotas=[pipeline.query_processor.build_quotas(item[2]) for item in retrieval],
+            embeddings=embeddings[rows]
+        )
+
+        futures = {}
+        for (question_id, question, query_info, _, _), docs in zip(retrieval, retrieved):
+            if not docs:
+                self._write(question_id, question, 'ok', 'no_context',
+                            pipeline.no_context_answer(query_info))
+                continue
+            future = pool.submit(self._generate, limiter, question_id, question, query_info, docs)
+            futures[future] = (question_id, question)
+        return futures
+
+    def _check(self, finished: Set[Future], tasks: Dict[Future, Tuple[str, str]]):
+        """Record questions whose LLM task raised outside its own retry handling"""
+        for future in finished:
+            question_id, question = tasks.pop(future)
+            error = future.exception()
+            if error is not None:
+                print(f"Batch: question {question_id} failed: {error}")
+                self._write(question_id, question, 'error', 'rag', error=f"{type(error).__name__}: {error}")
+
+    def run(self, questions: List[Tuple[str, str]], output_path: str, resume: bool = True) -> Dict:
+        """
+        Answer questions into output_path
+
+        Retrieval for the next chunk overlaps the LLM calls of the previous
+        ones; at most about two chunks of answers are pending at once.
+
+        Args:
+            questions: (id, question) pairs, see read_questions
+            output_path: JSONL file results are appended to
+            resume: Skip ids already answered in output_path
+
+        Returns:
+            Counts by answer path, errors and throughput
+        """
+        if not self.pipeline.is_indexed:
+            raise RuntimeError("The vector store is not indexed; run indexing first")
+
+        done = completed_ids(output_path) if resume else set()
+        pending = [(question_id, question) for question_id, question in questions
+                   if question_id not in done]
+        print(f"Batch: {len(pending)} questions to answer, {len(questions) - len(pending)} already done")
+
+        self.counts = Counter()
+        limiter = RateLimiter(self.rate, burst=self.concurrency)
+        start = time.perf_counter()
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if resume:
+            truncate_partial_line(output_path)
+        with open(output_path, 'a' if resume else 'w', encoding='utf-8') as output, \
+                ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='batch-llm') as pool:
+            self._output = output
+            tasks = {}
+            for offset in range(0, len(pending), self.batch_size):
+                tasks.update(self._run_chunk(pending[offset:offset + self.batch_size], pool, limiter))
+                while len(tasks) > self.batch_size:
+                    finished, _ = wait(tasks, return_when=FIRST_COMPLETED)
+                    self._check(finished, tasks)
+                print(f"Batch: {sum(self.counts.values())}/{len(pending)} answered")
+            self._check(wait(tasks).done, tasks)
+        self._output = None
+
+        seconds = time.perf_counter() - start
+        answered = sum(self.counts.values())
+        return {
+            'total': len(questions),
+            'skipped': len(questions) - len(pending),
+            'answered': answered,
+            'by_path': dict(self.counts),
+            'seconds': round(seconds, 3),
+            'questions_per_second': round(answered / seconds, 3) if seconds else None
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer a file of questions offline")
+    parser.add_argument('input', help="Questions: .csv, .tsv, .xlsx, .jsonl or one per line")
+    parser.add_argument('--output', help="JSONL results (default: <input>.answers.jsonl)")
+    parser.add_argument('--no-resume', action='store_true', help="Start over instead of skipping answered ids")
+    parser.add_argument('--concurrency', type=int, help="LLM calls in flight at most")
+    parser.add_argument('--rate', type=float, help="LLM calls per second at most")
+    parser.add_argument('--batch-size', type=int, help="Questions retrieved together")
+    parser.add_argument('--limit', type=int, help="Answer only the first N questions")
+    args = parser.parse_args()
+
+    questions = read_questions(args.input)
+    if args.limit:
+        questions = questions[:args.limit]
+    output = args.output or f"{os.path.splitext(args.input)[0]}.answers.jsonl"
+
+    from chatbot.rag_pipeline import RAGPipeline
+    pipeline = RAGPipeline()
+    answerer = BatchAnswerer(pipeline, concurrency=args.concurrency, rate=args.rate,
+                             batch_size=args.batch_size)
+    try:
+        stats = answerer.run(questions, output, resume=not args.no_resume)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+# backend/chatbot/cache_warmup.py
+import os
+import pickle
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+from config import Config
+from embeddings.vector_store import VectorStore
+from utils.admission import RateLimiter, deadline
+from utils.helpers import file_lock, format_timestamp
+
+
+class QueryFrequency:
+    """Bounded count of how often each query text is asked"""
+
+    def __init__(self, capacity: int = 10000):
+        """
+        Initialize query frequency log
+
+        Args:
+            capacity: Distinct queries kept; the rarest are dropped beyond it
+        """
+        self.capacity = capacity
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, query: str):
+        with self._lock:
+            self.counts[query] += 1
+            if len(self.counts) > 2 * self.capacity:
+                self.counts = Counter(dict(self.counts.most_common(self.capacity)))
+
+    def top(self, n: int) -> List[Tuple[str, int]]:
+        with self._lock:
+            return self.counts.most_common(n)
+
+    def merge(self, counts: Dict[str, int]):
+        """Add counts carried over from a previous process"""
+        with self._lock:
+            self.counts.update(counts)
+
+
+class CacheWarmer:
+    """Persists hot answers across restarts and re-warms the query cache at startup"""
+
+    def __init__(self, pipeline, path: str = None):
+        """
+        Initialize cache warmer
+
+        Args:
+            pipeline: RAGPipeline whose query cache is persisted and warmed
+            path: Snapshot file
+        """
+        self.pipeline = pipeline
+        self.path = path or Config.CACHE_SNAPSHOT_PATH
+        self.frequency = QueryFrequency()
+        self.status = 'idle'
+        self.progress = {'restored': 0, 'precomputed': 0, 'skipped': 0, 'failed': 0, 'total': 0}
+        self.started_at = None
+        self.finished_at = None
+        self._stop = threading.Event()
+        self._save_lock = threading.Lock()
+        self._threads = []
+
+    def _index_saved_at(self) -> float:
+        manifest = os.path.join(self.pipeline.vector_store.index_path, VectorStore.MANIFEST)
+        return os.path.getmtime(manifest) if os.path.exists(manifest) else 0.0
+
+    def save(self):
+        """Write the hot query-cache entries and query counts to the snapshot"""
+        # Every worker snapshots to the same file; the file lock orders their writes
+        with self._save_lock, file_lock(f"{self.path}.lock"):
+            snapshot = {
+                'saved_at': time.time(),
+                'entries': self.pipeline.cache_manager.hot_entries(Config.CACHE_SNAPSHOT_SIZE),
+                'frequency': dict(self.frequency.top(self.frequency.capacity))
+            }
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        return len(snapshot['entries'])
+
+    def restore(self) -> int:
+        """
+        Reload the snapshot into the query cache
+
+        Answers saved before the current index was built are discarded, since
+        they may cite documents that changed; query counts are always kept.
+
+        Returns:
+            Number of cached answers restored
+        """
+        if not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, 'rb') as f:
+                snapshot = pickle.load(f)
+        except Exception as e:
+            print(f"Error reading cache snapshot {self.path}: {e}")
+            return 0
+
+        self.frequency.merge(snapshot.get('frequency', {}))
+        restored = 0
+        if snapshot['saved_at'] >= self._index_saved_at():
+            restored = self.pipeline.cache_manager.restore(snapshot['entries'])
+        self.progress['restored'] = restored
+        print(f"Cache warm-up: restored {restored} cached answers from {self.path}")
+        return restored
+
+    def precompute(self, top_n: int = None, rate: float = None):
+        """
+        Answer the most frequent logged queries that are not cached yet
+
+        Args:
+            top_n: Number of frequent queries to consider
+            rate: Queries answered per second at most
+        """
+        top_n = Config.WARMUP_TOP_N if top_n is None else top_n
+        limiter = RateLimiter(rate or Config.WARMUP_RATE)
+        queries = [query for query, _ in self.frequency.top(top_n)]
+        self.progress['total'] = len(queries)
+
+        for query in queries:
+            if self._stop.is_set():
+                break
+            if not self.pipeline.is_indexed or self.pipeline.cache_manager.contains('query', query=query):
+                self.progress['skipped'] += 1
+                continue
+            if not limiter.acquire(self._stop):
+                break
+            try:
+                with deadline(Config.QUERY_DEADLINE_SECONDS):
+                    self.pipeline.answer_query(query, check_cache=False)
+                self.progress['precomputed'] += 1
+            except Exception as e:
+                print(f"Cache warm-up failed for {query!r}: {e}")
+                self.progress['failed'] += 1
+
+    def _warm(self):
+        self.status = 'warming'
+        self.started_at = format_timestamp()
+        try:
+            if Config.WARMUP_TOP_N > 0:
+                self.precompute()
+            self.status = 'done'
+        except Exception as e:
+            print(f"Cache warm-up error: {e}")
+            self.status = 'failed'
+        self.finished_at = format_timestamp()
+
+    def _save_periodically(self):
+        while not self._stop.wait(Config.CACHE_SNAPSHOT_INTERVAL):
+            try:
+                self.save()
+            except Exception as e:
+                print(f"Error saving cache snapshot: {e}")
+
+    def start(self):
+        """Start the background warm-up and periodic snapshot threads"""
+        for target, name in ((self._warm, 'cache-warmup'), (self._save_periodically, 'cache-snapshot')):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Stop background work and write a final snapshot"""
+        self._stop.set()
+        try:
+            saved = self.save()
+            print(f"Cache snapshot saved: {saved} entries")
+        except Exception as e:
+            print(f"Error saving cache snapshot: {e}")
+
+    def get_status(self) -> Dict:
+        return {
+            'status': self.status,
+            'progress': dict(self.progress),
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
@@ -0,0 +1,237 @@
+# backend/chatbot/gap_filler.py
+"""
+Query-time fetching of data missing from the index
+
+The index holds a capped sample of each dataset. When a query names
+entities (a state, district, crop, subdivision or year) that no indexed
+document carries, the missing rows are fetched from data.gov.in with API
+filters, cleaned, embedded and added to the live store, so the index grows
+toward what users actually ask about instead of a full crawl.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from itertools import combinations, product
+from typing import Dict, List, Tuple
+from config import Config
+from data_fetcher.cache_manager import CacheManager
+from data_fetcher.registry import DATASETS
+from embeddings.vector_store import VectorStore
+from utils.admission import remaining_time
+from utils.metrics import current_trace, metrics, span
+
+metrics.describe('samarth_gap_fetch_total', 'Query-time fetches of missing entities by dataset and outcome')
+
+
+class EntityCoverage:
+    """Combinations of fetchable entity values present in the index, per dataset"""
+
+    def __init__(self, fields: Dict[str, Tuple[str, ...]]):
+        """
+        Initialize entity coverage
+
+        Args:
+            fields: Dataset name -> metadata fields it can be fetched by,
+                see DatasetRegistry.filter_keys
+        """
+        self.fields = fields
+        # (dataset, field subset) -> value tuples seen for those fields
+        self.seen = {}
+        # Gap fetches add combinations while requests check for missing ones
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, vector_store: VectorStore, fields: Dict[str, Tuple[str, ...]]) -> 'EntityCoverage':
+        """Record the entity values of every document of a vector store"""
+        coverage = cls(fields)
+        for _, metadata in vector_store.metadata_items():
+            coverage.add(metadata)
+        print(f"Entity coverage built: {coverage.size} combinations")
+        return coverage
+
+    def add(self, metadata: Dict):
+        """Record one document; list values (grouped documents) add a combination per value"""
+        dataset = metadata.get('type')
+        present = [(field, metadata[field]) for field in self.fields.get(dataset, ())
+                   if metadata.get(field) is not None]
+        with self._lock:
+            for size in range(1, len(present) + 1):
+                for subset in combinations(present, size):
+                    names = tuple(field for field, _ in subset)
+                    values = product(*(v if isinstance(v, list) else [v] for _, v in subset))
+                    self.seen.setdefault((dataset, names), set()).update(values)
+
+    def missing(self, dataset: str, filters: Dict[str, List]) -> List[Dict]:
+        """
+        Combinations named by the filters that no document of a dataset carries
+
+        Only the dataset's fetchable fields are considered, and a year alone
+        is not a gap: every year would then be fetched in full.
+
+        Args:
+            dataset: Dataset name
+            filters: Metadata field -> values named in the query (build_filters output)
+
+        Returns:
+            One {field: value} dict per missing combination
+        """
+        names = tuple(field for field in self.fields.get(dataset, ()) if filters.get(field))
+        if not any(field != 'year' for field in names):
+            return []
+        with self._lock:
+            seen = self.seen.get((dataset, names), set())
+            return [dict(zip(names, values)) for values in product(*(filters[field] for field in names))
+                    if values not in seen]
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return sum(len(values) for values in self.seen.values())
+
+
+class GapFiller:
+    """Fetches, embeds and hot-inserts the rows behind entities the index lacks"""
+
+    def __init__(self, pipeline):
+        """
+        Initialize gap filler
+
+        Args:
+            pipeline: RAGPipeline whose live store, record lookup and entity
+                coverage receive the fetched documents
+        """
+        self.pipeline = pipeline
+        # Outcome of each fetch (rows inserted, possibly none), so a gap is fetched once per TTL
+        self.fetched = CacheManager(ttl=Config.GAP_FETCH_TTL)
+        self.rows_inserted = 0
+        self._pending: Dict[Tuple, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        # Created on first use so forked workers get their own threads
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=Config.GAP_FETCH_WORKERS,
+                                                        thread_name_prefix='gap-fetch')
+        return self._executor
+
+    def submit(self, filters: Dict[str, List], datasets: List[str] = None) -> List[Future]:
+        """
+        Start fetches for the combinations the filters name but the index lacks
+
+        A gap already being fetched for another query is shared rather than
+        fetched twice.
+
+        Args:
+            filters: Metadata filters from the parsed query
+            datasets: Datasets the query is answered from (all if empty)
+
+        Returns:
+            Futures resolving to the number of documents each fetch inserted
+        """
+        coverage = self.pipeline.entity_coverage
+        if coverage is None or not filters:
+            return []
+        gaps = [(dataset, gap) for dataset in datasets or DATASETS.names()
+                for gap in coverage.missing(dataset, filters)]
+
+        futures = []
+        for dataset, gap in gaps[:Config.GAP_FETCH_MAX_CALLS]:
+            if self.fetched.contains('gap', dataset=dataset, **gap):
+                continue
+            key = (dataset,) + tuple(sorted(gap.items()))
+            with self._lock:
+                future = self._pending.get(key)
+                if future is None:
+                    if len(self._pending) >= Config.GAP_FETCH_MAX_PENDING:
+                        continue
+                    future = self._pending[key] = self._pool().submit(self._fetch, key, dataset, gap)
+            futures.append(future)
+        return futures
+
+    def wait(self, futures: List[Future]) -> Tuple[int, bool]:
+        """
+        Wait for fetches up to GAP_FETCH_BUDGET_MS and the request's deadline
+
+        With a budget of 0 nothing is waited for: only fetches that already
+        finished count. Fetches still running keep going in the background;
+        their rows serve later queries.
+
+        Returns:
+            Documents inserted by the finished fetches, and whether any are still running
+        """
+        budget = Config.GAP_FETCH_BUDGET_MS / 1000
+        if budget > 0:
+            with span('gap_fetch'):
+                done, not_done = wait(futures, timeout=min(budget, remaining_time(budget)))
+        else:
+            done, not_done = [], []
+            for future in futures:
+                (done if future.done() else not_done).append(future)
+        inserted = sum(future.result() for future in done)
+        trace = current_trace()
+        if trace is not None:
+            trace.annotate(gap_fetches=len(futures), gap_pending=len(not_done))
+        return inserted, bool(not_done)
+
+    def _fetch(self, key: Tuple, dataset: str, gap: Dict) -> int:
+        """Fetch one gap's rows, keep those matching it and insert them"""
+        pipeline = self.pipeline
+        inserted, outcome = 0, 'empty'
+        try:
+            spec = DATASETS.get(dataset)
+            # The API matches values exactly and the gap holds cleaned ones;
+            # try the raw spellings until one returns rows
+            records = []
+            for filters in spec.api_spellings(**gap):
+                records = pipeline.data_client.fetch_dataset(dataset, limit=Config.GAP_FETCH_LIMIT, **filters)
+                if records:
+                    break
+            if records:
+                df = pipeline.data_processor.clean(records, spec.schema)
+                # The API ignores filters it does not recognise; keep only the asked-for rows
+                wanted = {field: [value] for field, value in gap.items()}
+                docs = [doc for doc in pipeline.data_processor.format_for_embedding(df, dataset)
+                        if VectorStore.matches_filters(doc['metadata'], wanted)] if not df.empty else []
+                if docs:
+                    inserted, outcome = self._insert(docs), 'inserted'
+        except Exception as e:
+            print(f"Error fetching missing {dataset} rows for {gap}: {e}")
+            outcome = 'error'
+        metrics.inc('samarth_gap_fetch_total', dataset=dataset, outcome=outcome)
+        self.fetched.set('gap', inserted, dataset=dataset, **gap)
+        with self._lock:
+            self._pending.pop(key, None)
+        return inserted
+
+    def _insert(self, docs: List[Dict]) -> int:
+        """Embed documents into the live store and index them for lookups and coverage"""
+        pipeline = self.pipeline
+        texts = [doc['text'] for doc in docs]
+        metadata = [doc['metadata'] for doc in docs]
+        embeddings = pipeline.embedding_generator.generate_embeddings(texts)
+
+        # Re-indexing may swap these; a fetch that races it lands in the retired store
+        store, lookup, coverage = pipeline.vector_store, pipeline.record_lookup, pipeline.entity_coverage
+        ids = store.add_documents(embeddings, texts, metadata)
+        for doc_id, meta in zip(ids, metadata):
+            if lookup is not None:
+                lookup.add(doc_id, meta)
+            if coverage is not None:
+                coverage.add(meta)
+        with self._lock:
+            self.rows_inserted += len(docs)
+        return len(docs)
+
+    def clear(self):
+        """Forget fetch outcomes, e.g. after re-indexing dropped the inserted rows"""
+        self.fetched.clear()
+
+    def get_stats(self) -> Dict:
+        return {
+            'pending': len(self._pending),
+            'gaps_fetched': len(self.fetched.cache),
+            'rows_inserted': self.rows_inserted
+        }
@@ -0,0 +1,261 @@
+# backend/chatbot/gazetteer.py
+import re
+import pickle
+from typing import Dict, Iterable, List, Tuple
+
+
+class Gazetteer:
+    """Word-boundary entity matcher over state, district, crop, season and subdivision names"""
+
+    FIELDS = ('state', 'district', 'crop', 'season', 'subdivision')
+
+    # Alternate spellings and old names, mapped to (field, canonical name);
+    # build answers with whichever spelling of the pair the data uses
+    ALIASES = {
+        'orissa': ('state', 'Odisha'),
+        'uttaranchal': ('state', 'Uttarakhand'),
+        'pondicherry': ('state', 'Puducherry'),
+        'j&k': ('state', 'Jammu And Kashmir'),
+        'jammu kashmir': ('state', 'Jammu And Kashmir'),
+        'paddy': ('crop', 'Rice'),
+        'pearl millet': ('crop', 'Bajra'),
+        'sorghum': ('crop', 'Jowar'),
+        'finger millet': ('crop', 'Ragi'),
+        'corn': ('crop', 'Maize'),
+        'soyabean': ('crop', 'Soybean'),
+        'peanut': ('crop', 'Groundnut'),
+    }
+
+    TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+    _TERMINAL = '\0'
+
+    def __init__(self, max_edits: int = 1, min_fuzzy_length: int = 5, min_length: int = 3):
+        """
+        Initialize gazetteer
+
+        Args:
+            max_edits: Edit distance tolerated for misspelled tokens (0 or 1)
+            min_fuzzy_length: Shortest token that may be fuzzily corrected
+            min_length: Shortest single-token name that is matched at all
+        """
+        self.max_edits = max_edits
+        self.min_fuzzy_length = min_fuzzy_length
+        self.min_length = min_length
+        self.trie = {}
+        self.vocabulary = set()
+        # Tokens misspellings may be corrected to; names added with fuzzy=False stay out
+        self.fuzzy_vocabulary = set()
+        self.deletes = {}
+        self.size = 0
+
+    @classmethod
+    def tokenize(cls, text: str) -> List[str]:
+        """Lowercase and split text into word tokens, spelling out '&'"""
+        return cls.TOKEN_PATTERN.findall(text.lower().replace('&', ' and '))
+
+    def add(self, field: str, name: str, surface: str = None, fuzzy: bool = True):
+        """
+        Add an entity name
+
+        Args:
+            field: Entity field, one of FIELDS
+            name: Canonical name returned on match
+            surface: Text to match, defaults to the canonical name
+            fuzzy: Whether misspelled query tokens may be corrected to this name
+        """
+        tokens = self.tokenize(surface if surface is not None else name)
+        if not tokens or (len(tokens) == 1 and len(tokens[0]) < self.min_length
+                          and surface is None):
+            return
+
+        node = self.trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+            self.vocabulary.add(token)
+            if fuzzy:
+                self.fuzzy_vocabulary.add(token)
+        entries = node.setdefault(self._TERMINAL, [])
+        if (field, name) not in entries:
+            entries.append((field, name))
+            self.size += 1
+
+    def compile(self):
+        """Build the single-deletion neighbourhood used for fuzzy matching"""
+        self.deletes = {}
+        if self.max_edits < 1:
+            return
+        for token in self.fuzzy_vocabulary:
+            if len(token) < self.min_fuzzy_length:
+                continue
+            for variant in self._deletions(token):
+                self.deletes.setdefault(variant, set()).add(token)
+
+    @staticmethod
+    def _deletions(token: str) -> Iterable[str]:
+        yield token
+        for i in range(len(token)):
+            yield token[:i] + token[i + 1:]
+
+    def _correct(self, token: str) -> str:
+        """Map a token onto the vocabulary if it is within one edit of exactly one entry"""
+        if token in self.vocabulary or len(token) < self.min_fuzzy_length or not self.deletes:
+            return token
+
+        candidates = set()
+        for variant in self._deletions(token):
+            candidates.update(self.deletes.get(variant, ()))
+        candidates = {c for c in candidates if self._within_one_edit(token, c)}
+        return candidates.pop() if len(candidates) == 1 else token
+
+    @staticmethod
+    def _within_one_edit(a: str, b: str) -> bool:
+        if abs(len(a) - len(b)) > 1:
+            return False
+        if len(a) == len(b):
+            diffs = [i for i in range(len(a)) if a[i] != b[i]]
+            return len(diffs) <= 1 or (
+                len(diffs) == 2 and diffs[1] == diffs[0] + 1
+                and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]]
+            )
+        if len(a) > len(b):
+            a, b = b, a
+        i = 0
+        while i < len(a) and a[i] == b[i]:
+            i += 1
+        return a[i:] == b[i + 1:]
+
+    def match(self, query: str) -> List[Tuple[str, str]]:
+        """
+        Find entity mentions with a leftmost-longest scan over query tokens
+
+        Args:
+            query: User query
+
+        Returns:
+            List of (field, canonical name) in order of appearance
+        """
+        tokens = [self._correct(token) for token in self.tokenize(query)]
+        found = []
+        i = 0
+
+        while i < len(tokens):
+            node = self.trie
+            best_end, best_entries = i, None
+            j = i
+            while j < len(tokens) and tokens[j] in node:
+                node = node[tokens[j]]
+                j += 1
+                if self._TERMINAL in node:
+                    best_end, best_entries = j, node[self._TERMINAL]
+
+            if best_entries:
+                for entry in best_entries:
+                    if entry not in found:
+                        found.append(entry)
+                i = best_end
+            else:
+                i += 1
+
+        return found
+
+    def extract(self, query: str) -> Dict[str, List[str]]:
+        """
+        Extract entities grouped by field
+
+        Args:
+            query: User query
+
+        Returns:
+            Dictionary mapping each field to the names found
+        """
+        entities = {field: [] for field in self.FIELDS}
+        for field, name in self.match(query):
+            entities.setdefault(field, []).append(name)
+        return entities
+
+    @classmethod
+    def spelling_key(cls, name: str) -> str:
+        """Name reduced to lowercase letters and digits, for comparing spellings"""
+        return ''.join(cls.tokenize(name))
+
+    @classmethod
+    def canonical_names(cls, indexed: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], str]:
+        """
+        Resolve each alias pair to the spelling the indexed data uses
+
+        Args:
+            indexed: (field, name) pairs present in the metadata
+
+        Returns:
+            (field, spelling key) of every alias and its canonical name ->
+            the indexed spelling, or the canonical name if neither is indexed
+        """
+        spellings = {(field, cls.spelling_key(name)): name for field, name in indexed}
+        canonical = {}
+        for alias, (field, name) in cls.ALIASES.items():
+            keys = [(field, cls.spelling_key(name)), (field, cls.spelling_key(alias))]
+            resolved = next((spellings[key] for key in keys if key in spellings), name)
+            for key in keys:
+                canonical.setdefault(key, resolved)
+        return canonical
+
+    @classmethod
+    def build(cls, metadata: List[Dict], seeds: Dict[str, List[str]] = None,
+              exact_seeds: Dict[str, List[str]] = None) -> 'Gazetteer':
+        """
+        Build a gazetteer from indexed metadata plus seed name lists
+
+        Seeds and aliases that are spellings of an indexed name (e.g. the
+        seed 'Soybean' when the data says 'Soyabean') return the indexed name.
+
+        Args:
+            metadata: Document metadata dictionaries
+            seeds: Extra names per field that should always be recognised
+            exact_seeds: Like seeds, but only matched as spelled; for large
+                lists such as every district, whose near-misses are more
+                often ordinary words ('sugar' for Sagar) than typos
+
+        Returns:
+            Compiled gazetteer
+        """
+        gazetteer = cls()
+
+        indexed = []
+        seen = set()
+        for meta in metadata:
+            for field in cls.FIELDS:
+                value = meta.get(field)
+                # Grouped documents carry lists, e.g. every season of a year
+                for name in value if isinstance(value, list) else [value]:
+                    if isinstance(name, str) and (field, name) not in seen:
+                        seen.add((field, name))
+                        indexed.append((field, name))
+        canonical = cls.canonical_names(indexed)
+
+        for names_by_field, fuzzy in ((seeds, True), (exact_seeds, False)):
+            for field, names in (names_by_field or {}).items():
+                for name in names:
+                    resolved = canonical.get((field, cls.spelling_key(name)), name)
+                    gazetteer.add(field, resolved, surface=name if resolved != name else None,
+                                  fuzzy=fuzzy)
+
+        for field, name in indexed:
+            gazetteer.add(field, name)
+
+        for alias, (field, name) in cls.ALIASES.items():
+            gazetteer.add(field, canonical[(field, cls.spelling_key(alias))], surface=alias)
+
+        gazetteer.compile()
+        print(f"Gazetteer built: {gazetteer.size} entity names")
+        return gazetteer
+
+    def save(self, path: str):
+        """Save gazetteer to disk"""
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str) -> 'Gazetteer':
+        """Load gazetteer from disk"""
+        with open(path, 'rb') as f:
+            return pickle.load(f)
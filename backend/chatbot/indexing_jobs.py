@@ -0,0 +1,178 @@
+# backend/chatbot/indexing_jobs.py
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from utils.helpers import file_lock, format_timestamp
+
+
+class IndexingCancelled(Exception):
+    """Raised inside an indexing run when its job has been cancelled"""
+
+
+class IndexingJob:
+    """Progress and control handle for one indexing run"""
+
+    def __init__(self, job_id: str = None, force: bool = False, source: str = 'api',
+                 datasets: List[str] = None):
+        """
+        Initialize indexing job
+
+        Args:
+            job_id: Job identifier (generated if omitted)
+            force: Rebuild even if an index already exists
+            source: 'api' or 'lake', where the cleaned data comes from
+            datasets: Registered datasets to index (all if omitted)
+        """
+        self.id = job_id or uuid.uuid4().hex[:12]
+        self.force = force
+        self.source = source
+        self.datasets = datasets
+        self.status = 'queued'
+        self.stage = None
+        self.progress = {
+            'pages_fetched': 0,
+            'rows_cleaned': 0,
+            'docs_embedded': 0,
+            'docs_total': 0
+        }
+        self.error = None
+        self.created_at = format_timestamp()
+        self.finished_at = None
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def set_stage(self, stage: str):
+        """Record the stage the run is in and honour pending cancellation"""
+        self.check_cancelled()
+        with self._lock:
+            self.stage = stage
+
+    def advance(self, **counters):
+        """Increment progress counters, e.g. advance(pages_fetched=1)"""
+        with self._lock:
+            for name, amount in counters.items():
+                self.progress[name] = self.progress.get(name, 0) + amount
+
+    def cancel(self):
+        """Request cancellation; the run stops at its next checkpoint"""
+        self._cancel_event.set()
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """Raise IndexingCancelled if cancellation was requested"""
+        if self._cancel_event.is_set():
+            raise IndexingCancelled(f"Indexing job {self.id} cancelled")
+
+    def finish(self, status: str, error: str = None):
+        with self._lock:
+            self.status = status
+            self.error = error
+            self.finished_at = format_timestamp()
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in ('queued', 'running')
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                'job_id': self.id,
+                'status': self.status,
+                'stage': self.stage,
+                'progress': dict(self.progress),
+                'force': self.force,
+                'source': self.source,
+                'datasets': self.datasets,
+                'cancel_requested': self.cancel_requested,
+                'error': self.error,
+                'created_at': self.created_at,
+                'finished_at': self.finished_at
+            }
+
+
+class IndexingJobManager:
+    """Run indexing jobs one at a time in the background"""
+
+    def __init__(self, pipeline, max_history: int = 20):
+        """
+        Initialize job manager
+
+        Args:
+            pipeline: RAGPipeline whose index_data runs the job
+            max_history: Number of finished jobs kept for status queries
+        """
+        self.pipeline = pipeline
+        self.max_history = max_history
+        self.jobs = OrderedDict()
+        self._active = None
+        self._lock = threading.Lock()
+
+    def start(self, force: bool = False, source: str = 'api',
+              datasets: List[str] = None) -> Tuple[IndexingJob, bool]:
+        """
+        Start an indexing job unless one is already running
+
+        Args:
+            force: Rebuild even if an index already exists
+            source: 'api' to fetch from data.gov.in, 'lake' to re-embed the data lake
+            datasets: Registered datasets to index (all if omitted)
+
+        Returns:
+            Tuple of (job, created); created is False when the running job
+            is returned instead of starting a new one
+        """
+        with self._lock:
+            if self._active is not None and self._active.is_active:
+                return self._active, False
+
+            job = IndexingJob(force=force, source=source, datasets=datasets)
+            job.status = 'running'
+            self._active = job
+            self.jobs[job.id] = job
+            while len(self.jobs) > self.max_history:
+                self.jobs.popitem(last=False)
+
+        thread = threading.Thread(target=self._run, args=(job,), daemon=True,
+                                  name=f"indexing-{job.id}")
+        thread.start()
+        return job, True
+
+    def _run(self, job: IndexingJob):
+        try:
+            # Workers share the index directory: one indexes at a time, and a
+            # worker that waited for a default startup build loads it instead of
+            # repeating it; jobs naming a source or datasets always run
+            startup_build = job.datasets is None and job.source == 'api'
+            with file_lock(f"{self.pipeline.index_path}.lock"):
+                job.check_cancelled()
+                if (job.force or not startup_build or self.pipeline.is_indexed
+                        or not self.pipeline.reload_index()):
+                    self.pipeline.index_data(job=job, source=job.source, datasets=job.datasets)
+            job.finish('completed')
+        except IndexingCancelled:
+            print(f"Indexing job {job.id} cancelled")
+            job.finish('cancelled')
+        except Exception as e:
+            print(f"Error during background indexing: {e}")
+            job.finish('failed', error=str(e))
+
+    def get(self, job_id: str) -> Optional[IndexingJob]:
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[IndexingJob]:
+        """Request cancellation of a job; returns None if the id is unknown"""
+        job = self.jobs.get(job_id)
+        if job is not None and job.is_active:
+            job.cancel()
+        return job
+
+    def current(self) -> Optional[IndexingJob]:
+        """The running job, or the most recent one if none is running"""
+        return self._active
+
+    def list_jobs(self) -> List[Dict]:
+        return [job.to_dict() for job in reversed(self.jobs.values())]
@@ -0,0 +1,98 @@
+# backend/chatbot/intent_classifier.py
+"""
+Local query type and intent classification
+
+Nearest-centroid classifier over the sentence embedding retrieval already
+computes for a query, trained at startup from the labelled example queries
+in intent_examples.json. Classifying is one small matrix product, so the
+LLM is asked only about the queries the classifier is unsure of.
+"""
+import json
+import os
+from typing import Dict, List
+import numpy as np
+from config import Config
+
+EXAMPLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'intent_examples.json')
+
+
+class IntentClassifier:
+    """Nearest-centroid classifier for query type and intent"""
+
+    # Example fields the classifier predicts
+    HEADS = ('type', 'intent')
+
+    def __init__(self, centroids: Dict[str, np.ndarray], labels: Dict[str, List[str]],
+                 temperature: float = None, keyword_prior: float = None):
+        """
+        Initialize classifier
+
+        Args:
+            centroids: Head -> unit-norm label centroids, one row per label
+            labels: Head -> label names in centroid row order
+            temperature: Softmax temperature applied to cosine similarities
+            keyword_prior: Logit bonus for the type the keyword rules chose
+        """
+        self.centroids = centroids
+        self.labels = labels
+        self.temperature = temperature or Config.INTENT_TEMPERATURE
+        self.keyword_prior = Config.INTENT_KEYWORD_PRIOR if keyword_prior is None else keyword_prior
+
+    @staticmethod
+    def load_examples(path: str = None) -> List[Dict]:
+        """Labelled example queries: objects with query, type and intent"""
+        with open(path or EXAMPLES_PATH, encoding='utf-8') as f:
+            return json.load(f)
+
+    @classmethod
+    def train(cls, embedding_generator, examples: List[Dict] = None) -> 'IntentClassifier':
+        """
+        Build label centroids from embedded example queries
+
+        Args:
+            embedding_generator: Generator the queries are embedded with at serving time
+            examples: Labelled examples (the shipped ones by default)
+
+        Returns:
+            Trained classifier
+        """
+        examples = examples or cls.load_examples()
+        embeddings = embedding_generator.generate_embeddings([example['query'] for example in examples])
+
+        centroids, labels = {}, {}
+        for head in cls.HEADS:
+            names = sorted({example[head] for example in examples})
+            rows = np.stack([
+                embeddings[[i for i, example in enumerate(examples) if example[head] == name]].mean(axis=0)
+                for name in names
+            ])
+            norms = np.linalg.norm(rows, axis=1, keepdims=True)
+            centroids[head] = (rows / np.where(norms > 0, norms, 1.0)).astype(np.float32)
+            labels[head] = names
+        return cls(centroids, labels)
+
+    def classify(self, query_embedding: np.ndarray, keyword_type: str = None) -> Dict:
+        """
+        Classify one query
+
+        Args:
+            query_embedding: Unit-norm query embedding
+            keyword_type: Type the keyword rules matched, if any; it is
+                favoured but can be outvoted
+
+        Returns:
+            Dictionary with type, intent and confidence, the softmax
+            probability of the chosen type
+        """
+        result = {}
+        for head in self.HEADS:
+            logits = self.centroids[head] @ query_embedding.astype(np.float32) / self.temperature
+            if head == 'type' and keyword_type in self.labels[head]:
+                logits[self.labels[head].index(keyword_type)] += self.keyword_prior
+            probs = np.exp(logits - logits.max())
+            probs /= probs.sum()
+            best = int(probs.argmax())
+            result[head] = self.labels[head][best]
+            if head == 'type':
+                result['confidence'] = float(probs[best])
+        return result
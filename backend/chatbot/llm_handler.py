@@ -1,8 +1,39 @@
 # backend/chatbot/llm_handler.py
-from groq import Groq
-from openai import OpenAI
+import time
 from typing import List, Dict
 from config import Config
+from utils.admission import DeadlineExceeded, check_deadline, current_deadline, remaining_time
+from utils.metrics import current_trace, metrics, timed
+from .query_processor import QueryProcessor
+
+metrics.describe('samarth_llm_seconds', 'LLM completion latency by route and model')
+metrics.describe('samarth_llm_tokens_total', 'LLM tokens by route, model and kind')
+metrics.describe('samarth_llm_requests_total', 'LLM completions by route, model and outcome')
+
+class ModelRoute:
+    """Model and output budget for one class of queries"""
+    
+    def __init__(self, name: str, model: str, max_tokens: int, max_context_chars: int = None,
+                 instruction: str = "Please provide a detailed, data-backed answer with specific citations to the sources."):
+        """
+        Initialize route
+        
+        Args:
+            name: Route name used in the routing table and metrics
+            model: Provider model
+            max_tokens: Cap on generated tokens
+            max_context_chars: Longer contexts are sent to the large route instead
+            instruction: Closing instruction of the prompt, matched to the token cap
+        """
+        self.name = name
+        self.model = model
+        self.max_tokens = max_tokens
+        self.max_context_chars = max_context_chars
+        self.instruction = instruction
+    
+    def to_dict(self) -> Dict:
+        return {'model': self.model, 'max_tokens': self.max_tokens,
+                'max_context_chars': self.max_context_chars}
 
 class LLMHandler:
     """Handle LLM interactions using Groq or OpenAI"""
@@ -18,18 +49,112 @@ class LLMHandler:
         self.provider = provider or Config.LLM_PROVIDER
         self.model = model or Config.LLM_MODEL
         
+        # Only the configured provider's SDK is imported
+        client_options = {'base_url': Config.LLM_BASE_URL} if Config.LLM_BASE_URL else {}
         if self.provider == 'groq':
-            self.client = Groq(api_key=Config.GROQ_API_KEY)
+            from groq import Groq
+            self.client = Groq(api_key=Config.GROQ_API_KEY, **client_options)
         elif self.provider == 'openai':
-            self.client = OpenAI(api_key=Config.OPENAI_API_KEY)
+            from openai import OpenAI
+            self.client = OpenAI(api_key=Config.OPENAI_API_KEY, **client_options)
             self.model = 'gpt-3.5-turbo'
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
         
-        print(f"LLM Handler initialized: {self.provider} - {self.model}")
+        # Simple lookups go to a small fast model; analysis to the configured one
+        self.routes = {
+            'fast': ModelRoute('fast', Config.LLM_FAST_MODEL or self.model, Config.LLM_FAST_MAX_TOKENS,
+                               max_context_chars=Config.LLM_FAST_MAX_CONTEXT_CHARS,
+                               instruction="Please answer concisely with the specific figures and their sources."),
+            'large': ModelRoute('large', self.model, Config.LLM_MAX_TOKENS)
+        }
+        self.routing = self.parse_routing(Config.LLM_ROUTING)
+        
+        print(f"LLM Handler initialized: {self.provider} - {self.model} "
+              f"(fast route: {self.routes['fast'].model})")
+    
+    def parse_routing(self, spec: str) -> Dict[str, str]:
+        """
+        Parse a routing table of comma-separated query_type:route pairs
+        
+        Raises:
+            ValueError: A pair names an unknown route
+        """
+        routing = {}
+        for entry in filter(None, (part.strip() for part in spec.split(','))):
+            query_type, _, route = entry.partition(':')
+            route = route.strip()
+            if route not in self.routes:
+                raise ValueError(f"Unknown LLM route '{route}' for {query_type}; "
+                                 f"available: {', '.join(self.routes)}")
+            routing[query_type.strip()] = route
+        return routing
+    
+    def route(self, query_type: str = None, context_chars: int = 0) -> ModelRoute:
+        """
+        Route for a query
+        
+        Args:
+            query_type: QueryProcessor.determine_query_type result
+            context_chars: Length of the retrieved context
+        
+        Returns:
+            The query type's route, or the large route if it is unlisted or
+            the context is longer than the fast route accepts
+        """
+        route = self.routes[self.routing.get(query_type, 'large')]
+        if route.max_context_chars and context_chars > route.max_context_chars:
+            return self.routes['large']
+        return route
+    
+    def _complete(self, route: ModelRoute, messages: List[Dict], temperature: float,
+                  max_tokens: int) -> str:
+        """One chat completion on route, recording latency and token metrics"""
+        start = time.perf_counter()
+        try:
+            response = self.client.chat.completions.create(
+                model=route.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=remaining_time(Config.LLM_TIMEOUT_SECONDS)
+            )
+        except Exception:
+            metrics.inc('samarth_llm_requests_total', route=route.name, model=route.model, outcome='error')
+            raise
+        metrics.observe('samarth_llm_seconds', time.perf_counter() - start,
+                        route=route.name, model=route.model)
+        metrics.inc('samarth_llm_requests_total', route=route.name, model=route.model, outcome='ok')
+        usage = getattr(response, 'usage', None)
+        if usage is not None:
+            metrics.inc('samarth_llm_tokens_total', usage.prompt_tokens or 0,
+                        route=route.name, model=route.model, kind='prompt')
+            metrics.inc('samarth_llm_tokens_total', usage.completion_tokens or 0,
+                        route=route.name, model=route.model, kind='completion')
+        return response.choices[0].message.content
+    
+    def _complete_routed(self, route: ModelRoute, messages: List[Dict], temperature: float,
+                         max_tokens: int = None) -> str:
+        """Complete on route, retrying on the large model if a smaller one fails"""
+        try:
+            return self._complete(route, messages, temperature, max_tokens or route.max_tokens)
+        except Exception as e:
+            active = current_deadline()
+            if route.name == 'large' or (active is not None and active.expired):
+                raise
+            print(f"LLM route {route.name} failed ({e}); retrying on the large model")
+            trace = current_trace()
+            if trace is not None:
+                trace.annotate(llm_route='large', llm_fallback=route.name)
+            large = self.routes['large']
+            check_deadline('llm')
+            return self._complete(large, messages, temperature, large.max_tokens)
     
+    @timed('llm_generate')
     def generate_response(self, prompt: str, context: str = "", 
-                         temperature: float = 0.3, max_tokens: int = 1024) -> str:
+                         temperature: float = 0.3, max_tokens: int = None,
+                         raise_errors: bool = False, query_type: str = None,
+                         route: str = None) -> str:
         """
         Generate response from LLM
         
@@ -37,7 +162,10 @@ class LLMHandler:
             prompt: User query
             context: Retrieved context from RAG
             temperature: Sampling temperature
-            max_tokens: Maximum tokens in response
+            max_tokens: Maximum tokens in response (the route's cap by default)
+            raise_errors: Re-raise provider errors instead of answering with an apology
+            query_type: Query type the model is routed on, see route
+            route: Route name, overriding the query type
             
         Returns:
             Generated response text
@@ -57,40 +185,38 @@ Guidelines:
 
 Remember: You are working with real government data. Accuracy and traceability are paramount."""
 
+        selected = self.routes[route] if route else self.route(query_type, len(context))
+        trace = current_trace()
+        if trace is not None:
+            trace.annotate(llm_route=selected.name)
+
         user_message = f"""Context from data.gov.in:
 {context}
 
 Question: {prompt}
 
-Please provide a detailed, data-backed answer with specific citations to the sources."""
+{selected.instruction}"""
 
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_message}
         ]
         
+        # The provider call may not outlive the request's deadline
+        check_deadline('llm')
         try:
-            if self.provider == 'groq':
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens
-                )
-            else:  # openai
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens
-                )
-            
-            return response.choices[0].message.content
+            return self._complete_routed(selected, messages, temperature, max_tokens)
         
         except Exception as e:
+            active = current_deadline()
+            if active is not None and active.expired:
+                raise DeadlineExceeded('llm') from e
+            if raise_errors:
+                raise
             print(f"Error generating response: {e}")
             return f"I apologize, but I encountered an error: {str(e)}"
     
+    @timed('llm_extract_intent')
     def extract_query_intent(self, query: str) -> Dict:
         """
         Extract intent and entities from user query
@@ -102,9 +228,9 @@ Please provide a detailed, data-backed answer with specific citations to the sou
             Dictionary with intent and entities
         """
         prompt = f"""Analyze the following agricultural query and extract:
-1. Primary intent (e.g., compare, analyze, find, list)
+1. Primary intent, one of: {', '.join(QueryProcessor.QUERY_INTENTS)}
 2. Entities mentioned (states, districts, crops, years, climate data)
-3. Query type (crop_production, rainfall, correlation, policy_analysis)
+3. Query type, one of: {', '.join(QueryProcessor.QUERY_TYPES)}
 
 Query: {query}
 
@@ -118,23 +244,10 @@ TYPE: [type]"""
             {"role": "user", "content": prompt}
         ]
         
+        check_deadline('llm')
         try:
-            if self.provider == 'groq':
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=0.1,
-                    max_tokens=200
-                )
-            else:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=0.1,
-                    max_tokens=200
-                )
-            
-            result = response.choices[0].message.content
+            # A short classification answer; the small model is enough
+            result = self._complete_routed(self.routes['fast'], messages, temperature=0.1, max_tokens=200)
             
             # Parse response
             intent_data = {
@@ -2,6 +2,8 @@
 import re
 from typing import Dict, List
 import json
+from data_fetcher.registry import DATASETS
+from .gazetteer import Gazetteer
 
 class QueryProcessor:
     """Process and understand user queries"""
@@ -22,35 +24,81 @@ class QueryProcessor:
         'Coconut', 'Arecanut', 'Tea', 'Coffee', 'Rubber'
     ]
     
-    @staticmethod
-    def extract_states(query: str) -> List[str]:
-        """Extract state names from query"""
-        query_lower = query.lower()
-        found_states = []
-        
-        for state in QueryProcessor.INDIAN_STATES:
-            if state.lower() in query_lower:
-                found_states.append(state)
+    # Crop seasons as spelled in the cleaned data
+    CROP_SEASONS = ['Kharif', 'Rabi', 'Whole Year', 'Autumn', 'Summer', 'Winter']
+    
+    # Types determine_query_type and the intent classifier assign
+    QUERY_TYPES = [
+        'comparison', 'trend_analysis', 'correlation', 'policy_analysis', 'ranking',
+        'climate_agriculture_correlation', 'climate_query', 'agriculture_query', 'general_query'
+    ]
+    
+    # Types whose keyword rules name the computation; the classifier does not override them
+    STRUCTURAL_TYPES = ('comparison', 'trend_analysis', 'correlation')
+    
+    # What the user wants done with the data
+    QUERY_INTENTS = ['find', 'compare', 'analyze', 'rank', 'recommend']
+    
+    def __init__(self, gazetteer: Gazetteer = None):
+        """
+        Initialize query processor
         
-        return found_states
+        Args:
+            gazetteer: Gazetteer built from the indexed data; one built from
+                the lists above is used until it is set
+        """
+        self.gazetteer = gazetteer
+    
+    def set_gazetteer(self, gazetteer: Gazetteer):
+        """Use a gazetteer built from the indexed data for entity extraction"""
+        self.gazetteer = gazetteer
+    
+    def get_gazetteer(self) -> Gazetteer:
+        """Get the active gazetteer, building a default one from the seed lists"""
+        if self.gazetteer is None:
+            self.gazetteer = Gazetteer.build([], seeds=self.seed_entities(),
+                                             exact_seeds=self.source_entities())
+        return self.gazetteer
+    
+    @classmethod
+    def seed_entities(cls) -> Dict[str, List[str]]:
+        """Names that are always recognised, whether or not they are indexed"""
+        return {
+            'state': cls.INDIAN_STATES,
+            'crop': cls.COMMON_CROPS,
+            'season': cls.CROP_SEASONS
+        }
     
     @staticmethod
-    def extract_crops(query: str) -> List[str]:
-        """Extract crop names from query"""
-        query_lower = query.lower()
-        found_crops = []
-        
-        for crop in QueryProcessor.COMMON_CROPS:
-            if crop.lower() in query_lower:
-                found_crops.append(crop)
+    def source_entities() -> Dict[str, List[str]]:
+        """
+        Every district and subdivision the datasets use, indexed or not
         
-        return found_crops
+        Recognising names the index lacks lets gap filling fetch them.
+        """
+        names = {}
+        for spec in DATASETS:
+            for field in spec.source_names:
+                names.setdefault(field, []).extend(spec.known_names(field))
+        return names
+    
+    def extract_entities(self, query: str) -> Dict[str, List[str]]:
+        """Extract states, districts, crops and subdivisions in one pass"""
+        return self.get_gazetteer().extract(query)
+    
+    def extract_states(self, query: str) -> List[str]:
+        """Extract state names from query"""
+        return self.extract_entities(query)['state']
+    
+    def extract_crops(self, query: str) -> List[str]:
+        """Extract crop names from query"""
+        return self.extract_entities(query)['crop']
     
     @staticmethod
     def extract_years(query: str) -> List[int]:
         """Extract years from query"""
         # Match 4-digit years
-        years = re.findall(r'\b(19|20)\d{2}\b', query)
+        years = re.findall(r'\b(?:19|20)\d{2}\b', query)
         return [int(year) for year in years]
     
     @staticmethod
@@ -86,7 +134,60 @@ class QueryProcessor:
             return 'general_query'
     
     @staticmethod
-    def parse_query(query: str) -> Dict:
+    def trend_metric(query: str) -> str:
+        """Series a trend question is about: 'rainfall', 'yield', 'area' or 'production'"""
+        query_lower = query.lower()
+        if any(word in query_lower for word in ['rainfall', 'rain', 'precipitation', 'monsoon']):
+            return 'rainfall'
+        if 'yield' in query_lower:
+            return 'yield'
+        if any(word in query_lower for word in ['area', 'acreage', 'hectare']):
+            return 'area'
+        return 'production'
+    
+    @staticmethod
+    def trend_direction(query: str) -> int:
+        """-1 for questions about declines, 1 for increases, 0 otherwise"""
+        query_lower = query.lower()
+        if re.search(r'\b(?:declin|decreas|fall|falling|drop|worsen|reduc|shrink)', query_lower):
+            return -1
+        if re.search(r'\b(?:increas|rising|rise|grow|improv|gain)', query_lower):
+            return 1
+        return 0
+    
+    @staticmethod
+    def trend_window(query_info: Dict, first_year: int, last_year: int) -> tuple:
+        """
+        Year window of a trend question
+        
+        Two named years bound the window; one named year starts it; "last N
+        years" or "decade" count back from the latest year with data.
+        
+        Args:
+            query_info: Output of parse_query
+            first_year: Earliest year with data
+            last_year: Latest year with data
+            
+        Returns:
+            (start, end) years, inclusive
+        """
+        years = query_info.get('years') or []
+        if len(years) >= 2:
+            return min(years), max(years)
+        if len(years) == 1:
+            return years[0], last_year
+        
+        query_lower = query_info.get('original_query', '').lower()
+        span = None
+        if query_info.get('numbers') and 'year' in query_lower:
+            span = query_info['numbers'][0]
+        elif 'decade' in query_lower:
+            span = 10
+        if span:
+            return max(first_year, last_year - span + 1), last_year
+        return first_year, last_year
+    
+    def parse_query(self, query: str) -> Dict:
         """
         Parse query and extract all relevant information
         
@@ -96,11 +197,63 @@ class QueryProcessor:
         Returns:
             Dictionary with parsed information
         """
+        entities = self.extract_entities(query)
+        
         return {
             'original_query': query,
             'query_type': QueryProcessor.determine_query_type(query),
-            'states': QueryProcessor.extract_states(query),
-            'crops': QueryProcessor.extract_crops(query),
+            'states': entities['state'],
+            'districts': entities['district'],
+            'crops': entities['crop'],
+            'seasons': entities['season'],
+            'subdivisions': entities['subdivision'],
             'years': QueryProcessor.extract_years(query),
             'numbers': QueryProcessor.extract_numbers(query)
+        }
+    
+    # parse_query keys holding entities, by the metadata field they match
+    ENTITY_FIELDS = {
+        'state': 'states',
+        'district': 'districts',
+        'crop': 'crops',
+        'season': 'seasons',
+        'subdivision': 'subdivisions',
+        'year': 'years'
+    }
+    
+    @staticmethod
+    def build_filters(query_info: Dict) -> Dict:
+        """
+        Build metadata filters for search from parsed query information
+        
+        Args:
+            query_info: Output of parse_query
+            
+        Returns:
+            Dictionary mapping metadata fields to allowed values
+        """
+        return {
+            field: query_info[key]
+            for field, key in QueryProcessor.ENTITY_FIELDS.items()
+            if query_info.get(key)
+        }
+    
+    @staticmethod
+    def build_quotas(query_info: Dict) -> Dict:
+        """
+        Entities that should each be represented in the retrieved context
+        
+        Only fields naming two or more values are returned, e.g. both
+        states of "compare Punjab and Haryana".
+        
+        Args:
+            query_info: Output of parse_query
+            
+        Returns:
+            Dictionary mapping metadata fields to the values to cover
+        """
+        return {
+            field: query_info[key]
+            for field, key in QueryProcessor.ENTITY_FIELDS.items()
+            if len(query_info.get(key) or []) > 1
         }
\ No newline at end of file
@@ -1,103 +1,508 @@
 # backend/chatbot/rag_pipeline.py
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple
 from embeddings.embedding_generator import EmbeddingGenerator
-from embeddings.vector_store import VectorStore
+from embeddings.vector_store import VectorStore, IndexShard
+from embeddings.index_bundle import IndexBundle
+from embeddings.reranker import Reranker, reciprocal_rank_fusion, select_by_relevance, select_diverse
 from .llm_handler import LLMHandler
 from .query_processor import QueryProcessor
+from .gazetteer import Gazetteer
+from .record_lookup import RecordLookup
+from .intent_classifier import IntentClassifier
+from .gap_filler import EntityCoverage, GapFiller
+from .indexing_jobs import IndexingJob
 from data_fetcher.data_gov_client import DataGovClient
 from data_fetcher.data_processor import DataProcessor
 from data_fetcher.cache_manager import CacheManager
+from data_fetcher.data_lake import DataLake
+from data_fetcher.registry import DATASETS, DatasetSpec
+from data_fetcher.trend_engine import TrendEngine
+from config import Config
+from utils.admission import check_deadline
+from utils.metrics import current_trace, span, timed
+from utils.helpers import format_timestamp
+import os
+import shutil
+import time
+import numpy as np
+import pandas as pd
 
 class RAGPipeline:
     """RAG (Retrieval Augmented Generation) pipeline for Samarth"""
     
-    def __init__(self):
-        """Initialize RAG pipeline components"""
+    def __init__(self, embedding_generator=None, llm_handler=None, data_client=None,
+                 index_path: str = "vector_store", data_lake: DataLake = None,
+                 use_bundle: bool = True):
+        """
+        Initialize RAG pipeline components
+        
+        Args:
+            embedding_generator: Embedding generator to use instead of loading the default model
+            llm_handler: LLM handler to use instead of the configured provider
+            data_client: data.gov.in client to use instead of the default one
+            index_path: Directory of the saved vector store
+            data_lake: Local Parquet store of cleaned datasets
+            use_bundle: Serve a prebuilt index bundle when index_path has no index
+        """
         print("Initializing RAG Pipeline...")
         
+        # Seconds spent in each startup phase, reported by readiness and benchmarks
+        self.startup_timings = {}
+        
         # Initialize components
-        self.embedding_generator = EmbeddingGenerator()
+        start = time.perf_counter()
+        self.embedding_generator = embedding_generator or EmbeddingGenerator()
+        self.startup_timings['embedding_model'] = time.perf_counter() - start
+        
+        # Query types are classified from the query embedding instead of asking the LLM
+        start = time.perf_counter()
+        self.intent_classifier = None
+        if Config.INTENT_CLASSIFIER:
+            try:
+                self.intent_classifier = IntentClassifier.train(self.embedding_generator)
+            except Exception as e:
+                print(f"Error training intent classifier: {e}")
+        self.startup_timings['intent_classifier'] = time.perf_counter() - start
+        
+        # Without a local index, serve a verified prebuilt bundle instead of ingesting
+        start = time.perf_counter()
+        self.index_path = index_path
+        self.bundle = None
+        if use_bundle and Config.INDEX_BUNDLE_PATH and not VectorStore.exists(index_path):
+            self.bundle = IndexBundle.select(
+                Config.INDEX_BUNDLE_PATH, self.embedding_generator.model_name,
+                self.embedding_generator.get_embedding_dim(),
+                version=Config.INDEX_BUNDLE_VERSION or None,
+                checksums=Config.INDEX_BUNDLE_VERIFY == 'checksum'
+            )
+            if self.bundle is not None:
+                print(f"Serving prebuilt index bundle {self.bundle.version}")
+        self.startup_timings['bundle_verify'] = time.perf_counter() - start
+        
+        start = time.perf_counter()
         self.vector_store = VectorStore(
-            embedding_dim=self.embedding_generator.get_embedding_dim()
+            embedding_dim=self.embedding_generator.get_embedding_dim(),
+            index_path=self.bundle.index_path if self.bundle else index_path
         )
-        self.llm_handler = LLMHandler()
+        self.startup_timings['vector_store_init'] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        self.llm_handler = llm_handler or LLMHandler()
+        self.startup_timings['llm_client'] = time.perf_counter() - start
+        
         self.query_processor = QueryProcessor()
-        self.data_client = DataGovClient()
+        self.data_client = data_client or DataGovClient()
         self.data_processor = DataProcessor()
+        if data_lake is None and self.bundle is not None and self.bundle.lake_path:
+            data_lake = DataLake(self.bundle.lake_path)
+        self.data_lake = data_lake or DataLake()
         self.cache_manager = CacheManager()
         
+        # The cross-encoder loads now rather than in the first request that reranks
+        start = time.perf_counter()
+        self.reranker = Reranker()
+        try:
+            self.reranker.load()
+        except Exception as e:
+            print(f"Error loading rerank model, reranking disabled: {e}")
+        self.startup_timings['rerank_model'] = time.perf_counter() - start
+        
+        self.record_lookup = None
+        self.entity_coverage = None
+        self.gap_filler = GapFiller(self) if Config.GAP_FETCH else None
+        self.trend_engine = TrendEngine()
+        
         # Try to load existing vector store
+        start = time.perf_counter()
         if not self.vector_store.load():
             print("No existing vector store found. Will need to index data.")
             self.is_indexed = False
         else:
             self.is_indexed = True
+            # Shards saved before hybrid retrieval have no lexical index yet
+            missing = [name for name, shard in self.vector_store.shards.items()
+                       if shard.lexical_index is None]
+            if Config.HYBRID_SEARCH and missing:
+                self.vector_store.build_lexical_index(missing)
+            self._load_gazetteer()
+            self.record_lookup = RecordLookup.build(self.vector_store, DATASETS.lookup_keys())
+            self.entity_coverage = self._build_coverage(self.vector_store)
+        self.startup_timings['index_load'] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        if Config.TREND_ENGINE and self._lake_enabled():
+            try:
+                self.trend_engine = TrendEngine.from_lake(self.data_lake)
+            except Exception as e:
+                print(f"Error building trend arrays from data lake: {e}")
+        self.startup_timings['trend_engine'] = time.perf_counter() - start
         
         print("RAG Pipeline initialized successfully!")
     
-    def index_data(self):
-        """Index data from data.gov.in into vector store"""
-        print("Starting data indexing...")
+    def _gazetteer_path(self) -> str:
+        return os.path.join(self.vector_store.index_path, "gazetteer.pkl")
+    
+    def _load_gazetteer(self):
+        """Load the persisted gazetteer, rebuilding it from metadata if absent"""
+        path = self._gazetteer_path()
+        if os.path.exists(path):
+            gazetteer = Gazetteer.load(path)
+        else:
+            gazetteer = Gazetteer.build(self.vector_store.metadata,
+                                        seeds=self.query_processor.seed_entities(),
+                                        exact_seeds=self.query_processor.source_entities())
+        self.query_processor.set_gazetteer(gazetteer)
+    
+    def index_data(self, job: IndexingJob = None, source: str = 'api',
+                   datasets: List[str] = None):
+        """
+        Index data from data.gov.in into vector store
         
-        # Fetch crop production data
-        print("Fetching crop production data...")
-        crop_data = self.data_client.fetch_crop_production()
+        Each dataset is fetched, cleaned and embedded into its own fresh
+        shard, in parallel. Untouched shards are shared with the current
+        store, and queries keep using it until the new one is swapped in.
         
-        if crop_data:
-            df_crop = self.data_processor.clean_crop_data(crop_data)
-            crop_docs = self.data_processor.format_for_embedding(df_crop, 'crop')
-            
-            # Generate embeddings
-            print(f"Generating embeddings for {len(crop_docs)} crop documents...")
-            crop_texts = [doc['text'] for doc in crop_docs]
-            crop_embeddings = self.embedding_generator.generate_embeddings(crop_texts)
-            crop_metadata = [doc['metadata'] for doc in crop_docs]
-            
-            # Add to vector store
-            self.vector_store.add_documents(crop_embeddings, crop_texts, crop_metadata)
+        Args:
+            job: Optional job handle for progress reporting and cancellation
+            source: 'api' to fetch from data.gov.in, 'lake' to re-embed the
+                cleaned snapshots in the local data lake
+            datasets: Registered datasets to (re)index; all by default
+        """
+        job = job or IndexingJob()
+        if self.bundle is not None:
+            job.set_stage('copying index bundle')
+            self._detach_bundle()
+        specs = [DATASETS.get(name) for name in datasets] if datasets else list(DATASETS)
+        print(f"Starting data indexing: {', '.join(spec.name for spec in specs)}...")
         
-        # Fetch rainfall data
-        print("Fetching rainfall data...")
-        rainfall_data = self.data_client.fetch_rainfall_data()
+        workers = max(1, min(Config.INDEX_WORKERS, len(specs)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='index-dataset') as pool:
+            built = list(pool.map(lambda spec: self._index_dataset(spec, job, source), specs))
         
-        if rainfall_data:
-            df_rainfall = self.data_processor.clean_rainfall_data(rainfall_data)
-            rainfall_docs = self.data_processor.format_for_embedding(df_rainfall, 'rainfall')
-            
-            # Generate embeddings
-            print(f"Generating embeddings for {len(rainfall_docs)} rainfall documents...")
-            rainfall_texts = [doc['text'] for doc in rainfall_docs]
-            rainfall_embeddings = self.embedding_generator.generate_embeddings(rainfall_texts)
-            rainfall_metadata = [doc['metadata'] for doc in rainfall_docs]
-            
-            # Add to vector store
-            self.vector_store.add_documents(rainfall_embeddings, rainfall_texts, rainfall_metadata)
+        # A dataset that came back empty keeps its current shards
+        shards, rebuilt, frames = {}, [], {}
+        for spec, (dataset_shards, df) in zip(specs, built):
+            if dataset_shards:
+                shards.update(dataset_shards)
+                rebuilt.append(spec.name)
+                frames[spec.name] = df
+        new_store = self.vector_store.with_shards(shards, replace_datasets=rebuilt)
         
-        # Save vector store
-        self.vector_store.save()
+        job.set_stage('building trend arrays')
+        trend_engine = self.trend_engine.with_frames(frames)
+        
+        # Entity gazetteer from the indexed values
+        job.set_stage('building gazetteer')
+        gazetteer = Gazetteer.build(new_store.metadata,
+                                    seeds=self.query_processor.seed_entities(),
+                                    exact_seeds=self.query_processor.source_entities())
+        job.set_stage('building record lookup')
+        record_lookup = RecordLookup.build(new_store, DATASETS.lookup_keys())
+        entity_coverage = self._build_coverage(new_store)
+        
+        # Last chance to cancel before anything live is touched
+        job.set_stage('saving')
+        new_store.save(shards=list(shards))
+        gazetteer.save(self._gazetteer_path())
+        
+        # Swap the new index in; in-flight queries finish on the old one
+        self.vector_store = new_store
+        self.record_lookup = record_lookup
+        self.entity_coverage = entity_coverage
+        self.trend_engine = trend_engine
+        self.query_processor.set_gazetteer(gazetteer)
         self.is_indexed = True
+        self.cache_manager.clear()
+        if self.gap_filler is not None:
+            self.gap_filler.clear()
+        job.set_stage('done')
         
         print("Data indexing completed!")
-        print(f"Total documents indexed: {self.vector_store.get_stats()['total_documents']}")
+        print(f"Total documents indexed: {new_store.get_stats()['total_documents']}")
+    
+    def reload_index(self) -> bool:
+        """
+        Load the index another worker saved at index_path in place of the current one
+        
+        Returns:
+            False if there is no saved index
+        """
+        vector_store = VectorStore(self.embedding_generator.get_embedding_dim(), self.index_path)
+        if not vector_store.load():
+            return False
+        if self.bundle is not None:
+            # The indexing worker detached from the bundle, including its lake
+            if self.bundle.lake_path and self.data_lake.root == self.bundle.lake_path:
+                self.data_lake = DataLake()
+            self.bundle = None
+        
+        self.vector_store = vector_store
+        self._load_gazetteer()
+        self.record_lookup = RecordLookup.build(vector_store, DATASETS.lookup_keys())
+        self.entity_coverage = self._build_coverage(vector_store)
+        if Config.TREND_ENGINE and self._lake_enabled():
+            try:
+                self.trend_engine = TrendEngine.from_lake(self.data_lake)
+            except Exception as e:
+                print(f"Error building trend arrays from data lake: {e}")
+        self.is_indexed = True
+        self.cache_manager.clear()
+        if self.gap_filler is not None:
+            self.gap_filler.clear()
+        
+        print(f"Loaded index saved by another worker: {vector_store.get_stats()['total_documents']} documents")
+        return True
     
-    def retrieve_context(self, query: str, k: int = 5) -> List[Dict]:
+    def _detach_bundle(self):
+        """
+        Move from the read-only bundle to a writable copy before re-indexing
+        
+        The bundle's index and lake are copied to the local index path and
+        data lake, and the copy is loaded in place of the bundle, so a rebuild
+        never modifies a bundle (whose checksums would then fail).
+        """
+        bundle = self.bundle
+        print(f"Copying index bundle {bundle.version} to {self.index_path} before re-indexing...")
+        shutil.copytree(bundle.index_path, self.index_path, dirs_exist_ok=True)
+        if bundle.lake_path and self.data_lake.root == bundle.lake_path:
+            shutil.copytree(bundle.lake_path, Config.DATA_LAKE_PATH, dirs_exist_ok=True)
+            self.data_lake = DataLake()
+        
+        vector_store = VectorStore(self.embedding_generator.get_embedding_dim(), self.index_path)
+        vector_store.load()
+        self.vector_store = vector_store
+        self.record_lookup = RecordLookup.build(vector_store, DATASETS.lookup_keys())
+        self.entity_coverage = self._build_coverage(vector_store)
+        self.bundle = None
+    
+    def _build_coverage(self, vector_store: VectorStore) -> EntityCoverage:
+        """Entity coverage for query-time gap fetching, if enabled"""
+        if self.gap_filler is None:
+            return None
+        return EntityCoverage.build(vector_store, DATASETS.filter_keys())
+    
+    def _index_dataset(self, spec: DatasetSpec, job: IndexingJob,
+                       source: str) -> Tuple[Dict[str, IndexShard], pd.DataFrame]:
+        """Fetch, clean and embed one dataset into new shards, keyed by shard name, with its cleaned rows"""
+        staging = VectorStore(self.embedding_generator.get_embedding_dim(),
+                              self.vector_store.index_path)
+        df = self._load_dataset(spec, job, source)
+        if not df.empty:
+            docs = self.data_processor.format_for_embedding(df, spec.name)
+            self._embed_documents(staging, docs, spec.name, job)
+            job.set_stage(f'building lexical index {spec.name}')
+            staging.build_lexical_index()
+        return staging.shards, df
+    
+    def _lake_enabled(self) -> bool:
+        return Config.DATA_LAKE_ENABLED and self.data_lake.available
+    
+    def _load_dataset(self, spec: DatasetSpec, job: IndexingJob, source: str) -> pd.DataFrame:
+        """
+        Get one cleaned dataset, from the data lake or by fetching and cleaning it
+        
+        Freshly fetched data is written back to the lake so later rebuilds
+        and aggregations can skip the API round trip.
+        """
+        name = spec.name
+        if source == 'lake' and self._lake_enabled() and self.data_lake.has(name):
+            job.set_stage(f'loading {name} from data lake')
+            df = self.data_lake.load(name)
+            job.advance(rows_cleaned=len(df))
+            return df
+        
+        job.set_stage(f'fetching {name}')
+        print(f"Fetching {name} data...")
+        fetched_at = format_timestamp()
+        records = self.data_client.fetch_dataset(name)
+        job.advance(pages_fetched=1)
+        if not records:
+            return pd.DataFrame()
+        
+        job.set_stage(f'cleaning {name}')
+        df = self.data_processor.clean(records, spec.schema)
+        job.advance(rows_cleaned=len(df))
+        
+        if self._lake_enabled() and not df.empty:
+            try:
+                self.data_lake.write(name, df, fetched_at=fetched_at)
+            except Exception as e:
+                print(f"Error writing {name} to data lake: {e}")
+        return df
+    
+    def _embed_documents(self, vector_store: VectorStore, docs: List[Dict], label: str,
+                         job: IndexingJob, batch_size: int = 512):
+        """Embed documents in batches into vector_store, reporting progress to job"""
+        job.set_stage(f'embedding {label}')
+        job.advance(docs_total=len(docs))
+        print(f"Generating embeddings for {len(docs)} {label} documents...")
+        
+        for start in range(0, len(docs), batch_size):
+            job.check_cancelled()
+            batch = docs[start:start + batch_size]
+            texts = [doc['text'] for doc in batch]
+            embeddings = self.embedding_generator.generate_embeddings(texts)
+            vector_store.add_documents(embeddings, texts, [doc['metadata'] for doc in batch])
+            job.advance(docs_embedded=len(batch))
+    
+    @timed('retrieve_context')
+    def retrieve_context(self, query: str, k: int = None, filters: Dict = None,
+                         datasets: List[str] = None, quotas: Dict = None,
+                         query_embedding: np.ndarray = None) -> List[Dict]:
         """
         Retrieve relevant context for query
         
+        Dense and BM25 candidates are fused with reciprocal rank, then
+        optionally reranked by a cross-encoder. At most k documents are
+        kept: those above the similarity floor, chosen by maximal marginal
+        relevance so near-duplicates do not crowd out other entities, and
+        cut at the first relevance cliff unless quotas ask for coverage.
+        
         Args:
             query: User query
             k: Number of documents to retrieve
+            filters: Optional metadata filters from the parsed query
+            datasets: Datasets to search, from the query type (all if omitted)
+            quotas: Entities that should each get a share of the k documents
+            query_embedding: Embedding of query if already computed
             
         Returns:
             List of relevant documents with metadata
         """
+        # Hold one store reference for the whole call; re-indexing may swap it
+        vector_store = self.vector_store
+        k = k or Config.RETRIEVAL_K
+        num_candidates = self._num_candidates(k, quotas)
+        
         # Generate query embedding
-        query_embedding = self.embedding_generator.generate_embedding(query)
+        if query_embedding is None:
+            check_deadline('embedding')
+            query_embedding = self.embedding_generator.generate_embedding(query)
+        check_deadline('vector search')
+        
+        shards = vector_store.route(datasets, states=(filters or {}).get('state'))
+        dense_results = vector_store.search(query_embedding, k=num_candidates,
+                                            filters=filters, shards=shards)
+        return self._complete_retrieval(vector_store, query, query_embedding, dense_results,
+                                        k, num_candidates, filters, shards, datasets, quotas)
+    
+    @timed('retrieve_batch')
+    def retrieve_batch(self, queries: List[str], filters: List[Dict], datasets: List[List[str]],
+                       quotas: List[Dict], k: int = None,
+                       embeddings: np.ndarray = None) -> List[List[Dict]]:
+        """
+        Retrieve context for many queries at once
+        
+        Same results as calling retrieve_context per query, but every query
+        is embedded in one encode call and queries routed to the same shards
+        share one multi-query vector search.
+        
+        Args:
+            queries: User queries
+            filters: Metadata filters per query
+            datasets: Datasets to search per query
+            quotas: Entity quotas per query
+            k: Number of documents to retrieve per query
+            embeddings: Query embeddings if already computed, one row per query
+            
+        Returns:
+            One document list per query
+        """
+        vector_store = self.vector_store
+        k = k or Config.RETRIEVAL_K
+        if not queries:
+            return []
+        if embeddings is None:
+            embeddings = self.embedding_generator.generate_embeddings(queries)
+        num_candidates = [self._num_candidates(k, query_quotas) for query_quotas in quotas]
+        
+        # Queries routed to the same shards are searched together
+        routes, groups = [], {}
+        for row, (query_filters, query_datasets) in enumerate(zip(filters, datasets)):
+            shards = vector_store.route(query_datasets, states=(query_filters or {}).get('state'))
+            routes.append(shards)
+            groups.setdefault(None if shards is None else tuple(shards), []).append(row)
         
-        # Search vector store
-        results = self.vector_store.search(query_embedding, k=k)
+        dense_results = [None] * len(queries)
+        for shards, rows in groups.items():
+            batch = vector_store.search_batch(embeddings[rows], k=max(num_candidates[row] for row in rows),
+                                              filters=[filters[row] for row in rows],
+                                              shards=None if shards is None else list(shards))
+            for row, results in zip(rows, batch):
+                dense_results[row] = results[:num_candidates[row]]
         
-        return results
+        return [
+            self._complete_retrieval(vector_store, queries[row], embeddings[row], dense_results[row],
+                                     k, num_candidates[row], filters[row], routes[row],
+                                     datasets[row], quotas[row])
+            for row in range(len(queries))
+        ]
+    
+    @staticmethod
+    def _num_candidates(k: int, quotas: Dict = None) -> int:
+        num_candidates = max(k, Config.RETRIEVAL_CANDIDATES)
+        if Config.DIVERSITY or quotas:
+            num_candidates = max(num_candidates, Config.DIVERSITY_CANDIDATES)
+        return num_candidates
+    
+    def _complete_retrieval(self, vector_store: VectorStore, query: str, query_embedding: np.ndarray,
+                            dense_results: List[Dict], k: int, num_candidates: int, filters: Dict,
+                            shards: List[str], datasets: List[str], quotas: Dict) -> List[Dict]:
+        """Widen an empty dense search, fuse it with BM25 and select the top k"""
+        # Widen to unfiltered and then to every shard when the routed search found nothing
+        if filters and not dense_results:
+            filters = None
+            shards = vector_store.route(datasets)
+            dense_results = vector_store.search(query_embedding, k=num_candidates, shards=shards)
+        if shards is not None and not dense_results:
+            shards = None
+            dense_results = vector_store.search(query_embedding, k=num_candidates)
+        
+        if not Config.HYBRID_SEARCH or not vector_store.has_lexical_index:
+            with span('rerank'):
+                return self._select(vector_store, query, dense_results, k, quotas)
+        
+        check_deadline('lexical search')
+        with span('lexical_search'):
+            lexical_results = vector_store.search_lexical(
+                query, k=num_candidates * 10 if filters else num_candidates, shards=shards
+            )
+        if filters:
+            lexical_results = [
+                (doc_id, score) for doc_id, score in lexical_results
+                if vector_store.matches_filters(vector_store.get_metadata(doc_id), filters)
+            ][:num_candidates]
+        
+        fused = reciprocal_rank_fusion(
+            [[doc['id'] for doc in dense_results], [doc_id for doc_id, _ in lexical_results]],
+            k=Config.RRF_K
+        )
+        
+        dense_by_id = {doc['id']: doc for doc in dense_results}
+        candidates = []
+        for doc_id, score in fused[:num_candidates]:
+            doc = dense_by_id.get(doc_id) or vector_store.get_document(doc_id, query_embedding)
+            doc['fusion_score'] = score
+            candidates.append(doc)
+        
+        with span('rerank'):
+            return self._select(vector_store, query, candidates, k, quotas)
+    
+    def _select(self, vector_store: VectorStore, query: str, candidates: List[Dict],
+                k: int, quotas: Dict = None) -> List[Dict]:
+        """Rerank candidates and keep a relevant, diverse top k"""
+        ranked = self.reranker.rerank(query, candidates)
+        if not Config.DIVERSITY and not quotas:
+            return select_by_relevance(ranked, k)
+        
+        pool = [doc for doc in ranked if doc.get('similarity', 0.0) >= Config.MIN_SIMILARITY]
+        if not pool:
+            return []
+        vectors = vector_store.get_vectors([doc['id'] for doc in pool])
+        selected = select_diverse(pool, vectors, k, quotas=quotas)
+        # A relevance cliff between the compared entities is expected; keep both sides
+        return selected if quotas else select_by_relevance(selected, k)
     
     def format_context(self, retrieved_docs: List[Dict]) -> str:
         """
@@ -124,12 +529,15 @@ class RAGPipeline:
         
         return "\n\n".join(context_parts)
     
-    def answer_query(self, query: str) -> Dict:
+    @timed('answer_query')
+    def answer_query(self, query: str, check_cache: bool = True) -> Dict:
         """
         Answer user query using RAG pipeline
         
         Args:
             query: User query
+            check_cache: Look the query up in the cache first; callers that
+                already did (see cached_answer) pass False
             
         Returns:
             Dictionary with answer and sources
@@ -142,32 +550,186 @@ class RAGPipeline:
             }
         
         # Check cache
-        cached_result = self.cache_manager.get('query', query=query)
+        cached_result = self.cached_answer(query) if check_cache else None
         if cached_result:
             print("Returning cached result")
             return cached_result
+        trace = current_trace()
         
         # Parse query
         query_info = self.query_processor.parse_query(query)
         
-        # Retrieve relevant context
-        retrieved_docs = self.retrieve_context(query, k=5)
+        # Retrieve relevant context, narrowed to the entities in the query and
+        # to the datasets its type is answered from
+        filters = self.query_processor.build_filters(query_info)
+        datasets = DATASETS.for_query_type(query_info['query_type'])
         
-        if not retrieved_docs:
-            return {
-                'answer': "I couldn't find relevant information in the database. Please try rephrasing your question.",
-                'sources': [],
-                'query_info': query_info
-            }
+        # Exact lookups are answered before the query is embedded
+        query_embedding = None
+        gap_pending = False
+        result = self.lookup_answer(query, query_info, filters, datasets)
+        if result is None:
+            # Rows for entities the index lacks are fetched while the query is classified
+            gap_fetches = self.gap_filler.submit(filters, datasets) if self.gap_filler else []
+            query_embedding = self.classify_query(query, query_info)
+            datasets = DATASETS.for_query_type(query_info['query_type'])
+            if gap_fetches:
+                inserted, gap_pending = self.gap_filler.wait(gap_fetches)
+                if inserted:
+                    result = self.lookup_answer(query, query_info, filters, datasets)
+        if result is None:
+            result = self.trend_answer(query, query_info)
+        if trace is not None:
+            trace.annotate(query_type=query_info['query_type'])
+        
+        if result is None:
+            quotas = self.query_processor.build_quotas(query_info)
+            retrieved_docs = self.retrieve_context(query, filters=filters, datasets=datasets,
+                                                   quotas=quotas, query_embedding=query_embedding)
+            if not retrieved_docs:
+                return self.no_context_answer(query_info)
+            result = self.generate_answer(query, query_info, retrieved_docs)
+        
+        # Cache result, unless it was answered without rows still being fetched
+        if not gap_pending:
+            self.cache_manager.set('query', result, query=query)
+        
+        return result
+    
+    def classify_query(self, query: str, query_info: Dict, query_embedding: np.ndarray = None,
+                       llm_fallback: bool = None) -> np.ndarray:
+        """
+        Set the query type and intent from the query embedding
+        
+        The local classifier decides when it is confident; otherwise the
+        LLM is asked, and the keyword rules of determine_query_type stand
+        if it gives no valid type. A structural keyword type (trend,
+        comparison, correlation) always stands; the classifier then only
+        supplies the intent. Updates query_info in place with query_type,
+        intent, intent_confidence and intent_source.
+        
+        Args:
+            query: User query
+            query_info: Output of parse_query
+            query_embedding: Embedding of query if already computed
+            llm_fallback: Ask the LLM about uncertain queries (INTENT_LLM_FALLBACK by default)
+            
+        Returns:
+            The query embedding, for retrieval to reuse, or None when
+            classification is disabled
+        """
+        if self.intent_classifier is None:
+            return query_embedding
+        if query_embedding is None:
+            check_deadline('embedding')
+            query_embedding = self.embedding_generator.generate_embedding(query)
+        
+        keyword_type = query_info['query_type']
+        with span('intent_classify'):
+            prediction = self.intent_classifier.classify(
+                query_embedding, keyword_type=None if keyword_type == 'general_query' else keyword_type
+            )
+        source = 'classifier'
+        if keyword_type in QueryProcessor.STRUCTURAL_TYPES:
+            # The keyword rule named the computation; the prediction only adds the intent
+            source = 'keywords'
+        elif prediction['confidence'] < Config.INTENT_CONFIDENCE:
+            source = 'keywords'
+            if Config.INTENT_LLM_FALLBACK if llm_fallback is None else llm_fallback:
+                extracted = self.llm_handler.extract_query_intent(query)
+                if extracted.get('type') in QueryProcessor.QUERY_TYPES:
+                    prediction = {'type': extracted['type'], 'confidence': None,
+                                  'intent': extracted.get('intent') or prediction['intent']}
+                    source = 'llm'
+        
+        if source != 'keywords':
+            query_info['query_type'] = prediction['type']
+        query_info.update(intent=prediction['intent'], intent_confidence=prediction['confidence'],
+                          intent_source=source)
+        trace = current_trace()
+        if trace is not None:
+            trace.annotate(intent=prediction['intent'], intent_source=source)
+        return query_embedding
+    
+    def lookup_answer(self, query: str, query_info: Dict, filters: Dict,
+                      datasets: List[str]) -> Dict:
+        """
+        Answer a fully specified record lookup without embedding, search
+        and (by default) the LLM
+        
+        Returns:
+            Answer dictionary, or None if the query is not an exact lookup
+        """
+        if not Config.LOOKUP_FAST_PATH or self.record_lookup is None:
+            return None
+        result = self._answer_lookup(query, query_info, filters, datasets)
+        trace = current_trace()
+        if result is not None and trace is not None:
+            trace.annotate(path='lookup')
+        return result
+    
+    def trend_answer(self, query: str, query_info: Dict) -> Dict:
+        """
+        Answer a trend question from the year-series arrays
+        
+        Returns:
+            Answer dictionary, or None if the query needs retrieval
+        """
+        if not Config.TREND_ENGINE or query_info['query_type'] != 'trend_analysis':
+            return None
+        result = self._answer_trend(query, query_info)
+        trace = current_trace()
+        if result is not None and trace is not None:
+            trace.annotate(path='trend')
+        return result
+    
+    @staticmethod
+    def no_context_answer(query_info: Dict) -> Dict:
+        return {
+            'answer': "I couldn't find relevant information in the database. Please try rephrasing your question.",
+            'sources': [],
+            'query_info': query_info
+        }
+    
+    def generate_answer(self, query: str, query_info: Dict, retrieved_docs: List[Dict],
+                        **llm_options) -> Dict:
+        """
+        Phrase an answer from retrieved documents with the LLM
         
+        Args:
+            query: User query
+            query_info: Parsed query
+            retrieved_docs: Context documents from retrieve_context
+            llm_options: Passed through to LLMHandler.generate_response
+            
+        Returns:
+            Dictionary with answer and sources
+        """
         # Format context
         context = self.format_context(retrieved_docs)
         
         # Generate answer using LLM
-        answer = self.llm_handler.generate_response(query, context)
+        answer = self.llm_handler.generate_response(query, context, query_type=query_info['query_type'],
+                                                    **llm_options)
         
-        # Prepare sources
-        sources = [
+        return {
+            'answer': answer,
+            'sources': self.format_sources(retrieved_docs),
+            'query_info': query_info
+        }
+    
+    def cached_answer(self, query: str) -> Dict:
+        """Cached answer for query, or None; cheap enough to serve while shedding load"""
+        cached_result = self.cache_manager.get('query', query=query)
+        trace = current_trace()
+        if trace is not None:
+            trace.annotate(cache='hit' if cached_result else 'miss')
+        return cached_result
+    
+    @staticmethod
+    def format_sources(docs: List[Dict]) -> List[Dict]:
+        """Source entries returned with an answer"""
+        return [
             {
                 'text': doc['document'][:200] + '...',  # Truncate for display
                 'source': doc['metadata'].get('source', 'Unknown'),
@@ -175,16 +737,143 @@ class RAGPipeline:
                 'metadata': doc['metadata'],
                 'relevance': doc['similarity']
             }
-            for doc in retrieved_docs
+            for doc in docs
         ]
+    
+    @timed('trend')
+    def _answer_trend(self, query: str, query_info: Dict, limit: int = 10) -> Dict:
+        """
+        Answer a trend question from batched statistics over every entity
+        
+        Named states or subdivisions are reported as asked; only a query that
+        names none is answered by ranking entities by relative slope, keeping
+        those moving in the asked direction, e.g. "which states saw declining
+        rice yield". Queries naming a place the statistics are not grouped by
+        (a district, or a state for rainfall) go to retrieval.
+        
+        Returns:
+            Answer dictionary, or None to fall back to retrieval
+        """
+        engine = self.trend_engine
+        metric = self.query_processor.trend_metric(query)
+        if not engine.has(metric):
+            return None
+        if query_info['districts'] or (metric == 'rainfall' and query_info['states']):
+            return None
+        entities = engine.entities(metric)
+        named = query_info['subdivisions'] if metric == 'rainfall' else query_info['states']
+        if any(name not in entities for name in named):
+            return None
+        
+        crop = None
+        if metric != 'rainfall':
+            crops = query_info['crops']
+            if len(crops) > 1:
+                return None
+            crop = crops[0] if crops else None
+        
+        years = engine.years(metric)
+        start, end = self.query_processor.trend_window(query_info, int(years[0]), int(years[-1]))
+        try:
+            stats = engine.trends(metric, crop=crop, start=start, end=end)
+        except (KeyError, ValueError):
+            return None
+        
+        direction = self.query_processor.trend_direction(query)
+        relative = stats['relative_slope']
+        # A slope needs at least three observed years
+        estimable = np.isfinite(relative) & (stats['observed'] >= 3)
+        sparse = []
+        if named:
+            rows = [entities.index(name) for name in named]
+            sparse = [entities[row] for row in rows if not estimable[row]]
+            rows = [row for row in rows if estimable[row]]
+        else:
+            candidates = np.flatnonzero(estimable)
+            # Steepest first in the asked direction, or by magnitude when none was asked
+            if direction:
+                candidates = candidates[np.sign(relative[candidates]) == direction]
+                order = np.argsort(-relative[candidates] * direction)
+            else:
+                order = np.argsort(-np.abs(relative[candidates]))
+            rows = candidates[order][:limit].tolist()
+        if not rows:
+            return None
+        
+        spec = DATASETS.get(engine.dataset(metric))
+        unit = engine.unit(metric)
+        subject = f"{crop} {metric}" if crop else metric
+        docs = []
+        for row in rows:
+            line = (f"{entities[row]}: {subject} went from {stats['first'][row]:.2f} {unit} in "
+                    f"{stats['first_year'][row]:.0f} to {stats['last'][row]:.2f} {unit} in "
+                    f"{stats['last_year'][row]:.0f}, a trend of {relative[row]:+.1%} per year")
+            if np.isfinite(stats['cagr'][row]):
+                line += f" (CAGR {stats['cagr'][row]:+.1%})"
+            if np.isfinite(stats['change_year'][row]):
+                line += (f"; the largest shift in level, {stats['change'][row]:+.2f} {unit}, "
+                         f"came from {stats['change_year'][row]:.0f}")
+            metadata = {
+                'type': spec.name,
+                'state' if metric != 'rainfall' else 'subdivision': entities[row],
+                'metric': metric,
+                'window': [start, end],
+                'slope': float(stats['slope'][row]),
+                'cagr': None if np.isnan(stats['cagr'][row]) else float(stats['cagr'][row]),
+                'source': spec.source
+            }
+            if crop:
+                metadata['crop'] = crop
+            docs.append({'document': line + '.', 'metadata': metadata, 'similarity': 1.0})
+        
+        if Config.TREND_LLM_PHRASING:
+            answer = self.llm_handler.generate_response(query, self.format_context(docs),
+                                                        query_type=query_info['query_type'])
+        else:
+            heading = f"Trend in {subject} between {start} and {end}"
+            if not named and direction:
+                heading += f", {'declining' if direction < 0 else 'increasing'} entities steepest first"
+            answer = heading + ":\n" + "\n".join(f"- {doc['document']}" for doc in docs)
+        if sparse:
+            answer += (f"\n\nNot enough {subject} data between {start} and {end} to estimate "
+                       f"a trend for {', '.join(sparse)}.")
+        if not Config.TREND_LLM_PHRASING:
+            answer += f"\n\nSource: {spec.source}"
         
-        result = {
+        return {
             'answer': answer,
-            'sources': sources,
+            'sources': self.format_sources(docs),
             'query_info': query_info
         }
+    
+    @timed('lookup')
+    def _answer_lookup(self, query: str, query_info: Dict, filters: Dict,
+                       datasets: List[str]) -> Dict:
+        """
+        Answer a fully specified record lookup from the composite-key index
+        
+        Applies to queries of a single-dataset type, or general queries, that
+        name one value for every key field, e.g. a district, crop and year.
         
-        # Cache result
-        self.cache_manager.set('query', result, query=query)
+        Returns:
+            Answer dictionary, or None to fall back to retrieval
+        """
+        if not datasets and query_info['query_type'] != 'general_query':
+            return None
+        docs = self.record_lookup.find(filters, datasets or DATASETS.names())
+        if not docs or len(docs) > Config.RETRIEVAL_K:
+            return None
         
-        return result
\ No newline at end of file
+        for doc in docs:
+            doc['similarity'] = 1.0
+        if Config.LOOKUP_LLM_PHRASING:
+            answer = self.llm_handler.generate_response(query, self.format_context(docs), route='fast')
+        else:
+            sources = ', '.join(dict.fromkeys(doc['metadata'].get('source', 'Unknown') for doc in docs))
+            answer = "\n\n".join(doc['document'] for doc in docs) + f"\n\nSource: {sources}"
+        
+        return {
+            'answer': answer,
+            'sources': self.format_sources(docs),
+            'query_info': query_info
+        }
\ No newline at end of file
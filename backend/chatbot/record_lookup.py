@@ -0,0 +1,99 @@
+# backend/chatbot/record_lookup.py
+import threading
+from itertools import product
+from typing import Dict, List, Optional, Tuple
+from embeddings.vector_store import VectorStore
+
+
+class RecordLookup:
+    """Composite-key hash index from exact entity values to indexed documents"""
+
+    def __init__(self, vector_store: VectorStore, keys: Dict[str, Tuple[str, ...]]):
+        """
+        Initialize record lookup
+
+        Args:
+            vector_store: Store whose document ids are indexed; lookups read from it
+            keys: Dataset name -> metadata fields forming its key
+        """
+        self.vector_store = vector_store
+        self.keys = keys
+        self.table = {}
+        # Query-time gap fetches add documents while requests look keys up
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, vector_store: VectorStore, keys: Dict[str, Tuple[str, ...]]) -> 'RecordLookup':
+        """
+        Index every document of a vector store under its composite key
+
+        Args:
+            vector_store: Indexed vector store
+            keys: Dataset name -> metadata fields forming its key
+
+        Returns:
+            Populated record lookup
+        """
+        lookup = cls(vector_store, keys)
+        for doc_id, metadata in vector_store.metadata_items():
+            lookup.add(doc_id, metadata)
+        print(f"Record lookup built: {len(lookup.table)} keys")
+        return lookup
+
+    def add(self, doc_id: int, metadata: Dict):
+        """Index one document; list values (grouped documents) add a key per value"""
+        dataset = metadata.get('type')
+        fields = self.keys.get(dataset)
+        if not fields:
+            return
+        values = [metadata.get(field) for field in fields]
+        if any(value is None for value in values):
+            return
+        with self._lock:
+            for combination in product(*(v if isinstance(v, list) else [v] for v in values)):
+                self.table.setdefault((dataset,) + combination, []).append(doc_id)
+
+    def key_for(self, dataset: str, entities: Dict[str, List]) -> Optional[Tuple]:
+        """Key for a dataset if the entities name exactly one value per key field"""
+        fields = self.keys.get(dataset)
+        if not fields:
+            return None
+        values = []
+        for field in fields:
+            named = entities.get(field) or []
+            if len(named) != 1:
+                return None
+            values.append(named[0])
+        return (dataset,) + tuple(values)
+
+    def find(self, entities: Dict[str, List], datasets: List[str]) -> List[Dict]:
+        """
+        Documents matching a fully specified key
+
+        Args:
+            entities: Metadata field -> values named in the query (build_filters output);
+                fields outside the key, such as state or season, must also match
+            datasets: Datasets to try, in order
+
+        Returns:
+            Documents in search-result shape, or an empty list if no key is fully specified
+        """
+        for dataset in datasets:
+            key = self.key_for(dataset, entities)
+            if key is None:
+                continue
+            with self._lock:
+                doc_ids = list(self.table.get(key, ()))
+            docs = []
+            for doc_id in doc_ids:
+                doc = self.vector_store.get_document(doc_id)
+                if self.vector_store.matches_filters(doc['metadata'], entities):
+                    docs.append(doc)
+            if docs:
+                return docs
+        return []
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return len(self.table)
@@ -19,9 +19,103 @@ class Config:
     LLM_PROVIDER = os.getenv('LLM_PROVIDER', 'groq')
     LLM_MODEL = os.getenv('LLM_MODEL', 'mixtral-8x7b-32768')
     EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+    LLM_TIMEOUT_SECONDS = float(os.getenv('LLM_TIMEOUT_SECONDS', 60))  # provider call timeout outside a request deadline
+    LLM_BASE_URL = os.getenv('LLM_BASE_URL', '')  # override the provider endpoint, e.g. a stub LLM server
+    LLM_MAX_TOKENS = int(os.getenv('LLM_MAX_TOKENS', 1024))
+    
+    # Model Routing Settings
+    LLM_FAST_MODEL = os.getenv('LLM_FAST_MODEL', 'llama-3.1-8b-instant' if LLM_PROVIDER == 'groq' else 'gpt-4o-mini')
+    LLM_FAST_MAX_TOKENS = int(os.getenv('LLM_FAST_MAX_TOKENS', 384))
+    LLM_FAST_MAX_CONTEXT_CHARS = int(os.getenv('LLM_FAST_MAX_CONTEXT_CHARS', 6000))  # longer contexts use the large model
+    # query_type:route pairs (fast or large); unlisted query types use the large model
+    LLM_ROUTING = os.getenv('LLM_ROUTING', 'agriculture_query:fast,climate_query:fast,ranking:fast,general_query:fast')
+    
+    # Retrieval Settings
+    RETRIEVAL_K = int(os.getenv('RETRIEVAL_K', 5))
+    RETRIEVAL_CANDIDATES = int(os.getenv('RETRIEVAL_CANDIDATES', 20))
+    HYBRID_SEARCH = os.getenv('HYBRID_SEARCH', 'True') == 'True'
+    RRF_K = int(os.getenv('RRF_K', 60))
+    RERANK_MODEL = os.getenv('RERANK_MODEL', '')  # e.g. cross-encoder/ms-marco-MiniLM-L-6-v2
+    RERANK_BUDGET_MS = int(os.getenv('RERANK_BUDGET_MS', 150))
+    MIN_SIMILARITY = float(os.getenv('MIN_SIMILARITY', 0.2))  # cosine floor for context docs
+    RELEVANCE_CLIFF = float(os.getenv('RELEVANCE_CLIFF', 0.1))  # similarity drop that ends the context
+    MIN_CONTEXT_DOCS = int(os.getenv('MIN_CONTEXT_DOCS', 1))
+    DIVERSITY = float(os.getenv('DIVERSITY', 0.3))  # MMR trade-off: 0 ranks by relevance only
+    DIVERSITY_CANDIDATES = int(os.getenv('DIVERSITY_CANDIDATES', 50))  # pool the diverse top-k is drawn from
+    LOOKUP_FAST_PATH = os.getenv('LOOKUP_FAST_PATH', 'True') == 'True'  # answer exact lookups without retrieval
+    LOOKUP_LLM_PHRASING = os.getenv('LOOKUP_LLM_PHRASING', 'False') == 'True'  # phrase lookup answers with the LLM
+    TREND_ENGINE = os.getenv('TREND_ENGINE', 'True') == 'True'  # answer trend questions from year-series arrays
+    TREND_LLM_PHRASING = os.getenv('TREND_LLM_PHRASING', 'False') == 'True'
+    TREND_CACHE_SIZE = int(os.getenv('TREND_CACHE_SIZE', 256))  # trend statistics kept per (metric, crop, window)
+    
+    # Intent Classification Settings
+    INTENT_CLASSIFIER = os.getenv('INTENT_CLASSIFIER', 'True') == 'True'  # classify query type from its embedding
+    INTENT_CONFIDENCE = float(os.getenv('INTENT_CONFIDENCE', 0.5))  # below this the LLM or keyword rules decide
+    INTENT_LLM_FALLBACK = os.getenv('INTENT_LLM_FALLBACK', 'True') == 'True'
+    INTENT_TEMPERATURE = float(os.getenv('INTENT_TEMPERATURE', 0.05))
+    INTENT_KEYWORD_PRIOR = float(os.getenv('INTENT_KEYWORD_PRIOR', 1.0))  # logit bonus for the keyword-matched type
+    
+    # Gap Fetch Settings
+    # Fetched rows live in the serving store only: dense search and exact lookups
+    # see them, BM25, trend answers and the data lake do not, and they are gone
+    # after a restart or reload until a fetch (GAP_FETCH_TTL apart) adds them again
+    GAP_FETCH = os.getenv('GAP_FETCH', 'True') == 'True'  # fetch rows for entities missing from the index at query time
+    GAP_FETCH_BUDGET_MS = int(os.getenv('GAP_FETCH_BUDGET_MS', 300))  # wait for fetches before answering; 0 submits only
+    GAP_FETCH_LIMIT = int(os.getenv('GAP_FETCH_LIMIT', 1000))  # rows per filtered fetch
+    GAP_FETCH_MAX_CALLS = int(os.getenv('GAP_FETCH_MAX_CALLS', 4))  # fetches started per query
+    GAP_FETCH_WORKERS = int(os.getenv('GAP_FETCH_WORKERS', 2))
+    GAP_FETCH_MAX_PENDING = int(os.getenv('GAP_FETCH_MAX_PENDING', 16))  # further gaps wait for a later query
+    GAP_FETCH_TTL = int(os.getenv('GAP_FETCH_TTL', 3600))  # seconds before an empty or failed fetch is retried
+    
+    # Admission Control Settings
+    QUERY_DEADLINE_SECONDS = float(os.getenv('QUERY_DEADLINE_SECONDS', 30))
+    MAX_CONCURRENT_QUERIES = int(os.getenv('MAX_CONCURRENT_QUERIES', 4))  # per worker process
+    QUERY_QUEUE_SIZE = int(os.getenv('QUERY_QUEUE_SIZE', 8))  # waiting queries before 429s
+    QUERY_QUEUE_TIMEOUT_SECONDS = float(os.getenv('QUERY_QUEUE_TIMEOUT_SECONDS', 5))  # wait before 503
+    
+    # Batch Question Answering Settings
+    BATCH_SIZE = int(os.getenv('BATCH_SIZE', 64))  # questions parsed, embedded and searched together
+    BATCH_LLM_CONCURRENCY = int(os.getenv('BATCH_LLM_CONCURRENCY', 4))
+    BATCH_LLM_RATE = float(os.getenv('BATCH_LLM_RATE', 0.5))  # LLM calls per second; set to the provider's limit
+    BATCH_LLM_RETRIES = int(os.getenv('BATCH_LLM_RETRIES', 2))
+    
+    # Startup Settings
+    PRELOAD_APP = os.getenv('PRELOAD_APP', 'True') == 'True'
+    INDEX_MMAP = os.getenv('INDEX_MMAP', 'True') == 'True'
+    INDEX_BUNDLE_PATH = os.getenv('INDEX_BUNDLE_PATH', 'index_bundles')  # prebuilt bundles served without a local index
+    INDEX_BUNDLE_VERSION = os.getenv('INDEX_BUNDLE_VERSION', '')  # pin a bundle; newest valid by default
+    INDEX_BUNDLE_VERIFY = os.getenv('INDEX_BUNDLE_VERIFY', 'size')  # size or checksum (hashes every file at startup)
+    
+    # Index Compression Settings
+    INDEX_COMPRESSION = os.getenv('INDEX_COMPRESSION', 'none')  # none, fp16, sq8 or pq
+    PQ_SUBQUANTIZERS = int(os.getenv('PQ_SUBQUANTIZERS', 48))  # must divide the embedding dim
+    COMPRESSED_RERANK_FACTOR = int(os.getenv('COMPRESSED_RERANK_FACTOR', 10))
+    
+    # Observability Settings
+    METRICS_SAMPLE_RATE = float(os.getenv('METRICS_SAMPLE_RATE', 1.0))  # 0 disables stage timing
+    QUERY_LOG_PATH = os.getenv('QUERY_LOG_PATH', '')  # directory for replayable query logs; empty disables
+    QUERY_LOG_SAMPLE_RATE = float(os.getenv('QUERY_LOG_SAMPLE_RATE', 1.0))
+    QUERY_LOG_MAX_BYTES = int(os.getenv('QUERY_LOG_MAX_BYTES', 10_000_000))  # per file before rotating
+    QUERY_LOG_BACKUPS = int(os.getenv('QUERY_LOG_BACKUPS', 5))
+    
+    # Indexing Settings
+    INDEX_WORKERS = int(os.getenv('INDEX_WORKERS', 2))  # datasets ingested in parallel
+    SHARD_BY_STATE = os.getenv('SHARD_BY_STATE', 'False') == 'True'
+    SEARCH_WORKERS = int(os.getenv('SEARCH_WORKERS', 4))  # shards searched in parallel
+    # dataset:policy pairs consolidating rows before embedding, e.g. rainfall:subdivision_decade
+    DOCUMENT_GROUPING = os.getenv('DOCUMENT_GROUPING', 'crop_production:district_crop_year')
+    
+    # Data Lake Settings
+    DATA_LAKE_PATH = os.getenv('DATA_LAKE_PATH', 'data_lake')
+    DATA_LAKE_ENABLED = os.getenv('DATA_LAKE_ENABLED', 'True') == 'True'
     
     # Cache Settings
     CACHE_DURATION = int(os.getenv('CACHE_DURATION', 3600))
+    CACHE_SNAPSHOT_PATH = os.getenv('CACHE_SNAPSHOT_PATH', 'cache_snapshot.pkl')
+    CACHE_SNAPSHOT_INTERVAL = int(os.getenv('CACHE_SNAPSHOT_INTERVAL', 300))  # seconds between snapshots
+    CACHE_SNAPSHOT_SIZE = int(os.getenv('CACHE_SNAPSHOT_SIZE', 200))  # hottest answers persisted
+    WARMUP_TOP_N = int(os.getenv('WARMUP_TOP_N', 0))  # frequent queries precomputed at startup
+    WARMUP_RATE = float(os.getenv('WARMUP_RATE', 0.5))  # warm-up queries per second
     
     # Data.gov.in API Base URL
     DATA_GOV_BASE_URL = "https://api.data.gov.in/resource/"
\ No newline at end of file
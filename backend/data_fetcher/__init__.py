@@ -2,5 +2,9 @@
 from .data_gov_client import DataGovClient
 from .data_processor import DataProcessor
 from .cache_manager import CacheManager
+from .data_lake import DataLake
+from .registry import DATASETS, DatasetRegistry, DatasetSpec, GroupingPolicy
+from .trend_engine import TrendEngine
 
-__all__ = ['DataGovClient', 'DataProcessor', 'CacheManager']
\ No newline at end of file
+__all__ = ['DataGovClient', 'DataProcessor', 'CacheManager', 'DataLake',
+           'DATASETS', 'DatasetRegistry', 'DatasetSpec', 'GroupingPolicy', 'TrendEngine']
\ No newline at end of file
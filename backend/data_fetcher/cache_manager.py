@@ -1,9 +1,13 @@
 # backend/data_fetcher/cache_manager.py
 from cachetools import TTLCache
+from collections import Counter
 import hashlib
 import json
-from typing import Any, Optional
+import threading
+import time
+from typing import Any, Dict, List, Optional
 from config import Config
+from utils.metrics import metrics
 
 class CacheManager:
     """Manage caching of API responses"""
@@ -18,6 +22,15 @@ class CacheManager:
         """
         self.ttl = ttl or Config.CACHE_DURATION
         self.cache = TTLCache(maxsize=maxsize, ttl=self.ttl)
+        self.hits = 0
+        self.misses = 0
+        # Per-entry hit counts and write times, for snapshots of the hot entries
+        self.entry_hits = Counter()
+        self.written_at = {}
+        # Restored entries expire at written_at + ttl rather than a full TTL after restore
+        self.expires_at = {}
+        # Request threads of a worker share the cache; TTLCache is not thread-safe
+        self._lock = threading.Lock()
     
     @staticmethod
     def _generate_key(prefix: str, **kwargs) -> str:
@@ -26,25 +39,118 @@ class CacheManager:
         hash_obj = hashlib.md5(key_data.encode())
         return f"{prefix}:{hash_obj.hexdigest()}"
     
+    def _expire_restored(self, now: float):
+        """Evict restored entries past their original deadline; call with the lock held"""
+        for key in [key for key, deadline in self.expires_at.items() if deadline <= now]:
+            self.cache.pop(key, None)
+            del self.expires_at[key]
+    
+    def _live(self, key: str) -> bool:
+        """Whether key is cached and not past a restored deadline; call with the lock held"""
+        deadline = self.expires_at.get(key)
+        if deadline is not None and deadline <= time.time():
+            self.cache.pop(key, None)
+            del self.expires_at[key]
+        return key in self.cache
+    
     def get(self, prefix: str, **kwargs) -> Optional[Any]:
         """Get item from cache"""
         key = self._generate_key(prefix, **kwargs)
-        return self.cache.get(key)
+        with self._lock:
+            value = self.cache.get(key) if self._live(key) else None
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.entry_hits[key] += 1
+        metrics.inc('samarth_cache_requests_total', prefix=prefix,
+                    result='miss' if value is None else 'hit')
+        
+        return value
     
     def set(self, prefix: str, value: Any, **kwargs):
         """Set item in cache"""
         key = self._generate_key(prefix, **kwargs)
-        self.cache[key] = value
+        with self._lock:
+            self.cache[key] = value
+            self.written_at[key] = time.time()
+            self.expires_at.pop(key, None)
+    
+    def contains(self, prefix: str, **kwargs) -> bool:
+        """Whether an entry is cached, without counting a lookup"""
+        key = self._generate_key(prefix, **kwargs)
+        with self._lock:
+            return self._live(key)
     
     def clear(self):
         """Clear all cache"""
-        self.cache.clear()
+        with self._lock:
+            self.cache.clear()
+            self.entry_hits.clear()
+            self.written_at.clear()
+            self.expires_at.clear()
+    
+    def hot_entries(self, limit: int) -> List[Dict]:
+        """
+        Most-hit live entries, for persisting across restarts
+        
+        Args:
+            limit: Maximum number of entries
+            
+        Returns:
+            List of dicts with key, value, hits and written_at
+        """
+        with self._lock:
+            self.cache.expire()
+            self._expire_restored(time.time())
+            # Forget bookkeeping for entries that expired or were evicted
+            for key in [key for key in self.written_at if key not in self.cache]:
+                self.written_at.pop(key, None)
+                self.entry_hits.pop(key, None)
+                self.expires_at.pop(key, None)
+            # Copies, so sorting does not race writers
+            written_at = dict(self.written_at)
+            entry_hits = dict(self.entry_hits)
+            values = dict(self.cache.items())
+        
+        live = sorted(written_at, key=lambda key: (entry_hits.get(key, 0), written_at[key]), reverse=True)
+        return [{'key': key, 'value': values[key], 'hits': entry_hits.get(key, 0),
+                 'written_at': written_at[key]}
+                for key in live[:limit] if values.get(key) is not None]
+    
+    def restore(self, entries: List[Dict]) -> int:
+        """
+        Load entries saved by hot_entries, skipping any older than the TTL
+        
+        A restored entry keeps its original lifetime: it expires at
+        written_at + ttl, not a full TTL after the restart.
+        
+        Returns:
+            Number of entries restored
+        """
+        now = time.time()
+        restored = 0
+        with self._lock:
+            for entry in entries:
+                if now - entry['written_at'] >= self.ttl or entry['key'] in self.cache:
+                    continue
+                self.cache[entry['key']] = entry['value']
+                self.written_at[entry['key']] = entry['written_at']
+                self.entry_hits[entry['key']] = entry['hits']
+                self.expires_at[entry['key']] = entry['written_at'] + self.ttl
+                restored += 1
+        return restored
     
     def get_stats(self) -> dict:
         """Get cache statistics"""
-        return {
-            'size': len(self.cache),
-            'maxsize': self.cache.maxsize,
-            'ttl': self.ttl,
-            'currsize': self.cache.currsize
-        }
\ No newline at end of file
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.cache),
+                'maxsize': self.cache.maxsize,
+                'ttl': self.ttl,
+                'currsize': self.cache.currsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
\ No newline at end of file
@@ -2,20 +2,21 @@
 import requests
 from typing import Dict, List, Optional
 from config import Config
+from utils.metrics import timed
+from .registry import DATASETS, DatasetRegistry
 
 class DataGovClient:
     """Client for interacting with data.gov.in API"""
 
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, registry: DatasetRegistry = None):
         self.api_key = api_key or Config.DATA_GOV_API_KEY
         self.base_url = Config.DATA_GOV_BASE_URL
+        self.registry = registry or DATASETS
 
-        # Correct resource IDs as per your images
-        self.RESOURCE_IDS = {
-            'crop_production': '35be999b-0208-4354-b557-f6ca9a5355de',  # District-wise crop production statistics
-            'rainfall': '8e0bd482-4aba-4d99-9cb9-ff124f6f1c2f',        # Sub Divisional Monthly Rainfall
-        }
+        # Resource IDs of the registered datasets
+        self.RESOURCE_IDS = self.registry.resource_ids()
 
+    @timed('data_gov_fetch')
     def fetch_data(self, resource_id: str, filters: Dict = None, limit: int = 100, offset: int = 0) -> Dict:
         """
         Fetch data from data.gov.in API
@@ -51,33 +52,30 @@ class DataGovClient:
             print(f"Error fetching data: {e}")
             return {'records': [], 'error': str(e)}
 
+    def fetch_dataset(self, name: str, limit: int = 1000, **filters) -> List[Dict]:
+        """
+        Fetch records of a registered dataset
+
+        Args:
+            name: Dataset name in the registry
+            limit: Number of records to fetch
+            **filters: Keyword filters declared by the dataset, e.g. state='Punjab'
+
+        Returns:
+            List of raw records
+        """
+        spec = self.registry.get(name)
+        result = self.fetch_data(spec.resource_id, spec.api_filters(**filters), limit=limit)
+        print(f"Raw {spec.name} data result - first record:", (result.get('records') or [None])[0])
+        return result.get('records', [])
+
     def fetch_crop_production(self, state: str = None, district: str = None, crop: str = None, year: str = None) -> List[Dict]:
         """Fetch crop production data with filters"""
-        filters = {}
-        if state:
-            filters['State Name'] = state
-        if district:
-            filters['District Name'] = district
-        if crop:
-            filters['Crop'] = crop
-        if year:
-            filters['Crop Year'] = year
-            
-        result = self.fetch_data(self.RESOURCE_IDS['crop_production'], filters, limit=1000)
-        print("Raw crop data result - first record:", result.get('records', [None])[0])
-        return result.get('records', [])
+        return self.fetch_dataset('crop_production', state=state, district=district, crop=crop, year=year)
 
     def fetch_rainfall_data(self, subdivision: str = None, year: str = None) -> List[Dict]:
         """Fetch rainfall data with filters"""
-        filters = {}
-        if subdivision:
-            filters['SUBDIVISION'] = subdivision
-        if year:
-            filters['YEAR'] = year
-            
-        result = self.fetch_data(self.RESOURCE_IDS['rainfall'], filters, limit=1000)
-        print("Raw rainfall data result - first record:", result.get('records', [None])[0])
-        return result.get('records', [])
+        return self.fetch_dataset('rainfall', subdivision=subdivision, year=year)
 
     def search_resources(self, query: str) -> List[Dict]:
         search_url = "https://api.data.gov.in/catalog/search"
@@ -0,0 +1,161 @@
+# backend/data_fetcher/data_lake.py
+import json
+import os
+import shutil
+import threading
+import pandas as pd
+from typing import Dict, List, Optional
+from config import Config
+from utils.helpers import format_timestamp
+
+
+class DataLake:
+    """Local Parquet snapshot of cleaned datasets, partitioned by year"""
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, root: str = None):
+        """
+        Initialize data lake
+
+        Args:
+            root: Directory holding one sub-directory per dataset
+        """
+        self.root = root or Config.DATA_LAKE_PATH
+        # Datasets are written from parallel indexing threads; the manifest is shared
+        self._manifest_lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        """Whether pyarrow is installed"""
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.root, self.MANIFEST)
+
+    def manifest(self) -> Dict:
+        """Row counts, schema, partitions and fetch time per dataset"""
+        path = self._manifest_path()
+        if not os.path.exists(path):
+            return {'datasets': {}}
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest: Dict):
+        tmp_path = self._manifest_path() + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self._manifest_path())
+
+    def has(self, name: str) -> bool:
+        return name in self.manifest()['datasets']
+
+    def write(self, name: str, df: pd.DataFrame, fetched_at: str = None,
+              partition_by: str = 'year') -> Dict:
+        """
+        Write a cleaned dataset, replacing any previous snapshot of it
+
+        Args:
+            name: Dataset name, e.g. 'crop_production'
+            df: Cleaned DataFrame
+            fetched_at: When the source data was fetched (defaults to now)
+            partition_by: Column used for directory partitioning
+
+        Returns:
+            Manifest entry for the dataset
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        os.makedirs(self.root, exist_ok=True)
+        dataset_path = os.path.join(self.root, name)
+        staging_path = dataset_path + ".staging"
+        shutil.rmtree(staging_path, ignore_errors=True)
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        partitioning = None
+        if partition_by in df.columns:
+            partitioning = ds.partitioning(pa.schema([table.schema.field(partition_by)]), flavor='hive')
+        ds.write_dataset(table, staging_path, format='parquet', partitioning=partitioning,
+                         existing_data_behavior='overwrite_or_ignore')
+
+        # Swap the new snapshot in so concurrent readers never see a partial write
+        previous_path = dataset_path + ".previous"
+        shutil.rmtree(previous_path, ignore_errors=True)
+        if os.path.exists(dataset_path):
+            os.rename(dataset_path, previous_path)
+        os.rename(staging_path, dataset_path)
+        shutil.rmtree(previous_path, ignore_errors=True)
+
+        entry = {
+            'rows': len(df),
+            'schema': {column: str(dtype) for column, dtype in df.dtypes.items()},
+            'partition_by': partition_by if partitioning is not None else None,
+            'partitions': sorted(int(v) for v in df[partition_by].dropna().unique())
+                          if partitioning is not None else [],
+            'fetched_at': fetched_at or format_timestamp(),
+            'written_at': format_timestamp()
+        }
+        with self._manifest_lock:
+            manifest = self.manifest()
+            manifest['datasets'][name] = entry
+            self._write_manifest(manifest)
+
+        print(f"Data lake: wrote {len(df)} rows of {name} to {dataset_path}")
+        return entry
+
+    def load(self, name: str, columns: Optional[List[str]] = None,
+             years: Optional[List[int]] = None) -> pd.DataFrame:
+        """
+        Load a dataset, reading only the requested columns and year partitions
+
+        Files are memory-mapped, so untouched columns and partitions are never read.
+
+        Args:
+            name: Dataset name
+            columns: Columns to load (all if omitted)
+            years: Year partitions to load (all if omitted)
+
+        Returns:
+            DataFrame with the stored dtypes restored
+        """
+        import pyarrow.dataset as ds
+        from pyarrow import fs
+
+        entry = self.manifest()['datasets'].get(name)
+        if entry is None:
+            raise KeyError(f"Dataset {name} is not in the data lake at {self.root}")
+
+        partition_by = entry.get('partition_by')
+        dataset = ds.dataset(os.path.join(self.root, name), format='parquet',
+                             partitioning='hive' if partition_by else None,
+                             filesystem=fs.LocalFileSystem(use_mmap=True))
+
+        filter_expr = None
+        if years is not None and partition_by:
+            filter_expr = ds.field(partition_by).isin([int(y) for y in years])
+
+        table = dataset.to_table(columns=columns, filter=filter_expr)
+        df = table.to_pandas()
+
+        # Partition columns come back with Arrow's inferred type; restore the stored one
+        schema = entry['schema']
+        for column in df.columns:
+            stored = schema.get(column)
+            if stored and stored != str(df[column].dtype):
+                try:
+                    df[column] = df[column].astype(stored)
+                except (TypeError, ValueError):
+                    pass
+
+        if columns is None:
+            df = df[[c for c in schema if c in df.columns]]
+        return df
+
+    def get_stats(self) -> Dict:
+        """Row counts per dataset"""
+        return {name: entry['rows'] for name, entry in self.manifest()['datasets'].items()}
@@ -1,78 +1,55 @@
 # backend/data_fetcher/data_processor.py
+import numpy as np
 import pandas as pd
 from typing import List, Dict
+from .schemas import DatasetSchema, CROP_SCHEMA, RAINFALL_SCHEMA
+from .registry import DATASETS, GroupingPolicy, _Row
 
 class DataProcessor:
     """Process and clean data from data.gov.in"""
 
+    @staticmethod
+    def clean(data: List[Dict], schema: DatasetSchema) -> pd.DataFrame:
+        """
+        Clean raw records with a declarative schema
+        
+        Args:
+            data: Raw API records
+            schema: Dataset schema describing columns, types and required fields
+            
+        Returns:
+            Typed DataFrame (categorical text, compact ints, float32 measures)
+        """
+        return schema.parse(data)
+
     @staticmethod
     def clean_crop_data(data: List[Dict]) -> pd.DataFrame:
         """Clean and standardize crop production data"""
-        if not data:
-            return pd.DataFrame()
-
-        df = pd.DataFrame(data)
-
-        # Exact column names from API
-        column_mapping = {
-            'state_name': 'state',
-            'district_name': 'district',
-            'crop_year': 'year',
-            'season': 'season',
-            'crop': 'crop',
-            'area_': 'area_hectares',
-            'production_': 'production_tonnes'
-        }
-
-        df = df.rename(columns=column_mapping)
-
-        # Convert numeric columns
-        numeric_cols = ['area_hectares', 'production_tonnes', 'year']
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-
-        # Calculate yield
-        if 'area_hectares' in df.columns and 'production_tonnes' in df.columns:
-            df['yield_tonnes_per_hectare'] = df['production_tonnes'] / df['area_hectares']
-
-        # Clean text columns
-        text_cols = ['state', 'district', 'crop', 'season']
-        for col in text_cols:
-            if col in df.columns:
-                df[col] = df[col].astype(str).str.strip().str.title()
-
-        return df.dropna(subset=['state', 'crop'])
+        return DataProcessor.clean(data, CROP_SCHEMA)
 
     @staticmethod
     def clean_rainfall_data(data: List[Dict]) -> pd.DataFrame:
         """Clean and standardize rainfall data"""
-        if not data:
-            return pd.DataFrame()
-
-        df = pd.DataFrame(data)
-
-        column_mapping = {
-            'SUBDIVISION': 'subdivision',
-            'YEAR': 'year',
-            'JAN': 'jan', 'FEB': 'feb', 'MAR': 'mar', 'APR': 'apr',
-            'MAY': 'may', 'JUN': 'jun', 'JUL': 'jul', 'AUG': 'aug',
-            'SEP': 'sep', 'OCT': 'oct', 'NOV': 'nov', 'DEC': 'dec',
-            'ANNUAL': 'annual',
-            'JF': 'jf', 'MAM': 'mam', 'JJAS': 'jjas', 'OND': 'ond'
-        }
-        df = df.rename(columns=column_mapping)
-
-        month_cols = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec', 'annual']
-        for col in month_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-        if 'year' in df.columns:
-            df['year'] = pd.to_numeric(df['year'], errors='coerce')
-        return df.dropna(subset=['subdivision', 'year'])
-
-    # Keep your other aggregation and formatting methods as they are.
+        return DataProcessor.clean(data, RAINFALL_SCHEMA)
 
+    @staticmethod
+    def load_recent(lake, name: str, years: int, columns: List[str] = None) -> pd.DataFrame:
+        """
+        Load the most recent year partitions of a data lake dataset
+        
+        Args:
+            lake: DataLake holding the cleaned dataset
+            name: Dataset name, e.g. 'crop_production'
+            years: Number of most recent years to load
+            columns: Columns needed by the caller (all if omitted)
+            
+        Returns:
+            DataFrame with only the requested columns and years
+        """
+        partitions = lake.manifest()['datasets'][name]['partitions']
+        if columns is not None and 'year' not in columns:
+            columns = list(columns) + ['year']
+        return lake.load(name, columns=columns, years=partitions[-years:])
     
     @staticmethod
     def aggregate_crop_by_state(df: pd.DataFrame, years: int = 5) -> pd.DataFrame:
@@ -80,7 +57,7 @@ class DataProcessor:
         recent_years = df['year'].max() - years + 1
         df_recent = df[df['year'] >= recent_years]
         
-        agg_df = df_recent.groupby(['state', 'crop']).agg({
+        agg_df = df_recent.groupby(['state', 'crop'], observed=True).agg({
             'production_tonnes': 'sum',
             'area_hectares': 'sum',
             'year': 'count'
@@ -97,7 +74,7 @@ class DataProcessor:
         recent_years = df['year'].max() - years + 1
         df_recent = df[df['year'] >= recent_years]
         
-        stats_df = df_recent.groupby('subdivision').agg({
+        stats_df = df_recent.groupby('subdivision', observed=True).agg({
             'annual': ['mean', 'std', 'min', 'max']
         }).reset_index()
         
@@ -105,6 +82,51 @@ class DataProcessor:
         
         return stats_df.sort_values('avg_rainfall', ascending=False)
     
+    @staticmethod
+    def consolidate(df: pd.DataFrame, policy: GroupingPolicy) -> pd.DataFrame:
+        """
+        Consolidate cleaned rows into one row per group before embedding
+        
+        Args:
+            df: Cleaned dataframe
+            policy: Grouping policy (keys, aggregations, collected columns)
+            
+        Returns:
+            One row per group with the key and aggregate columns, plus
+            'row_count', 'source_rows' (positions in df) and 'details'
+        """
+        if df.empty:
+            return df
+        
+        work = df.reset_index(drop=True)
+        for name, func in policy.derived.items():
+            work[name] = func(work)
+        
+        grouped = work.groupby(policy.keys, observed=True, sort=True)
+        out = grouped.agg(**policy.aggregations).reset_index()
+        
+        # Rows of each group, in group order, for provenance and collected values
+        codes = grouped.ngroup().to_numpy()
+        order = np.argsort(codes, kind='stable')
+        counts = np.bincount(codes, minlength=len(out))
+        bounds = np.cumsum(counts)[:-1]
+        
+        out['row_count'] = counts
+        out['source_rows'] = [rows.tolist() for rows in np.split(order, bounds)]
+        for name, column in policy.collect.items():
+            values = np.split(work[column].astype(object).to_numpy()[order], bounds)
+            out[name] = [list(dict.fromkeys(v for v in group if not pd.isna(v))) for group in values]
+        
+        if policy.detail_template:
+            details = np.array([policy.detail_template.format_map(_Row(record))
+                                for record in work.to_dict('records')], dtype=object)
+            out['details'] = ['; '.join(group) for group in np.split(details[order], bounds)]
+        
+        for name, func in policy.post.items():
+            out[name] = func(out)
+        
+        return out
+    
     @staticmethod
     def format_for_embedding(df: pd.DataFrame, data_type: str) -> List[Dict]:
         """
@@ -112,54 +134,14 @@ class DataProcessor:
         
         Args:
             df: Cleaned dataframe
-            data_type: 'crop' or 'rainfall'
+            data_type: Registered dataset name or alias, e.g. 'crop' or 'rainfall'
             
         Returns:
-            List of dictionaries with text and metadata
+            List of dictionaries with text and metadata, one per row or per
+            group when a grouping policy is configured for the dataset
         """
-        documents = []
-        
-        if data_type == 'crop':
-            for _, row in df.iterrows():
-                text = f"In {row.get('state', 'Unknown')}, {row.get('district', 'Unknown')} district, "\
-                       f"{row.get('crop', 'Unknown')} crop production was {row.get('production_tonnes', 0):.2f} tonnes "\
-                       f"from {row.get('area_hectares', 0):.2f} hectares in year {row.get('year', 'Unknown')} "\
-                       f"during {row.get('season', 'Unknown')} season. "\
-                       f"Yield was {row.get('yield_tonnes_per_hectare', 0):.2f} tonnes per hectare."
-                
-                documents.append({
-                    'text': text,
-                    'metadata': {
-                        'type': 'crop_production',
-                        'state': row.get('state'),
-                        'district': row.get('district'),
-                        'crop': row.get('crop'),
-                        'year': row.get('year'),
-                        'season': row.get('season'),
-                        'source': 'data.gov.in - Ministry of Agriculture'
-                    }
-                })
-        
-        elif data_type == 'rainfall':
-            for _, row in df.iterrows():
-                text = f"In {row.get('subdivision', 'Unknown')}, the annual rainfall was "\
-                       f"{row.get('annual', 0):.2f} mm in year {row.get('year', 'Unknown')}. "\
-                       f"Monthly rainfall: January {row.get('jan', 0):.2f} mm, "\
-                       f"February {row.get('feb', 0):.2f} mm, March {row.get('mar', 0):.2f} mm, "\
-                       f"April {row.get('apr', 0):.2f} mm, May {row.get('may', 0):.2f} mm, "\
-                       f"June {row.get('jun', 0):.2f} mm, July {row.get('jul', 0):.2f} mm, "\
-                       f"August {row.get('aug', 0):.2f} mm, September {row.get('sep', 0):.2f} mm, "\
-                       f"October {row.get('oct', 0):.2f} mm, November {row.get('nov', 0):.2f} mm, "\
-                       f"December {row.get('dec', 0):.2f} mm."
-                
-                documents.append({
-                    'text': text,
-                    'metadata': {
-                        'type': 'rainfall',
-                        'subdivision': row.get('subdivision'),
-                        'year': row.get('year'),
-                        'source': 'data.gov.in - India Meteorological Department'
-                    }
-                })
-        
-        return documents
\ No newline at end of file
+        spec = DATASETS.get(data_type)
+        policy = spec.grouping()
+        if policy is None:
+            return spec.format_documents(df)
+        return spec.format_documents(DataProcessor.consolidate(df, policy), policy)
@@ -0,0 +1,360 @@
+# backend/data_fetcher/registry.py
+import json
+import os
+from itertools import product
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from config import Config
+from .schemas import DatasetSchema, CROP_SCHEMA, RAINFALL_SCHEMA
+
+# Raw district and subdivision spellings used by the data.gov.in resources
+SOURCE_NAMES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'source_names.json')
+
+
+def load_source_names(dataset: str, path: str = SOURCE_NAMES_PATH) -> Dict[str, List[str]]:
+    """
+    Read the raw spellings shipped for one dataset
+
+    Args:
+        dataset: Dataset name in the names file
+        path: JSON file of dataset -> field -> names, or -> {group: names}
+
+    Returns:
+        Keyword filter name -> raw values in source order
+    """
+    try:
+        with open(path) as f:
+            entries = json.load(f).get(dataset, {})
+    except (OSError, ValueError) as e:
+        print(f"Could not read source names from {path}: {e}")
+        return {}
+
+    names = {}
+    for field, values in entries.items():
+        if isinstance(values, dict):
+            values = [name for group in values.values() for name in group]
+        names[field] = list(dict.fromkeys(values))
+    return names
+
+
+def _native(value: Any) -> Any:
+    """Convert numpy scalars and missing values to JSON-friendly Python values"""
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_native(item) for item in value]
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class _Row(dict):
+    """Record passed to text templates; absent fields render as 'Unknown'"""
+
+    def __missing__(self, key):
+        return 'Unknown'
+
+
+class GroupingPolicy:
+    """How cleaned rows are consolidated into one document per group"""
+
+    def __init__(self, name: str, keys: List[str], aggregations: Dict[str, Tuple[str, str]],
+                 text_template: str, metadata_fields: List[str],
+                 derived: Dict[str, Callable[[pd.DataFrame], pd.Series]] = None,
+                 collect: Dict[str, str] = None, detail_template: str = None,
+                 post: Dict[str, Callable[[pd.DataFrame], pd.Series]] = None):
+        """
+        Initialize grouping policy
+
+        Args:
+            name: Policy name, recorded in document metadata
+            keys: Columns that identify a group
+            aggregations: Output column -> (input column, pandas aggregation)
+            text_template: str.format template rendered per group
+            metadata_fields: Group columns copied into metadata; 'source_rows'
+                and 'row_count' carry the provenance of the underlying rows
+            derived: Columns computed on the rows before grouping, e.g. decade
+            collect: Output column -> input column gathered as a list of distinct values
+            detail_template: Per-row template joined into the 'details' column
+            post: Columns computed on the groups after aggregation
+        """
+        self.name = name
+        self.keys = keys
+        self.aggregations = aggregations
+        self.text_template = text_template
+        self.metadata_fields = metadata_fields
+        self.derived = derived or {}
+        self.collect = collect or {}
+        self.detail_template = detail_template
+        self.post = post or {}
+
+
+class DatasetSpec:
+    """Everything needed to ingest, clean and embed one data.gov.in resource"""
+
+    def __init__(self, name: str, resource_id: str, schema: DatasetSchema, text_template: str,
+                 metadata_fields: List[str], source: str, filter_fields: Dict[str, str] = None,
+                 aliases: Tuple[str, ...] = (), query_types: Tuple[str, ...] = (),
+                 groupings: List[GroupingPolicy] = None, lookup_key: Tuple[str, ...] = (),
+                 source_names: Dict[str, List[str]] = None):
+        """
+        Initialize dataset spec
+
+        Args:
+            name: Dataset name; also the document 'type' and its index shard
+            resource_id: data.gov.in resource id
+            schema: Cleaning schema for the raw records
+            text_template: str.format template rendered per cleaned row
+            metadata_fields: Cleaned columns copied into document metadata
+            source: Attribution shown with answers
+            filter_fields: Keyword filter name -> API filter field
+            aliases: Other names accepted by DatasetRegistry.get
+            query_types: QueryProcessor query types answered from this dataset alone
+            groupings: Consolidation policies that can replace one-document-per-row
+            lookup_key: Metadata fields that pin down a record for point lookups
+            source_names: Keyword filter -> raw values the resource uses, known
+                before anything is indexed
+        """
+        self.name = name
+        self.resource_id = resource_id
+        self.schema = schema
+        self.text_template = text_template
+        self.metadata_fields = metadata_fields
+        self.source = source
+        self.filter_fields = filter_fields or {}
+        self.aliases = aliases
+        self.query_types = query_types
+        self.groupings = {policy.name: policy for policy in groupings or []}
+        self.lookup_key = lookup_key
+        self.source_names = source_names or {}
+
+    def grouping(self) -> Optional[GroupingPolicy]:
+        """Grouping policy selected by Config.DOCUMENT_GROUPING, if any"""
+        for entry in Config.DOCUMENT_GROUPING.split(','):
+            dataset, _, policy = entry.strip().partition(':')
+            if dataset == self.name and policy and policy != 'none':
+                if policy not in self.groupings:
+                    raise ValueError(f"Unknown grouping {policy} for {self.name}; "
+                                     f"choose from {', '.join(self.groupings) or 'none'}")
+                return self.groupings[policy]
+        return None
+
+    def api_filters(self, **filters) -> Dict[str, Any]:
+        """Translate keyword filters into data.gov.in filter fields"""
+        unknown = set(filters) - set(self.filter_fields)
+        if unknown:
+            raise ValueError(f"Unknown filters for {self.name}: {', '.join(sorted(unknown))}")
+        return {self.filter_fields[key]: value for key, value in filters.items() if value}
+
+    def known_names(self, field: str) -> List[str]:
+        """Cleaned values of a field from the shipped source names"""
+        column = self.schema.column(field)
+        raw = self.source_names.get(field, [])
+        if column is None:
+            return list(raw)
+        return list(dict.fromkeys(column.normalize_value(name) for name in raw))
+
+    def api_spellings(self, **filters) -> List[Dict[str, Any]]:
+        """
+        Keyword filters in the spellings the API may store, most likely first
+
+        The API matches filter values exactly while cleaned values are
+        normalised (e.g. 'Ludhiana' for 'LUDHIANA', 2005 for '2005'). A value
+        with a known raw spelling is sent as that; any other category value
+        is tried as given and then upper-cased.
+
+        Args:
+            **filters: Keyword filters with cleaned values
+
+        Returns:
+            Alternative filter dicts to try in order
+        """
+        candidates = []
+        for field, value in filters.items():
+            column = self.schema.column(field)
+            if column is None or column.kind != 'category':
+                candidates.append([str(value)])
+                continue
+            known = [raw for raw in self.source_names.get(field, [])
+                     if column.normalize_value(raw) == value]
+            candidates.append(known[:1] or list(dict.fromkeys([value, str(value).upper()])))
+
+        # Fewest upper-cased guesses first
+        choices = sorted(product(*(range(len(values)) for values in candidates)), key=sum)
+        return [{field: values[i] for field, values, i in zip(filters, candidates, choice)}
+                for choice in choices]
+
+    def format_documents(self, df: pd.DataFrame, grouping: GroupingPolicy = None) -> List[Dict]:
+        """
+        Render cleaned rows, or consolidated groups, as documents for embedding
+
+        Args:
+            df: DataFrame produced by this dataset's schema, or by
+                DataProcessor.consolidate with grouping
+            grouping: Policy df was consolidated with
+
+        Returns:
+            List of dictionaries with text and metadata
+        """
+        template = grouping.text_template if grouping else self.text_template
+        fields = grouping.metadata_fields if grouping else self.metadata_fields
+
+        documents = []
+        for record in df.to_dict('records'):
+            row = _Row(record)
+            metadata = {'type': self.name}
+            for field in fields:
+                metadata[field] = _native(record.get(field))
+            if grouping:
+                metadata['grouping'] = grouping.name
+            metadata['source'] = self.source
+            documents.append({
+                'text': template.format_map(row),
+                'metadata': metadata
+            })
+        return documents
+
+
+class DatasetRegistry:
+    """Named collection of dataset specs, in registration order"""
+
+    def __init__(self, specs: List[DatasetSpec] = None):
+        self._specs = {}
+        self._aliases = {}
+        for spec in specs or []:
+            self.register(spec)
+
+    def register(self, spec: DatasetSpec):
+        """Add a dataset; re-registering a name replaces it"""
+        self._specs[spec.name] = spec
+        for alias in spec.aliases:
+            self._aliases[alias] = spec.name
+
+    def get(self, name: str) -> DatasetSpec:
+        """Look up a dataset by name or alias"""
+        spec = self._specs.get(self._aliases.get(name, name))
+        if spec is None:
+            raise KeyError(f"Unknown dataset: {name}")
+        return spec
+
+    def names(self) -> List[str]:
+        return list(self._specs)
+
+    def for_query_type(self, query_type: str) -> List[str]:
+        """Datasets that serve a query type; empty means search all of them"""
+        return [name for name, spec in self._specs.items() if query_type in spec.query_types]
+
+    def lookup_keys(self) -> Dict[str, Tuple[str, ...]]:
+        return {name: spec.lookup_key for name, spec in self._specs.items() if spec.lookup_key}
+
+    def filter_keys(self) -> Dict[str, Tuple[str, ...]]:
+        """Keyword filters each dataset can be fetched by"""
+        return {name: tuple(spec.filter_fields) for name, spec in self._specs.items() if spec.filter_fields}
+
+    def resource_ids(self) -> Dict[str, str]:
+        return {name: spec.resource_id for name, spec in self._specs.items()}
+
+    def __contains__(self, name: str) -> bool:
+        return self._aliases.get(name, name) in self._specs
+
+    def __iter__(self) -> Iterator[DatasetSpec]:
+        return iter(list(self._specs.values()))
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+
+def _group_yield(df: pd.DataFrame) -> pd.Series:
+    yields = df['production_tonnes'] / df['area_hectares']
+    return yields.replace([np.inf, -np.inf], np.nan).astype(np.float32)
+
+
+# One document per district, crop and year, summarising every season
+CROP_BY_DISTRICT_YEAR = GroupingPolicy(
+    name='district_crop_year',
+    keys=['state', 'district', 'crop', 'year'],
+    aggregations={
+        'production_tonnes': ('production_tonnes', 'sum'),
+        'area_hectares': ('area_hectares', 'sum'),
+    },
+    post={'yield_tonnes_per_hectare': _group_yield},
+    collect={'season': 'season'},
+    detail_template="{season} {production_tonnes:.2f} tonnes from {area_hectares:.2f} hectares",
+    text_template="In {state}, {district} district, "
+                  "{crop} crop production was {production_tonnes:.2f} tonnes "
+                  "from {area_hectares:.2f} hectares in year {year} "
+                  "across {row_count} season records ({details}). "
+                  "Yield was {yield_tonnes_per_hectare:.2f} tonnes per hectare.",
+    metadata_fields=['state', 'district', 'crop', 'year', 'season', 'row_count', 'source_rows']
+)
+
+# One document per subdivision and decade
+RAINFALL_BY_DECADE = GroupingPolicy(
+    name='subdivision_decade',
+    keys=['subdivision', 'decade'],
+    derived={'decade': lambda df: (df['year'] // 10 * 10).astype('int16')},
+    aggregations={
+        'annual': ('annual', 'mean'),
+        'annual_min': ('annual', 'min'),
+        'annual_max': ('annual', 'max'),
+        'jjas': ('jjas', 'mean'),
+        'first_year': ('year', 'min'),
+        'last_year': ('year', 'max'),
+    },
+    collect={'year': 'year'},
+    detail_template="{year} {annual:.2f} mm",
+    text_template="In {subdivision}, during the {decade}s ({first_year}-{last_year}) "
+                  "the average annual rainfall was {annual:.2f} mm, ranging from "
+                  "{annual_min:.2f} mm to {annual_max:.2f} mm. "
+                  "June-September monsoon rainfall averaged {jjas:.2f} mm. "
+                  "Annual rainfall by year: {details}.",
+    metadata_fields=['subdivision', 'decade', 'year', 'row_count', 'source_rows']
+)
+
+
+CROP_PRODUCTION = DatasetSpec(
+    name='crop_production',
+    resource_id='35be999b-0208-4354-b557-f6ca9a5355de',  # District-wise crop production statistics
+    schema=CROP_SCHEMA,
+    text_template="In {state}, {district} district, "
+                  "{crop} crop production was {production_tonnes:.2f} tonnes "
+                  "from {area_hectares:.2f} hectares in year {year} "
+                  "during {season} season. "
+                  "Yield was {yield_tonnes_per_hectare:.2f} tonnes per hectare.",
+    metadata_fields=['state', 'district', 'crop', 'year', 'season'],
+    source='data.gov.in - Ministry of Agriculture',
+    filter_fields={'state': 'State Name', 'district': 'District Name',
+                   'crop': 'Crop', 'year': 'Crop Year'},
+    aliases=('crop',),
+    query_types=('agriculture_query',),
+    groupings=[CROP_BY_DISTRICT_YEAR],
+    # State and season, when the query names them, narrow the match further
+    lookup_key=('district', 'crop', 'year'),
+    source_names=load_source_names('crop_production')
+)
+
+RAINFALL = DatasetSpec(
+    name='rainfall',
+    resource_id='8e0bd482-4aba-4d99-9cb9-ff124f6f1c2f',  # Sub Divisional Monthly Rainfall
+    schema=RAINFALL_SCHEMA,
+    text_template="In {subdivision}, the annual rainfall was "
+                  "{annual:.2f} mm in year {year}. "
+                  "Monthly rainfall: January {jan:.2f} mm, "
+                  "February {feb:.2f} mm, March {mar:.2f} mm, "
+                  "April {apr:.2f} mm, May {may:.2f} mm, "
+                  "June {jun:.2f} mm, July {jul:.2f} mm, "
+                  "August {aug:.2f} mm, September {sep:.2f} mm, "
+                  "October {oct:.2f} mm, November {nov:.2f} mm, "
+                  "December {dec:.2f} mm.",
+    metadata_fields=['subdivision', 'year'],
+    source='data.gov.in - India Meteorological Department',
+    filter_fields={'subdivision': 'SUBDIVISION', 'year': 'YEAR'},
+    query_types=('climate_query',),
+    groupings=[RAINFALL_BY_DECADE],
+    lookup_key=('subdivision', 'year'),
+    source_names=load_source_names('rainfall')
+)
+
+# Datasets indexed by the pipeline; register new data.gov.in resources here
+DATASETS = DatasetRegistry([CROP_PRODUCTION, RAINFALL])
@@ -0,0 +1,220 @@
+# backend/data_fetcher/schemas.py
+from operator import itemgetter
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Raw values the API uses for "no data"; compared after strip().lower()
+MISSING_TOKENS = frozenset({'', 'nan', 'none', 'null', 'na', 'n/a', '-', '--'})
+# Exact spellings of those markers checked before fast numeric parsing
+MISSING_VARIANTS = sorted(MISSING_TOKENS | {t.upper() for t in MISSING_TOKENS}
+                          | {t.title() for t in MISSING_TOKENS})
+
+
+def _normalize_title(value: str) -> str:
+    return value.strip().title()
+
+
+def _normalize_strip(value: str) -> str:
+    return value.strip()
+
+
+NORMALIZERS = {
+    'title': _normalize_title,
+    'strip': _normalize_strip,
+}
+
+
+class ColumnSpec:
+    """One output column: where it comes from in the raw record and its type"""
+
+    def __init__(self, name: str, source: str, kind: str, normalize: str = None):
+        """
+        Initialize column spec
+
+        Args:
+            name: Column name in the cleaned DataFrame
+            source: Field name in the raw API record
+            kind: 'category', 'int16', 'int32' or 'float32'
+            normalize: Text normaliser for categories ('title' or 'strip')
+        """
+        self.name = name
+        self.source = source
+        self.kind = kind
+        self.normalize = normalize
+
+    def normalize_value(self, value: str) -> str:
+        """Clean one raw category value the way parse() does"""
+        return NORMALIZERS.get(self.normalize, _normalize_strip)(str(value))
+
+    def parse(self, values: List) -> pd.Series:
+        """Convert raw values into a typed Series"""
+        if self.kind == 'category':
+            return pd.Series(self._parse_category(values), name=self.name)
+
+        # Numeric columns are parsed as float64 first so missing values become NaN;
+        # integer columns are narrowed after required-column filtering
+        numbers = self._parse_numeric(pd.Series(values, dtype=object))
+        if self.kind == 'float32':
+            numbers = numbers.astype(np.float32)
+        return numbers.rename(self.name)
+
+    @staticmethod
+    def _parse_numeric(raw: pd.Series) -> pd.Series:
+        # Blank out the usual missing markers and let the C float parser run;
+        # only columns with unexpected junk pay for the slower coercing parse
+        raw = raw.mask(raw.isin(MISSING_VARIANTS))
+        try:
+            return raw.astype(np.float64)
+        except (TypeError, ValueError):
+            return pd.to_numeric(raw, errors='coerce')
+
+    def _parse_category(self, values: List) -> pd.Categorical:
+        # Factorize once, then normalise each distinct raw value rather than each row
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+        normalize = NORMALIZERS.get(self.normalize, _normalize_strip)
+
+        normalized = []
+        for raw in uniques:
+            text = str(raw)
+            normalized.append(None if text.strip().lower() in MISSING_TOKENS else normalize(text))
+
+        # Different raw spellings can normalise to the same value; remap codes
+        categories = pd.Index([v for v in dict.fromkeys(normalized) if v is not None], dtype=object)
+        remap = np.array([categories.get_loc(v) if v is not None else -1 for v in normalized] + [-1],
+                         dtype=np.int64)
+        return pd.Categorical.from_codes(remap[codes], categories=categories)
+
+
+class DatasetSchema:
+    """Declarative cleaning schema for one data.gov.in resource"""
+
+    def __init__(self, name: str, columns: List[ColumnSpec], required: List[str],
+                 derived: Dict[str, Callable[[pd.DataFrame], pd.Series]] = None):
+        """
+        Initialize dataset schema
+
+        Args:
+            name: Dataset name
+            columns: Column specs in output order
+            required: Columns whose missing values drop the row
+            derived: Extra columns computed from the typed frame
+        """
+        self.name = name
+        self.columns = columns
+        self.required = required
+        self.derived = derived or {}
+
+    def column(self, name: str) -> Optional[ColumnSpec]:
+        """Column spec by cleaned column name"""
+        for spec in self.columns:
+            if spec.name == name:
+                return spec
+        return None
+
+    def _extract_columns(self, records: List[Dict]) -> List[List]:
+        """Transpose records into one value list per column spec"""
+        sources = [spec.source for spec in self.columns]
+        if len(sources) > 1:
+            try:
+                # One C-level pass when every record carries every field
+                return list(zip(*map(itemgetter(*sources), records)))
+            except KeyError:
+                pass
+        return [[record.get(source) for record in records] for source in sources]
+
+    def parse(self, records: List[Dict]) -> pd.DataFrame:
+        """
+        Parse one batch of raw records into a typed DataFrame
+
+        Args:
+            records: Raw API records
+
+        Returns:
+            Cleaned DataFrame with categorical, compact integer and float32 columns
+        """
+        if not records:
+            return pd.DataFrame()
+
+        columns = {}
+        for spec, values in zip(self.columns, self._extract_columns(records)):
+            columns[spec.name] = spec.parse(values)
+        df = pd.DataFrame(columns)
+
+        required = [c for c in self.required if c in df.columns]
+        df = df.dropna(subset=required).reset_index(drop=True)
+
+        for spec in self.columns:
+            if spec.kind in ('int16', 'int32'):
+                if spec.name in required:
+                    df[spec.name] = df[spec.name].astype(spec.kind)
+                else:
+                    df[spec.name] = df[spec.name].astype(spec.kind.capitalize())
+
+        for name, func in self.derived.items():
+            df[name] = func(df)
+
+        return df
+
+    def parse_pages(self, pages: Iterable[List[Dict]]) -> pd.DataFrame:
+        """
+        Parse page batches and concatenate them, unioning categories
+
+        Args:
+            pages: Iterable of raw record batches
+
+        Returns:
+            Cleaned DataFrame covering all pages
+        """
+        frames = [self.parse(page) for page in pages]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame()
+        if len(frames) == 1:
+            return frames[0]
+
+        combined = {}
+        for column in frames[0].columns:
+            parts = [frame[column] for frame in frames]
+            if isinstance(parts[0].dtype, pd.CategoricalDtype):
+                combined[column] = pd.Series(pd.api.types.union_categoricals(parts))
+            else:
+                combined[column] = pd.concat(parts, ignore_index=True)
+        return pd.DataFrame(combined)
+
+
+def _crop_yield(df: pd.DataFrame) -> pd.Series:
+    yields = df['production_tonnes'] / df['area_hectares']
+    return yields.replace([np.inf, -np.inf], np.nan).astype(np.float32)
+
+
+CROP_SCHEMA = DatasetSchema(
+    name='crop_production',
+    columns=[
+        ColumnSpec('state', 'state_name', 'category', normalize='title'),
+        ColumnSpec('district', 'district_name', 'category', normalize='title'),
+        ColumnSpec('year', 'crop_year', 'int16'),
+        ColumnSpec('season', 'season', 'category', normalize='title'),
+        ColumnSpec('crop', 'crop', 'category', normalize='title'),
+        ColumnSpec('area_hectares', 'area_', 'float32'),
+        ColumnSpec('production_tonnes', 'production_', 'float32'),
+    ],
+    required=['state', 'crop', 'year'],
+    derived={'yield_tonnes_per_hectare': _crop_yield}
+)
+
+RAINFALL_MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+
+RAINFALL_SCHEMA = DatasetSchema(
+    name='rainfall',
+    columns=[
+        ColumnSpec('subdivision', 'SUBDIVISION', 'category', normalize='strip'),
+        ColumnSpec('year', 'YEAR', 'int16'),
+    ] + [
+        ColumnSpec(month, month.upper(), 'float32') for month in RAINFALL_MONTHS
+    ] + [
+        ColumnSpec(period, period.upper(), 'float32')
+        for period in ('annual', 'jf', 'mam', 'jjas', 'ond')
+    ],
+    required=['subdivision', 'year']
+)
@@ -0,0 +1,354 @@
+# backend/data_fetcher/trend_engine.py
+import threading
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from config import Config
+from .schemas import RAINFALL_MONTHS
+
+
+def _codes(values: pd.Series) -> Tuple[np.ndarray, List]:
+    """Integer codes and sorted labels of a column"""
+    codes, labels = pd.factorize(values, sort=True)
+    return codes, [label.item() if isinstance(label, np.generic) else label for label in labels]
+
+
+def _dense(shape: Tuple[int, ...], index: Tuple[np.ndarray, ...], values: np.ndarray,
+           mean: bool = False) -> np.ndarray:
+    """Scatter rows into a dense array; cells without data are NaN"""
+    valid = np.isfinite(values)
+    index = tuple(axis[valid] for axis in index)
+    total = np.zeros(shape, dtype=np.float64)
+    count = np.zeros(shape, dtype=np.int32)
+    np.add.at(total, index, values[valid])
+    np.add.at(count, index, 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        dense = total / count if mean else np.where(count > 0, total, np.nan)
+    return dense
+
+
+# --- Batched computations; the last axis is the year axis, NaN marks missing years ---
+
+def slopes(values: np.ndarray, years: np.ndarray) -> np.ndarray:
+    """Least-squares slope per series, in units per year"""
+    mask = np.isfinite(values)
+    n = mask.sum(axis=-1)
+    x = np.broadcast_to(years.astype(np.float64), values.shape)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_mean = np.where(mask, x, 0.0).sum(axis=-1) / n
+        y_mean = np.where(mask, values, 0.0).sum(axis=-1) / n
+        dx = np.where(mask, x - x_mean[..., None], 0.0)
+        dy = np.where(mask, values - y_mean[..., None], 0.0)
+        slope = (dx * dy).sum(axis=-1) / (dx * dx).sum(axis=-1)
+    return np.where(n >= 2, slope, np.nan)
+
+
+def endpoints(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Positions of the first and last observed year per series, and whether any exist"""
+    mask = np.isfinite(values)
+    first = mask.argmax(axis=-1)
+    last = values.shape[-1] - 1 - mask[..., ::-1].argmax(axis=-1)
+    return first, last, mask.any(axis=-1)
+
+
+def cagr(values: np.ndarray, years: np.ndarray) -> np.ndarray:
+    """Compound annual growth rate between the first and last observed years"""
+    first, last, observed = endpoints(values)
+    start = np.take_along_axis(values, first[..., None], axis=-1)[..., 0]
+    end = np.take_along_axis(values, last[..., None], axis=-1)[..., 0]
+    span = years[last] - years[first]
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        rate = np.power(end / start, 1.0 / span) - 1.0
+    return np.where(observed & (span > 0) & (start > 0) & (end > 0), rate, np.nan)
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over window years, skipping missing years; aligned with the input"""
+    mask = np.isfinite(values)
+    pad = [(0, 0)] * (values.ndim - 1) + [(1, 0)]
+    total = np.pad(np.cumsum(np.where(mask, values, 0.0), axis=-1), pad)
+    count = np.pad(np.cumsum(mask, axis=-1), pad)
+    window = max(1, min(window, values.shape[-1]))
+    sums = total[..., window:] - total[..., :-window]
+    counts = count[..., window:] - count[..., :-window]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(counts > 0, sums / counts, np.nan)
+    lead = np.full(values.shape[:-1] + (window - 1,), np.nan)
+    return np.concatenate([lead, means], axis=-1)
+
+
+def anomalies(values: np.ndarray) -> np.ndarray:
+    """Standardised departure of each year from the series' long-term mean"""
+    mask = np.isfinite(values)
+    n = mask.sum(axis=-1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(mask, values, 0.0).sum(axis=-1, keepdims=True) / n
+        var = np.where(mask, (values - mean) ** 2, 0.0).sum(axis=-1, keepdims=True) / n
+        return (values - mean) / np.sqrt(var)
+
+
+def change_points(values: np.ndarray, years: np.ndarray,
+                  min_segment: int = 2) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Single most likely shift in mean per series
+
+    Every split is scored at once from cumulative sums, as the between-segment
+    sum of squares n_left * n_right / n * (mean_right - mean_left) ** 2.
+
+    Returns:
+        (first year of the new level, shift in mean); NaN where no split has
+        min_segment observed years on both sides
+    """
+    if values.shape[-1] < 2:
+        missing = np.full(values.shape[:-1], np.nan)
+        return missing, missing.copy()
+    mask = np.isfinite(values)
+    left_sum = np.cumsum(np.where(mask, values, 0.0), axis=-1)[..., :-1]
+    left_n = np.cumsum(mask, axis=-1)[..., :-1]
+    total_sum = left_sum[..., -1:] + np.where(mask[..., -1:], values[..., -1:], 0.0)
+    total_n = mask.sum(axis=-1, keepdims=True)
+    right_sum, right_n = total_sum - left_sum, total_n - left_n
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        shift = right_sum / right_n - left_sum / left_n
+        score = left_n * right_n / total_n * shift ** 2
+    score = np.where((left_n >= min_segment) & (right_n >= min_segment), score, -np.inf)
+
+    best = score.argmax(axis=-1)
+    found = np.take_along_axis(score, best[..., None], axis=-1)[..., 0] > -np.inf
+    change_year = np.where(found, years[1:][best], np.nan)
+    size = np.where(found, np.take_along_axis(shift, best[..., None], axis=-1)[..., 0], np.nan)
+    return change_year, size
+
+
+def _crop_arrays(df: pd.DataFrame) -> Dict:
+    """[crop, state, year] production and area"""
+    crop_codes, crops = _codes(df['crop'])
+    state_codes, states = _codes(df['state'])
+    years = np.arange(int(df['year'].min()), int(df['year'].max()) + 1)
+    year_codes = df['year'].to_numpy(dtype=np.int64) - years[0]
+    index = (crop_codes, state_codes, year_codes)
+    shape = (len(crops), len(states), len(years))
+    return {
+        'crops': crops, 'entities': states, 'years': years,
+        # [crop, state, year]
+        'production': _dense(shape, index, df['production_tonnes'].to_numpy(dtype=np.float64)),
+        'area': _dense(shape, index, df['area_hectares'].to_numpy(dtype=np.float64)),
+    }
+
+
+def _rainfall_arrays(df: pd.DataFrame) -> Dict:
+    """[subdivision, year] annual and [subdivision, year, month] monthly rainfall"""
+    subdivision_codes, subdivisions = _codes(df['subdivision'])
+    years = np.arange(int(df['year'].min()), int(df['year'].max()) + 1)
+    year_codes = df['year'].to_numpy(dtype=np.int64) - years[0]
+    shape = (len(subdivisions), len(years))
+    # [subdivision, year, month]
+    monthly = np.stack([
+        _dense(shape, (subdivision_codes, year_codes), df[month].to_numpy(dtype=np.float64), mean=True)
+        for month in RAINFALL_MONTHS
+    ], axis=-1)
+    return {
+        'entities': subdivisions, 'years': years,
+        'monthly': monthly,
+        'rainfall': _dense(shape, (subdivision_codes, year_codes),
+                           df['annual'].to_numpy(dtype=np.float64), mean=True),
+    }
+
+
+class TrendEngine:
+    """Dense year-series arrays for the cleaned datasets, with batched trend statistics"""
+
+    METRICS = {
+        'production': ('crop_production', 'tonnes'),
+        'area': ('crop_production', 'hectares'),
+        'yield': ('crop_production', 'tonnes per hectare'),
+        'rainfall': ('rainfall', 'mm'),
+    }
+
+    # Dataset name -> function laying its cleaned DataFrame out as dense arrays
+    BUILDERS = {
+        'crop_production': _crop_arrays,
+        'rainfall': _rainfall_arrays,
+    }
+
+    def __init__(self, arrays: Dict[str, Dict] = None):
+        """
+        Initialize trend engine
+
+        Args:
+            arrays: Dataset name -> arrays and axis labels, see with_frames
+        """
+        self.arrays = arrays or {}
+        # Statistics per (metric, crop, window); the arrays never change after construction,
+        # but the keys come from queries, so only the recently used ones are kept
+        self._cache = LRUCache(maxsize=Config.TREND_CACHE_SIZE)
+        self._cache_lock = threading.Lock()
+
+    def with_frames(self, frames: Dict[str, pd.DataFrame]) -> 'TrendEngine':
+        """
+        New engine with the given datasets rebuilt and the others shared
+
+        Args:
+            frames: Dataset name -> cleaned DataFrame; unknown datasets are ignored
+
+        Returns:
+            Trend engine
+        """
+        arrays = dict(self.arrays)
+        for name, df in frames.items():
+            builder = self.BUILDERS.get(name)
+            if builder is not None and df is not None and not df.empty:
+                arrays[name] = builder(df)
+        return TrendEngine(arrays)
+
+    @classmethod
+    def from_lake(cls, lake) -> 'TrendEngine':
+        """Build from the cleaned snapshots in a DataLake"""
+        frames = {}
+        for name in cls.BUILDERS:
+            if lake.has(name):
+                frames[name] = lake.load(name)
+        return cls().with_frames(frames)
+
+    def _cached(self, key: Tuple, compute: Callable[[], Any]) -> Any:
+        """Cached value for key, computed outside the lock on a miss"""
+        with self._cache_lock:
+            value = self._cache.get(key)
+        if value is None:
+            value = compute()
+            with self._cache_lock:
+                self._cache[key] = value
+        return value
+
+    def has(self, metric: str) -> bool:
+        return metric in self.METRICS and self.METRICS[metric][0] in self.arrays
+
+    def unit(self, metric: str) -> str:
+        return self.METRICS[metric][1]
+
+    def dataset(self, metric: str) -> str:
+        return self.METRICS[metric][0]
+
+    def years(self, metric: str) -> np.ndarray:
+        return self.arrays[self.dataset(metric)]['years']
+
+    def entities(self, metric: str) -> List[str]:
+        return self.arrays[self.dataset(metric)]['entities']
+
+    def series(self, metric: str, crop: Optional[str] = None) -> np.ndarray:
+        """
+        Dense [entity, year] array of a metric
+
+        Args:
+            metric: 'production', 'area', 'yield' or 'rainfall'
+            crop: Crop to read (crop metrics only); all crops combined if omitted
+
+        Returns:
+            Array indexed by entities(metric) and years(metric); NaN where missing
+        """
+        arrays = self.arrays[self.dataset(metric)]
+        if metric == 'rainfall':
+            return arrays['rainfall']
+
+        if crop is not None:
+            if crop not in arrays['crops']:
+                raise KeyError(f"Unknown crop: {crop}")
+            position = arrays['crops'].index(crop)
+            production, area = arrays['production'][position], arrays['area'][position]
+        else:
+            # A state-year with no crop reported stays missing rather than zero
+            production = np.where(np.isfinite(arrays['production']).any(axis=0),
+                                  np.nansum(arrays['production'], axis=0), np.nan)
+            area = np.where(np.isfinite(arrays['area']).any(axis=0),
+                            np.nansum(arrays['area'], axis=0), np.nan)
+
+        if metric == 'production':
+            return production
+        if metric == 'area':
+            return area
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(area > 0, production / area, np.nan)
+
+    def _window(self, metric: str, start: Optional[int], end: Optional[int]) -> slice:
+        years = self.years(metric)
+        lo = 0 if start is None else int(np.searchsorted(years, start, side='left'))
+        hi = len(years) if end is None else int(np.searchsorted(years, end, side='right'))
+        return slice(lo, hi)
+
+    def trends(self, metric: str, crop: Optional[str] = None, start: Optional[int] = None,
+               end: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Trend statistics for every entity over a year window, in one pass
+
+        Args:
+            metric: 'production', 'area', 'yield' or 'rainfall'
+            crop: Crop for crop metrics; all crops combined if omitted
+            start: First year of the window (inclusive)
+            end: Last year of the window (inclusive)
+
+        Returns:
+            Arrays aligned with entities(metric): slope (units per year),
+            relative_slope (fraction of the window mean per year), cagr,
+            first_year, first, last_year, last, mean, change_year, change
+            (shift in mean at change_year) and observed (years with data)
+        """
+        return self._cached((metric, crop, start, end),
+                            lambda: self._compute_trends(metric, crop, start, end))
+
+    def _compute_trends(self, metric: str, crop: Optional[str], start: Optional[int],
+                        end: Optional[int]) -> Dict[str, np.ndarray]:
+        window = self._window(metric, start, end)
+        years = self.years(metric)[window]
+        if not len(years):
+            raise ValueError(f"No {metric} data between {start} and {end}")
+        values = self.series(metric, crop)[:, window]
+
+        mask = np.isfinite(values)
+        observed = mask.sum(axis=-1)
+        first, last, any_observed = endpoints(values)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(mask, values, 0.0).sum(axis=-1) / observed
+        slope = slopes(values, years)
+        change_year, change = change_points(values, years)
+
+        result = {
+            'slope': slope,
+            'relative_slope': np.where(mean > 0, slope / mean, np.nan),
+            'cagr': cagr(values, years),
+            'first_year': np.where(any_observed, years[first], np.nan),
+            'first': np.take_along_axis(values, first[:, None], axis=-1)[:, 0],
+            'last_year': np.where(any_observed, years[last], np.nan),
+            'last': np.take_along_axis(values, last[:, None], axis=-1)[:, 0],
+            'mean': mean,
+            'change_year': change_year,
+            'change': change,
+            'observed': observed,
+        }
+        return result
+
+    def rolling(self, metric: str, window: int, crop: Optional[str] = None) -> np.ndarray:
+        """Trailing window-year mean of a metric, [entity, year]"""
+        return self._cached((metric, crop, 'rolling', window),
+                            lambda: rolling_mean(self.series(metric, crop), window))
+
+    def anomalies(self, metric: str, crop: Optional[str] = None) -> np.ndarray:
+        """Standardised anomalies against each entity's long-term mean, [entity, year]"""
+        return self._cached((metric, crop, 'anomalies'),
+                            lambda: anomalies(self.series(metric, crop)))
+
+    def monthly_anomalies(self) -> np.ndarray:
+        """Rainfall anomalies per calendar month, [subdivision, year, month]"""
+        monthly = self.arrays['rainfall']['monthly']
+        # Move months ahead of years so the year axis is last
+        return self._cached(('rainfall', 'monthly_anomalies'),
+                            lambda: np.moveaxis(anomalies(np.moveaxis(monthly, -1, 1)), 1, -1))
+
+    def get_stats(self) -> Dict:
+        """Array shapes per dataset"""
+        return {
+            name: {key: list(value.shape) for key, value in arrays.items()
+                   if isinstance(value, np.ndarray) and key != 'years'}
+            for name, arrays in self.arrays.items()
+        }
@@ -1,5 +1,8 @@
 # backend/embeddings/__init__.py
 from .embedding_generator import EmbeddingGenerator
-from .vector_store import VectorStore
+from .vector_store import VectorStore, IndexShard
+from .lexical_index import LexicalIndex
+from .reranker import Reranker, reciprocal_rank_fusion, select_by_relevance, select_diverse
 
-__all__ = ['EmbeddingGenerator', 'VectorStore']
\ No newline at end of file
+__all__ = ['EmbeddingGenerator', 'VectorStore', 'IndexShard', 'LexicalIndex', 'Reranker', 'reciprocal_rank_fusion',
+           'select_by_relevance', 'select_diverse']
\ No newline at end of file
@@ -1,8 +1,8 @@
 # backend/embeddings/embedding_generator.py
-from sentence_transformers import SentenceTransformer
 from typing import List, Union
 import numpy as np
 from config import Config
+from utils.metrics import timed
 
 class EmbeddingGenerator:
     """Generate embeddings for text using sentence transformers"""
@@ -14,12 +14,16 @@ class EmbeddingGenerator:
         Args:
             model_name: Name of the sentence transformer model
         """
+        # Imported here so importing the package does not pull in torch
+        from sentence_transformers import SentenceTransformer
+        
         self.model_name = model_name or Config.EMBEDDING_MODEL
         print(f"Loading embedding model: {self.model_name}")
         self.model = SentenceTransformer(self.model_name)
         self.embedding_dim = self.model.get_sentence_embedding_dimension()
         print(f"Model loaded. Embedding dimension: {self.embedding_dim}")
     
+    @timed('generate_embedding')
     def generate_embedding(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text
@@ -28,10 +32,11 @@ class EmbeddingGenerator:
             text: Input text
             
         Returns:
-            Numpy array of embeddings
+            Numpy array of embeddings, unit length
         """
-        return self.model.encode(text, convert_to_numpy=True)
+        return self.model.encode(text, convert_to_numpy=True, normalize_embeddings=True)
     
+    @timed('generate_embeddings')
     def generate_embeddings(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
         """
         Generate embeddings for multiple texts
@@ -41,9 +46,9 @@ class EmbeddingGenerator:
             batch_size: Batch size for processing
             
         Returns:
-            Numpy array of embeddings
+            Numpy array of embeddings, unit length
         """
-        return self.model.encode(texts, batch_size=batch_size, 
+        return self.model.encode(texts, batch_size=batch_size, normalize_embeddings=True,
                                 convert_to_numpy=True, show_progress_bar=True)
     
     def get_embedding_dim(self) -> int:
@@ -0,0 +1,309 @@
+# backend/embeddings/index_bundle.py
+"""
+Prebuilt, versioned index bundles
+
+A bundle is a directory holding everything a fresh instance needs to answer
+queries without ingestion:
+
+    <root>/<version>/
+        bundle.json     model, dimension, dataset versions, file checksums
+        index/          vector store shards, shard manifest, gazetteer
+        data_lake/      cleaned Parquet snapshots the trend arrays are built from
+
+Build one offline and bake it into the image (the Dockerfile copies the
+backend directory, so an index_bundles/ directory next to app.py ships with it):
+
+    python -m embeddings.index_bundle build --source api
+    python -m embeddings.index_bundle list
+    python -m embeddings.index_bundle verify [version]
+
+At startup RAGPipeline serves the newest bundle that passes verification
+when no local index exists, falling back to older bundles if it does not.
+Startup compares file sizes (INDEX_BUNDLE_VERIFY=size); the verify command
+checks every file's SHA-256.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from typing import Dict, List, Optional
+from config import Config
+from .vector_store import VectorStore
+from utils.helpers import format_timestamp
+
+
+class BundleError(Exception):
+    """A bundle is incomplete, corrupted or built for another embedding model"""
+
+
+def _checksum(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class IndexBundle:
+    """One versioned index bundle directory"""
+
+    MANIFEST = "bundle.json"
+    INDEX_DIR = "index"
+    LAKE_DIR = "data_lake"
+    FORMAT = 1
+
+    def __init__(self, path: str):
+        """
+        Initialize bundle handle
+
+        Args:
+            path: Bundle directory, <root>/<version>
+        """
+        self.path = path
+        self.version = os.path.basename(os.path.normpath(path))
+        self._manifest = None
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.path, self.INDEX_DIR)
+
+    @property
+    def lake_path(self) -> Optional[str]:
+        path = os.path.join(self.path, self.LAKE_DIR)
+        return path if os.path.isdir(path) else None
+
+    def manifest(self) -> Dict:
+        if self._manifest is None:
+            path = os.path.join(self.path, self.MANIFEST)
+            if not os.path.exists(path):
+                raise BundleError(f"{self.version}: missing {self.MANIFEST}")
+            try:
+                with open(path) as f:
+                    self._manifest = json.load(f)
+            except ValueError as e:
+                raise BundleError(f"{self.version}: unreadable {self.MANIFEST}: {e}")
+        return self._manifest
+
+    def verify(self, embedding_model: str, embedding_dim: int = None, checksums: bool = True):
+        """
+        Check that the bundle can be served
+
+        Args:
+            embedding_model: Model queries are embedded with
+            embedding_dim: Dimension of that model's embeddings
+            checksums: Hash every file; otherwise only sizes are compared
+
+        Raises:
+            BundleError: The bundle is built for another model, or a file is
+                missing or does not match its recorded size and checksum
+        """
+        manifest = self.manifest()
+        if manifest.get('format') != self.FORMAT:
+            raise BundleError(f"{self.version}: unsupported bundle format {manifest.get('format')}")
+        if manifest['embedding_model'] != embedding_model:
+            raise BundleError(f"{self.version}: built with {manifest['embedding_model']}, "
+                              f"service embeds with {embedding_model}")
+        if embedding_dim is not None and manifest['embedding_dim'] != embedding_dim:
+            raise BundleError(f"{self.version}: dimension {manifest['embedding_dim']}, expected {embedding_dim}")
+
+        for relative_path, entry in manifest['files'].items():
+            path = os.path.join(self.path, relative_path)
+            if not os.path.isfile(path):
+                raise BundleError(f"{self.version}: missing {relative_path}")
+            if os.path.getsize(path) != entry['bytes']:
+                raise BundleError(f"{self.version}: size mismatch for {relative_path}")
+            if checksums and _checksum(path) != entry['sha256']:
+                raise BundleError(f"{self.version}: checksum mismatch for {relative_path}")
+
+    @classmethod
+    def create(cls, root: str, index_path: str, embedding_model: str, embedding_dim: int,
+               lake_path: str = None, version: str = None) -> 'IndexBundle':
+        """
+        Package a saved index (and optionally a data lake) as a new bundle
+
+        The bundle is assembled in a staging directory and renamed into
+        place, so a half-written bundle is never selected.
+
+        Args:
+            root: Directory holding the bundles
+            index_path: Saved vector store directory, with its gazetteer
+            embedding_model: Model the index was embedded with
+            embedding_dim: Embedding dimension
+            lake_path: Data lake directory copied alongside the index
+            version: Bundle name; a sortable UTC timestamp by default
+
+        Returns:
+            The new bundle
+        """
+        version = version or time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())
+        path = os.path.join(root, version)
+        if os.path.exists(path):
+            raise BundleError(f"Bundle {version} already exists in {root}")
+        staging_path = path + ".staging"
+        shutil.rmtree(staging_path, ignore_errors=True)
+        os.makedirs(staging_path)
+
+        shutil.copytree(index_path, os.path.join(staging_path, cls.INDEX_DIR),
+                        ignore=shutil.ignore_patterns('*.staging', '*.previous', '*.tmp'))
+        if lake_path and os.path.isdir(lake_path):
+            shutil.copytree(lake_path, os.path.join(staging_path, cls.LAKE_DIR),
+                            ignore=shutil.ignore_patterns('*.staging', '*.previous', '*.tmp'))
+
+        files = {}
+        for directory, _, names in os.walk(staging_path):
+            for name in sorted(names):
+                file_path = os.path.join(directory, name)
+                relative_path = os.path.relpath(file_path, staging_path).replace(os.sep, '/')
+                files[relative_path] = {'bytes': os.path.getsize(file_path), 'sha256': _checksum(file_path)}
+
+        manifest = {
+            'format': cls.FORMAT,
+            'version': version,
+            'created_at': format_timestamp(),
+            'embedding_model': embedding_model,
+            'embedding_dim': embedding_dim,
+            'index_compression': Config.INDEX_COMPRESSION,
+            'datasets': cls._dataset_versions(staging_path),
+            'files': files
+        }
+        with open(os.path.join(staging_path, cls.MANIFEST), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.rename(staging_path, path)
+        return cls(path)
+
+    @classmethod
+    def _dataset_versions(cls, path: str) -> Dict:
+        """Documents per shard and, from the lake manifest, rows and fetch time per dataset"""
+        datasets = {}
+        shard_manifest = os.path.join(path, cls.INDEX_DIR, VectorStore.MANIFEST)
+        if os.path.exists(shard_manifest):
+            with open(shard_manifest) as f:
+                for name, entry in json.load(f)['shards'].items():
+                    dataset = datasets.setdefault(VectorStore.dataset_of(name), {'documents': 0})
+                    dataset['documents'] += entry['documents']
+        lake_manifest = os.path.join(path, cls.LAKE_DIR, 'manifest.json')
+        if os.path.exists(lake_manifest):
+            with open(lake_manifest) as f:
+                for name, entry in json.load(f)['datasets'].items():
+                    datasets.setdefault(name, {}).update(
+                        rows=entry['rows'], fetched_at=entry['fetched_at'])
+        return datasets
+
+    @classmethod
+    def available(cls, root: str) -> List['IndexBundle']:
+        """Bundles under root, newest first"""
+        if not root or not os.path.isdir(root):
+            return []
+        # Staging and scratch build directories are never served
+        names = [name for name in os.listdir(root)
+                 if not name.endswith('.staging') and not name.startswith('.')
+                 and os.path.isdir(os.path.join(root, name))]
+        return [cls(os.path.join(root, name)) for name in sorted(names, reverse=True)]
+
+    @classmethod
+    def select(cls, root: str, embedding_model: str, embedding_dim: int,
+               version: str = None, checksums: bool = True) -> Optional['IndexBundle']:
+        """
+        Newest bundle that passes verification
+
+        Args:
+            root: Directory holding the bundles
+            embedding_model: Model queries are embedded with
+            embedding_dim: Dimension of that model's embeddings
+            version: Only consider this bundle
+            checksums: See verify
+
+        Returns:
+            The bundle to serve, or None if no bundle is usable
+        """
+        for bundle in cls.available(root):
+            if version and bundle.version != version:
+                continue
+            try:
+                bundle.verify(embedding_model, embedding_dim, checksums=checksums)
+            except (BundleError, KeyError, OSError) as e:
+                print(f"Skipping index bundle {bundle.version}: {e}")
+                continue
+            return bundle
+        return None
+
+    @classmethod
+    def prune(cls, root: str, keep: int) -> List[str]:
+        """Delete all but the newest keep bundles; returns the deleted versions"""
+        removed = []
+        for bundle in cls.available(root)[keep:]:
+            shutil.rmtree(bundle.path, ignore_errors=True)
+            removed.append(bundle.version)
+        return removed
+
+
+def build(root: str, source: str, keep: int) -> IndexBundle:
+    """Index every registered dataset into a scratch directory and package it"""
+    from chatbot.rag_pipeline import RAGPipeline
+    from data_fetcher.data_lake import DataLake
+
+    scratch = os.path.join(root, f".build-{os.getpid()}")
+    shutil.rmtree(scratch, ignore_errors=True)
+    try:
+        # Re-embedding from the lake reads the configured lake; a fresh fetch fills a scratch one
+        lake = DataLake() if source == 'lake' else DataLake(os.path.join(scratch, 'data_lake'))
+        # Start from an empty store: a dataset whose fetch comes back empty must
+        # be missing from the bundle, not carried over from the one being served
+        pipeline = RAGPipeline(index_path=os.path.join(scratch, 'index'), data_lake=lake,
+                               use_bundle=False)
+        pipeline.index_data(source=source)
+        embedder = pipeline.embedding_generator
+        bundle = IndexBundle.create(root, pipeline.vector_store.index_path, embedder.model_name,
+                                    embedder.get_embedding_dim(), lake_path=lake.root)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    removed = IndexBundle.prune(root, keep)
+    if removed:
+        print(f"Pruned old bundles: {', '.join(removed)}")
+    return bundle
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and inspect prebuilt index bundles")
+    parser.add_argument('--root', default=Config.INDEX_BUNDLE_PATH, help="Bundle directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build_parser = commands.add_parser('build', help="Index all datasets into a new bundle")
+    build_parser.add_argument('--source', choices=('api', 'lake'), default='api')
+    build_parser.add_argument('--keep', type=int, default=3, help="Bundles kept, newest first")
+    commands.add_parser('list', help="List bundles, newest first")
+    verify_parser = commands.add_parser('verify', help="Verify bundles against the configured model")
+    verify_parser.add_argument('version', nargs='?')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        bundle = build(args.root, args.source, args.keep)
+        print(json.dumps({key: value for key, value in bundle.manifest().items() if key != 'files'},
+                         indent=2))
+    elif args.command == 'list':
+        for bundle in IndexBundle.available(args.root):
+            try:
+                manifest = bundle.manifest()
+                print(f"{bundle.version}  {manifest['embedding_model']}  "
+                      f"{json.dumps(manifest['datasets'])}")
+            except BundleError as e:
+                print(f"{bundle.version}  invalid: {e}")
+    else:
+        failed = 0
+        for bundle in IndexBundle.available(args.root):
+            if args.version and bundle.version != args.version:
+                continue
+            try:
+                # Unlike startup, which compares sizes by default, hash every file
+                bundle.verify(Config.EMBEDDING_MODEL, checksums=True)
+                print(f"{bundle.version}  ok")
+            except BundleError as e:
+                print(f"{bundle.version}  FAILED: {e}")
+                failed += 1
+        sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+# backend/embeddings/lexical_index.py
+import re
+import pickle
+import numpy as np
+from typing import List, Tuple
+
+
+class LexicalIndex:
+    """BM25 inverted index over document text, stored as compact CSR arrays"""
+
+    TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize lexical index
+
+        Args:
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalisation
+        """
+        self.k1 = k1
+        self.b = b
+        self.vocabulary = {}
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.doc_ids = np.zeros(0, dtype=np.int32)
+        self.term_freqs = np.zeros(0, dtype=np.uint16)
+        self.doc_lengths = np.zeros(0, dtype=np.int32)
+        self.idf = np.zeros(0, dtype=np.float32)
+
+    @classmethod
+    def tokenize(cls, text: str) -> List[str]:
+        """Lowercase and split text into alphanumeric tokens"""
+        return cls.TOKEN_PATTERN.findall(text.lower())
+
+    @property
+    def num_documents(self) -> int:
+        return len(self.doc_lengths)
+
+    def build(self, documents: List[str]):
+        """
+        Build the inverted index from scratch
+
+        Args:
+            documents: Document texts, positioned by document id
+        """
+        postings = {}
+        doc_lengths = np.zeros(len(documents), dtype=np.int32)
+
+        for doc_id, text in enumerate(documents):
+            tokens = self.tokenize(text)
+            doc_lengths[doc_id] = len(tokens)
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                postings.setdefault(token, []).append((doc_id, tf))
+
+        self.vocabulary = {term: i for i, term in enumerate(postings)}
+        lengths = np.fromiter((len(p) for p in postings.values()), dtype=np.int64,
+                              count=len(postings))
+        self.offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        self.doc_ids = np.fromiter((d for p in postings.values() for d, _ in p),
+                                   dtype=np.int32, count=int(self.offsets[-1]))
+        self.term_freqs = np.fromiter((min(tf, 65535) for p in postings.values() for _, tf in p),
+                                      dtype=np.uint16, count=int(self.offsets[-1]))
+        self.doc_lengths = doc_lengths
+
+        n = max(len(documents), 1)
+        self.idf = np.log(1 + (n - lengths + 0.5) / (lengths + 0.5)).astype(np.float32)
+
+        print(f"Lexical index built: {len(documents)} documents, {len(self.vocabulary)} terms")
+
+    def search(self, query: str, k: int = 20) -> List[Tuple[int, float]]:
+        """
+        Score documents against query with BM25
+
+        Args:
+            query: Query text
+            k: Number of results to return
+
+        Returns:
+            List of (document id, score) sorted by descending score
+        """
+        if self.num_documents == 0:
+            return []
+
+        term_ids = {self.vocabulary[t] for t in self.tokenize(query) if t in self.vocabulary}
+        if not term_ids:
+            return []
+
+        scores = np.zeros(self.num_documents, dtype=np.float32)
+        avg_length = max(float(self.doc_lengths.mean()), 1.0)
+
+        for term_id in term_ids:
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            docs = self.doc_ids[start:end]
+            tf = self.term_freqs[start:end].astype(np.float32)
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[docs] / avg_length)
+            # Document ids are unique within one posting list, so fancy-index add is safe
+            scores[docs] += self.idf[term_id] * tf * (self.k1 + 1) / (tf + norm)
+
+        k = min(k, int(np.count_nonzero(scores)))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top]
+
+    def save(self, path: str):
+        """Save index arrays to disk"""
+        with open(path, 'wb') as f:
+            pickle.dump({
+                'k1': self.k1,
+                'b': self.b,
+                'vocabulary': self.vocabulary,
+                'offsets': self.offsets,
+                'doc_ids': self.doc_ids,
+                'term_freqs': self.term_freqs,
+                'doc_lengths': self.doc_lengths,
+                'idf': self.idf
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str) -> 'LexicalIndex':
+        """Load index arrays from disk"""
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+
+        index = cls(k1=state['k1'], b=state['b'])
+        index.vocabulary = state['vocabulary']
+        index.offsets = state['offsets']
+        index.doc_ids = state['doc_ids']
+        index.term_freqs = state['term_freqs']
+        index.doc_lengths = state['doc_lengths']
+        index.idf = state['idf']
+        return index
@@ -0,0 +1,197 @@
+# backend/embeddings/reranker.py
+import time
+import numpy as np
+from typing import Dict, List, Tuple
+from config import Config
+from utils.admission import remaining_time
+
+
+def reciprocal_rank_fusion(rankings: List[List[int]], k: int = 60) -> List[Tuple[int, float]]:
+    """
+    Fuse several ranked lists of document ids
+
+    Args:
+        rankings: Ranked document id lists, best first
+        k: RRF damping constant
+
+    Returns:
+        List of (document id, fused score) sorted by descending score
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def select_by_relevance(docs: List[Dict], k: int, min_similarity: float = None,
+                        cliff: float = None, min_docs: int = None) -> List[Dict]:
+    """
+    Choose how many documents to keep from calibrated similarity
+
+    Documents below min_similarity are dropped. Walking the remaining
+    similarities from the top, the cut is made at the first gap larger than
+    cliff, so a couple of strong matches are not padded out with weak ones.
+
+    Args:
+        docs: Ranked documents carrying 'similarity' (cosine)
+        k: Maximum number of documents
+        min_similarity: Similarity floor
+        cliff: Drop between neighbouring similarities that ends the list
+        min_docs: Documents kept above the floor regardless of cliffs
+
+    Returns:
+        The kept documents in their incoming order
+    """
+    min_similarity = Config.MIN_SIMILARITY if min_similarity is None else min_similarity
+    cliff = Config.RELEVANCE_CLIFF if cliff is None else cliff
+    min_docs = Config.MIN_CONTEXT_DOCS if min_docs is None else min_docs
+
+    similarities = sorted((doc.get('similarity', 0.0) for doc in docs
+                           if doc.get('similarity', 0.0) >= min_similarity), reverse=True)[:k]
+    if not similarities:
+        return []
+
+    cutoff = similarities[-1]
+    for i in range(max(min_docs, 1), len(similarities)):
+        if similarities[i - 1] - similarities[i] > cliff:
+            cutoff = similarities[i - 1]
+            break
+    return [doc for doc in docs if doc.get('similarity', 0.0) >= cutoff][:k]
+
+
+def select_diverse(docs: List[Dict], vectors: np.ndarray, k: int, diversity: float = None,
+                   quotas: Dict[str, List] = None) -> List[Dict]:
+    """
+    Pick k documents by maximal marginal relevance
+
+    Each step takes the candidate maximising
+    (1 - diversity) * similarity - diversity * max similarity to those
+    already picked. While an entity named in quotas has fewer than its
+    share of the k slots (k divided by the number of values of its field),
+    only candidates carrying an under-filled entity are considered, so a
+    comparison gets context for both sides.
+
+    Args:
+        docs: Candidate documents carrying 'similarity' and 'metadata'
+        vectors: Normalized candidate vectors, one row per document
+        k: Number of documents to pick
+        diversity: Weight of redundancy against relevance, 0 to 1
+        quotas: Metadata field -> entity values that should each be covered
+
+    Returns:
+        Picked documents in pick order
+    """
+    diversity = Config.DIVERSITY if diversity is None else diversity
+    n = len(docs)
+    if n <= 1 or k <= 0:
+        return docs[:k]
+
+    relevance = np.array([doc.get('similarity', 0.0) for doc in docs], dtype='float32')
+    pairwise = vectors @ vectors.T
+
+    # Entity membership matrix: one column per (field, value) with a quota
+    columns, shares = [], []
+    for field, values in (quotas or {}).items():
+        share = max(1, k // len(values))
+        for value in values:
+            columns.append([_carries(doc['metadata'].get(field), value) for doc in docs])
+            shares.append(share)
+    members = np.array(columns, dtype=bool).T if columns else np.zeros((n, 0), dtype=bool)
+    remaining = np.array(shares, dtype=np.int64)
+
+    available = np.ones(n, dtype=bool)
+    redundancy = np.full(n, -1.0, dtype='float32')
+    picked = []
+    for _ in range(min(k, n)):
+        scores = (1.0 - diversity) * relevance - diversity * np.maximum(redundancy, 0.0)
+        eligible = available
+        if (remaining > 0).any():
+            needed = available & members[:, remaining > 0].any(axis=1)
+            if needed.any():
+                eligible = needed
+        best = int(np.argmax(np.where(eligible, scores, -np.inf)))
+        picked.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, pairwise[best])
+        remaining -= members[best]
+    return [docs[i] for i in picked]
+
+
+def _carries(value, wanted) -> bool:
+    if isinstance(value, list):
+        return wanted in value
+    return value == wanted
+
+
+class Reranker:
+    """Optional cross-encoder rerank over fused candidates under a latency budget"""
+
+    def __init__(self, model_name: str = None, budget_ms: int = None, batch_size: int = 8):
+        """
+        Initialize reranker
+
+        Args:
+            model_name: Cross-encoder model name (empty disables reranking)
+            budget_ms: Latency budget for scoring in milliseconds
+            batch_size: Number of candidates scored per model call
+        """
+        self.model_name = model_name if model_name is not None else Config.RERANK_MODEL
+        self.budget_ms = budget_ms if budget_ms is not None else Config.RERANK_BUDGET_MS
+        self.batch_size = batch_size
+        self.model = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.model_name)
+
+    def load(self):
+        """Load the cross-encoder; called at startup so no request pays for it"""
+        if self.enabled and self.model is None:
+            from sentence_transformers import CrossEncoder
+            print(f"Loading rerank model: {self.model_name}")
+            self.model = CrossEncoder(self.model_name)
+        return self.model
+
+    def rerank(self, query: str, docs: List[Dict]) -> List[Dict]:
+        """
+        Rerank documents by cross-encoder score
+
+        Candidates are scored in batches in their incoming order while the
+        budget allows another batch; anything left unscored keeps its fused
+        position after the scored ones. A model that was never loaded
+        leaves the order unchanged.
+
+        Args:
+            query: User query
+            docs: Candidate documents, best first
+
+        Returns:
+            Reranked list of documents
+        """
+        if self.model is None or len(docs) < 2:
+            return docs
+
+        # Never spend past the request's own deadline
+        budget = min(self.budget_ms / 1000.0, remaining_time(float('inf')))
+        deadline = time.perf_counter() + budget
+        scored = []
+        batch_seconds = 0.0
+
+        for start in range(0, len(docs), self.batch_size):
+            # Start a batch only if one as slow as the last still fits
+            started = time.perf_counter()
+            if started + batch_seconds >= deadline:
+                break
+            batch = docs[start:start + self.batch_size]
+            scores = self.model.predict([(query, doc['document']) for doc in batch])
+            for doc, score in zip(batch, scores):
+                scored.append((float(score), doc))
+            batch_seconds = time.perf_counter() - started
+
+        scored.sort(key=lambda item: item[0], reverse=True)
+        reranked = []
+        for score, doc in scored:
+            doc['rerank_score'] = score
+            reranked.append(doc)
+        return reranked + docs[len(scored):]
@@ -1,118 +1,1191 @@
 # backend/embeddings/vector_store.py
-import faiss
+import json
 import numpy as np
 import pickle
-from typing import List, Dict, Tuple
+import bisect
+import heapq
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from itertools import islice
+from typing import Any, Iterator, List, Dict, Optional, Tuple
 import os
+import shutil
+from config import Config
+from utils.admission import DeadlineExceeded, remaining_time
+from utils.metrics import timed
+from .lexical_index import LexicalIndex
 
-class VectorStore:
-    """Vector store using FAISS for similarity search"""
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length so inner product equals cosine similarity"""
+    vectors = np.array(vectors, dtype='float32', copy=True, ndmin=2)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    vectors /= norms
+    return vectors
+
+
+class Segment:
+    """Immutable slice of the store: a FAISS index plus its documents"""
+    
+    __slots__ = ('index', 'documents', 'metadata', 'offset', 'is_mapped', 'full_vectors', '_postings')
     
-    def __init__(self, embedding_dim: int, index_path: str = "vector_store"):
+    def __init__(self, index: Any, documents: Tuple[str, ...], metadata: Tuple[Dict, ...],
+                 offset: int, is_mapped: bool = False, full_vectors: np.ndarray = None):
+        self.index = index
+        self.documents = documents
+        self.metadata = metadata
+        self.offset = offset
+        self.is_mapped = is_mapped
+        # Memory-mapped float32 originals of a compressed index, used for re-ranking
+        self.full_vectors = full_vectors
+        # Field -> value -> sorted local ids, built per field on first filtered search
+        self._postings = {}
+    
+    @property
+    def size(self) -> int:
+        return len(self.documents)
+    
+    def _field_postings(self, field: str) -> Dict[Any, np.ndarray]:
+        """Local ids by value of one metadata field; None holds documents without it"""
+        postings = self._postings.get(field)
+        if postings is None:
+            # Benign race: concurrent readers build identical postings
+            lists = {}
+            for local_idx, metadata in enumerate(self.metadata):
+                value = metadata.get(field)
+                for item in value if isinstance(value, list) else [value]:
+                    lists.setdefault(item, []).append(local_idx)
+            postings = {value: np.array(ids, dtype='int64') for value, ids in lists.items()}
+            self._postings[field] = postings
+        return postings
+    
+    def matching(self, filters: Dict) -> np.ndarray:
         """
-        Initialize vector store
+        Local ids of the documents that pass the filters, see IndexShard.matches_filters
+        
+        Args:
+            filters: Dictionary mapping fields to allowed values
+        
+        Returns:
+            Sorted int64 array of local ids
+        """
+        allowed = None
+        for field, values in filters.items():
+            postings = self._field_postings(field)
+            parts = [postings[value] for value in list(values) + [None] if value in postings]
+            ids = np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype='int64')
+            allowed = ids if allowed is None else np.intersect1d(allowed, ids, assume_unique=True)
+            if not len(allowed):
+                break
+        return np.arange(self.size, dtype='int64') if allowed is None else allowed
+
+
+class StoreSnapshot:
+    """
+    Immutable, versioned view of the store
+    
+    Readers grab the current snapshot once and use only it; writers build a
+    new snapshot and publish it with a single reference assignment. Segments
+    are never mutated after publication, so searches need no locks.
+    """
+    
+    __slots__ = ('version', 'segments', 'lexical_index', 'total', 'offsets',
+                 '_documents', '_metadata')
+    
+    def __init__(self, version: int, segments: Tuple[Segment, ...],
+                 lexical_index: Optional[LexicalIndex] = None):
+        self.version = version
+        self.segments = segments
+        self.lexical_index = lexical_index
+        self.total = sum(segment.size for segment in segments)
+        self.offsets = [segment.offset for segment in segments]
+        self._documents = None
+        self._metadata = None
+    
+    def locate(self, idx: int) -> Tuple[Segment, int]:
+        """Map a global document id to (segment, local id)"""
+        if not 0 <= idx < self.total:
+            raise IndexError(f"Document id {idx} out of range for {self.total} documents")
+        segment = self.segments[bisect.bisect_right(self.offsets, idx) - 1]
+        return segment, idx - segment.offset
+    
+    @property
+    def documents(self) -> List[str]:
+        # Materialised on first use; benign race, both threads build the same list
+        if self._documents is None:
+            self._documents = [doc for segment in self.segments for doc in segment.documents]
+        return self._documents
+    
+    @property
+    def metadata(self) -> List[Dict]:
+        if self._metadata is None:
+            self._metadata = [meta for segment in self.segments for meta in segment.metadata]
+        return self._metadata
+
+
+class IndexShard:
+    """
+    One FAISS index with its documents; the vector store keeps one per dataset
+    
+    Vectors are L2-normalised and searched by inner product, so similarity
+    is cosine in [-1, 1] and 'distance' is 1 - cosine. Shards saved with the
+    old L2 metric load as 'l2' and are converted by migrate_to_inner_product.
+    
+    Appends always go to full-precision flat segments. With compression the
+    shard is re-encoded when saved: 'fp16' and 'sq8' scalar quantization or
+    'pq' product quantization, with the float32 originals written alongside
+    and memory-mapped so candidates can be re-ranked exactly.
+    """
+    
+    # Files owned by the shard itself; anything else in index_path is a sidecar
+    STORE_FILES = ('index.faiss', 'documents.pkl', 'metadata.pkl', 'lexical.pkl', 'vectors.npy')
+    COMPRESSIONS = ('none', 'fp16', 'sq8', 'pq')
+    # PQ codebooks need a few thousand vectors to train; smaller shards use fp16
+    PQ_MIN_TRAIN = 39 * 256
+    TRAIN_SAMPLE = 100000
+    
+    def __init__(self, embedding_dim: int, index_path: str = "vector_store", metric: str = 'ip',
+                 compression: str = None):
+        """
+        Initialize index shard
         
         Args:
             embedding_dim: Dimension of embeddings
-            index_path: Path to save/load index
+            index_path: Path to save/load the shard
+            metric: 'ip' (cosine on normalised vectors) or 'l2' (legacy)
+            compression: 'none', 'fp16', 'sq8' or 'pq' for the saved index
         """
         self.embedding_dim = embedding_dim
         self.index_path = index_path
-        self.index = faiss.IndexFlatL2(embedding_dim)
-        self.documents = []
-        self.metadata = []
+        self.metric = metric
+        self.compression = compression or Config.INDEX_COMPRESSION
+        if self.compression not in self.COMPRESSIONS:
+            raise ValueError(f"Unknown index compression: {self.compression}")
+        self._write_lock = threading.Lock()
+        self._snapshot = StoreSnapshot(0, ())
+        # Documents in the files on disk; appends since the last save are not
+        self.saved_total = 0
+    
+    # --- Read-side views of the current snapshot ---
+    
+    def snapshot(self) -> StoreSnapshot:
+        """Current immutable snapshot; hold on to it for multi-step reads"""
+        return self._snapshot
+    
+    @property
+    def documents(self) -> List[str]:
+        return self._snapshot.documents
+    
+    @property
+    def metadata(self) -> List[Dict]:
+        return self._snapshot.metadata
+    
+    @property
+    def lexical_index(self) -> Optional[LexicalIndex]:
+        return self._snapshot.lexical_index
+    
+    @property
+    def is_mapped(self) -> bool:
+        return any(segment.is_mapped for segment in self._snapshot.segments)
+    
+    def _new_index(self):
+        # faiss is imported lazily so workers only pay for it when a store is built
+        import faiss
+        if self.metric == 'ip':
+            return faiss.IndexFlatIP(self.embedding_dim)
+        return faiss.IndexFlatL2(self.embedding_dim)
+    
+    def _prepare(self, vectors: np.ndarray) -> np.ndarray:
+        """Vectors as the index expects them: float32, normalised for 'ip'"""
+        if self.metric == 'ip':
+            return _normalize_rows(vectors)
+        return np.ascontiguousarray(vectors, dtype='float32').reshape(-1, self.embedding_dim)
+    
+    def _faiss_metric(self):
+        import faiss
+        return faiss.METRIC_INNER_PRODUCT if self.metric == 'ip' else faiss.METRIC_L2
+    
+    def _compressed_index(self, vectors: np.ndarray):
+        """Encode full-precision vectors with the shard's compression"""
+        import faiss
+        
+        compression = self.compression
+        if compression == 'pq' and len(vectors) < self.PQ_MIN_TRAIN:
+            compression = 'fp16'
+        
+        if compression == 'pq':
+            m = Config.PQ_SUBQUANTIZERS
+            if self.embedding_dim % m:
+                raise ValueError(f"PQ_SUBQUANTIZERS={m} must divide the embedding dimension {self.embedding_dim}")
+            index = faiss.IndexPQ(self.embedding_dim, m, 8, self._faiss_metric())
+        else:
+            qtype = faiss.ScalarQuantizer.QT_fp16 if compression == 'fp16' else faiss.ScalarQuantizer.QT_8bit
+            index = faiss.IndexScalarQuantizer(self.embedding_dim, qtype, self._faiss_metric())
+        
+        if not index.is_trained:
+            sample = vectors
+            if len(vectors) > self.TRAIN_SAMPLE:
+                rows = np.random.default_rng(0).choice(len(vectors), self.TRAIN_SAMPLE, replace=False)
+                sample = vectors[np.sort(rows)]
+            index.train(sample)
+        index.add(vectors)
+        return index
+    
+    @staticmethod
+    def _compression_of(index) -> str:
+        import faiss
+        
+        if isinstance(index, faiss.IndexPQ):
+            return 'pq'
+        if isinstance(index, faiss.IndexScalarQuantizer):
+            return 'fp16' if index.sq.qtype == faiss.ScalarQuantizer.QT_fp16 else 'sq8'
+        return 'none'
+    
+    @staticmethod
+    def _vector(segment: Segment, local_idx: int) -> np.ndarray:
+        """Stored vector, exact when the originals are available"""
+        if segment.full_vectors is not None:
+            return np.asarray(segment.full_vectors[local_idx], dtype='float32')
+        return segment.index.reconstruct(local_idx)
+    
+    def _full_precision(self, snapshot: StoreSnapshot) -> np.ndarray:
+        """All vectors of a snapshot as float32, exact where possible"""
+        parts = []
+        for segment in snapshot.segments:
+            if segment.full_vectors is not None:
+                parts.append(np.asarray(segment.full_vectors, dtype='float32'))
+            else:
+                parts.append(segment.index.reconstruct_n(0, segment.size))
+        if not parts:
+            return np.zeros((0, self.embedding_dim), dtype='float32')
+        return np.ascontiguousarray(np.concatenate(parts))
+    
+    def _to_distance(self, raw: float) -> float:
+        """FAISS score as a lower-is-better distance"""
+        return 1.0 - raw if self.metric == 'ip' else raw
+    
+    def _similarity(self, distance: float) -> float:
+        """Calibrated similarity: cosine for 'ip' shards"""
+        return 1.0 - distance if self.metric == 'ip' else 1 / (1 + distance)
+    
+    # --- Writes ---
+    
+    def _publish(self, segments: Tuple[Segment, ...], lexical_index: Optional[LexicalIndex]):
+        """Swap in a new snapshot; caller holds the write lock"""
+        self._snapshot = StoreSnapshot(self._snapshot.version + 1, segments, lexical_index)
+    
+    @staticmethod
+    def _merge(older: Segment, newer: Segment) -> Segment:
+        """Merge two adjacent segments into a fresh one, leaving both untouched"""
+        import faiss
         
-    def add_documents(self, embeddings: np.ndarray, documents: List[str], 
-                     metadata: List[Dict]):
+        index = faiss.clone_index(older.index)
+        index.add(newer.index.reconstruct_n(0, newer.index.ntotal))
+        return Segment(index, older.documents + newer.documents,
+                       older.metadata + newer.metadata, older.offset)
+    
+    def add_documents(self, embeddings: np.ndarray, documents: List[str],
+                     metadata: List[Dict]) -> List[int]:
         """
         Add documents to vector store
         
+        The batch becomes a new segment. Adjacent segments are merged while
+        the newer one is at least as large as the older, which keeps the
+        segment count logarithmic and each vector copied O(log n) times.
+        
         Args:
             embeddings: Document embeddings
             documents: Document texts
             metadata: Document metadata
+        
+        Returns:
+            Ids of the added documents within the shard
         """
-        # Ensure embeddings are float32
-        embeddings = embeddings.astype('float32')
+        embeddings = self._prepare(embeddings)
         
-        # Add to FAISS index
-        self.index.add(embeddings)
+        index = self._new_index()
+        index.add(embeddings)
         
-        # Store documents and metadata
-        self.documents.extend(documents)
-        self.metadata.extend(metadata)
+        with self._write_lock:
+            snapshot = self._snapshot
+            segments = list(snapshot.segments)
+            offset = snapshot.total
+            segments.append(Segment(index, tuple(documents), tuple(metadata), offset))
+            
+            # Compressed segments are never merged into; they would lose their originals
+            while (len(segments) > 1 and segments[-1].size >= segments[-2].size
+                   and segments[-2].full_vectors is None):
+                newer = segments.pop()
+                segments[-1] = self._merge(segments[-1], newer)
+            
+            # Lexical index keeps covering the ids it was built over; new ids
+            # are reachable through dense search until the next rebuild
+            self._publish(tuple(segments), snapshot.lexical_index)
+            total = self._snapshot.total
         
-        print(f"Added {len(documents)} documents. Total: {self.index.ntotal}")
+        print(f"Added {len(documents)} documents. Total: {total}")
+        return list(range(offset, offset + len(documents)))
     
-    def search(self, query_embedding: np.ndarray, k: int = 5) -> List[Dict]:
+    def build_lexical_index(self):
+        """Rebuild the BM25 index over all stored documents"""
+        with self._write_lock:
+            snapshot = self._snapshot
+            lexical_index = LexicalIndex()
+            lexical_index.build(snapshot.documents)
+            self._publish(snapshot.segments, lexical_index)
+    
+    def migrate_to_inner_product(self) -> bool:
+        """
+        Convert an L2 shard to a normalised inner-product one in place
+        
+        Returns:
+            True if the shard was converted, False if it already used 'ip'
+        """
+        if self.metric == 'ip':
+            return False
+        with self._write_lock:
+            snapshot = self._snapshot
+            self.metric = 'ip'
+            index = self._new_index()
+            if snapshot.total:
+                index.add(self._prepare(self._full_precision(snapshot)))
+            segments = (Segment(index, tuple(snapshot.documents), tuple(snapshot.metadata), 0),)
+            self._publish(segments if snapshot.total else (), snapshot.lexical_index)
+        return True
+    
+    # --- Reads ---
+    
+    def search(self, query_embedding: np.ndarray, k: int = 5,
+               filters: Dict = None) -> List[Dict]:
         """
         Search for similar documents
         
         Args:
             query_embedding: Query embedding
             k: Number of results to return
-            
+            filters: Optional metadata filters, see matches_filters
+        
         Returns:
             List of dictionaries containing documents and metadata
         """
-        # Ensure query is float32 and 2D
-        query_embedding = query_embedding.astype('float32').reshape(1, -1)
+        return self.search_batch(query_embedding, k=k, filters=[filters])[0]
+    
+    def search_batch(self, query_embeddings: np.ndarray, k: int = 5,
+                     filters: List[Optional[Dict]] = None) -> List[List[Dict]]:
+        """
+        Search for several queries with one index call per segment
+        
+        Args:
+            query_embeddings: Query embeddings, one row per query
+            k: Number of results to return per query
+            filters: Optional metadata filters per query, see matches_filters
+        
+        Returns:
+            One result list per query, as returned by search
+        """
+        snapshot = self._snapshot
+        
+        query_embeddings = self._prepare(query_embeddings)
+        num_queries = len(query_embeddings)
+        filters = filters or [None] * num_queries
         
-        # Search FAISS index
-        distances, indices = self.index.search(query_embedding, k)
+        # Queries with the same filters share one index call per segment
+        groups = {}
+        for row, query_filters in enumerate(filters):
+            key = tuple(sorted((field, tuple(values)) for field, values in query_filters.items())) \
+                if query_filters else None
+            groups.setdefault(key, (query_filters, []))[1].append(row)
+        
+        # Search every segment and keep the overall nearest per query
+        candidates = [[] for _ in range(num_queries)]
+        for segment in snapshot.segments:
+            for query_filters, rows in groups.values():
+                # Filtered queries only score documents that pass, so k matches
+                # are found however rare they are
+                allowed = segment.matching(query_filters) if query_filters else None
+                if allowed is not None and not len(allowed):
+                    continue
+                distances, indices = self._search_segment(segment, query_embeddings[rows], k, allowed)
+                for row, row_distances, row_indices in zip(rows, distances, indices):
+                    for raw, local_idx in zip(row_distances, row_indices):
+                        if local_idx >= 0:
+                            candidates[row].append((self._to_distance(float(raw)), segment, int(local_idx)))
         
         # Prepare results
-        results = []
-        for i, idx in enumerate(indices[0]):
-            if idx < len(self.documents):
-                results.append({
-                    'document': self.documents[idx],
-                    'metadata': self.metadata[idx],
-                    'distance': float(distances[0][i]),
-                    'similarity': 1 / (1 + float(distances[0][i]))
-                })
-        
-        return results
+        batch_results = []
+        for row in range(num_queries):
+            row_candidates = candidates[row]
+            if len(snapshot.segments) > 1:
+                row_candidates = heapq.nsmallest(k, row_candidates, key=lambda c: c[0])
+            batch_results.append([
+                {
+                    'id': segment.offset + local_idx,
+                    'document': segment.documents[local_idx],
+                    'metadata': segment.metadata[local_idx],
+                    'distance': distance,
+                    'similarity': self._similarity(distance)
+                }
+                for distance, segment, local_idx in row_candidates[:k]
+            ])
+        
+        return batch_results
+    
+    def _search_segment(self, segment: Segment, query_embeddings: np.ndarray, k: int,
+                        allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search one segment, optionally restricted to some of its documents
+        
+        Args:
+            segment: Segment to search
+            query_embeddings: Prepared query embeddings
+            k: Results per query
+            allowed: Sorted local ids the search is restricted to, or None
+        
+        Returns:
+            FAISS-style (scores, local ids), -1 padded
+        """
+        if allowed is not None and len(allowed) == segment.size:
+            allowed = None
+        
+        if segment.full_vectors is not None:
+            if allowed is None:
+                return self._search_reranked(segment, query_embeddings, k)
+            # Score the matching originals exactly; no need for the compressed codes
+            return self._score_exact(segment.full_vectors, allowed, query_embeddings, k)
+        
+        params = None
+        if allowed is not None:
+            import faiss
+            params = faiss.SearchParameters(sel=faiss.IDSelectorBatch(len(allowed), faiss.swig_ptr(allowed)))
+        size = segment.size if allowed is None else len(allowed)
+        return segment.index.search(query_embeddings, min(k, size), params=params)
+    
+    def _search_reranked(self, segment: Segment, query_embeddings: np.ndarray,
+                         search_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Over-fetch from a compressed segment, then rescore with the exact vectors"""
+        fetch_k = min(search_k * Config.COMPRESSED_RERANK_FACTOR, segment.size)
+        _, fetched = segment.index.search(query_embeddings, fetch_k)
+        width = min(search_k, fetch_k)
+        distances = np.zeros((len(query_embeddings), width), dtype='float32')
+        indices = np.full((len(query_embeddings), width), -1, dtype='int64')
+        for row, query_embedding in enumerate(query_embeddings):
+            ids = np.sort(fetched[row][fetched[row] >= 0])
+            row_distances, row_indices = self._score_exact(segment.full_vectors, ids,
+                                                           query_embedding[None, :], width)
+            distances[row] = row_distances[0]
+            indices[row] = row_indices[0]
+        return distances, indices
+    
+    def _score_exact(self, vectors: np.ndarray, ids: np.ndarray, query_embeddings: np.ndarray,
+                     k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k of the given rows of full-precision vectors, FAISS-style and -1 padded"""
+        width = min(k, len(ids))
+        distances = np.zeros((len(query_embeddings), width), dtype='float32')
+        indices = np.full((len(query_embeddings), width), -1, dtype='int64')
+        chosen = np.asarray(vectors[ids], dtype='float32')
+        for row, query_embedding in enumerate(query_embeddings):
+            if self.metric == 'ip':
+                scores = chosen @ query_embedding
+                order = np.argsort(-scores)
+            else:
+                scores = np.sum((chosen - query_embedding) ** 2, axis=1)
+                order = np.argsort(scores)
+            order = order[:width]
+            distances[row, :len(order)] = scores[order]
+            indices[row, :len(order)] = ids[order]
+        return distances, indices
+    
+    @staticmethod
+    def matches_filters(metadata: Dict, filters: Dict) -> bool:
+        """
+        Check document metadata against filters
+        
+        Each filter maps a metadata field to its allowed values. Documents
+        that do not carry a field are not constrained by it, so a state
+        filter does not exclude rainfall documents. List-valued fields, as
+        on grouped documents, match if any of their values is allowed.
+        
+        Args:
+            metadata: Document metadata
+            filters: Dictionary mapping fields to allowed values
+        
+        Returns:
+            True if the document passes every applicable filter
+        """
+        for field, allowed in filters.items():
+            value = metadata.get(field)
+            if value is None:
+                continue
+            if isinstance(value, list):
+                if not any(item in allowed for item in value):
+                    return False
+            elif value not in allowed:
+                return False
+        return True
+    
+    def get_document(self, idx: int, query_embedding: np.ndarray = None) -> Dict:
+        """
+        Fetch a stored document by id
+        
+        Args:
+            idx: Document id
+            query_embedding: Optional query embedding to score the document against
+        
+        Returns:
+            Dictionary in the same shape as search results
+        """
+        segment, local_idx = self._snapshot.locate(int(idx))
+        result = {
+            'id': int(idx),
+            'document': segment.documents[local_idx],
+            'metadata': segment.metadata[local_idx]
+        }
+        
+        if query_embedding is not None:
+            vector = self._vector(segment, local_idx)
+            query = self._prepare(query_embedding).ravel()
+            if self.metric == 'ip':
+                distance = self._to_distance(float(np.dot(vector, query)))
+            else:
+                distance = float(np.sum((vector - query) ** 2))
+            result['distance'] = distance
+            result['similarity'] = self._similarity(distance)
+        
+        return result
+    
+    def get_vectors(self, ids: List[int]) -> np.ndarray:
+        """Stored vectors for document ids, one row per id"""
+        snapshot = self._snapshot
+        vectors = np.zeros((len(ids), self.embedding_dim), dtype='float32')
+        for row, idx in enumerate(ids):
+            segment, local_idx = snapshot.locate(int(idx))
+            vectors[row] = self._vector(segment, local_idx)
+        return vectors
+    
+    def search_lexical(self, query: str, k: int = 20) -> List[Tuple[int, float]]:
+        """
+        Search the BM25 index
+        
+        Args:
+            query: Query text
+            k: Number of results to return
+        
+        Returns:
+            List of (document id, BM25 score)
+        """
+        lexical_index = self._snapshot.lexical_index
+        if lexical_index is None:
+            return []
+        return lexical_index.search(query, k=k)
+    
+    # --- Persistence ---
+    
+    def _compacted_index(self, snapshot: StoreSnapshot):
+        """Single FAISS index over all segments of a snapshot, for saving"""
+        if len(snapshot.segments) == 1:
+            return snapshot.segments[0].index
+        index = self._new_index()
+        for segment in snapshot.segments:
+            index.add(segment.index.reconstruct_n(0, segment.size))
+        return index
     
     def save(self):
-        """Save vector store to disk"""
-        os.makedirs(self.index_path, exist_ok=True)
+        """
+        Save vector store to disk
+        
+        Files are written to a staging directory that then replaces the
+        current one, so a process that has the old index memory-mapped never
+        sees a half-written file.
+        """
+        import faiss
+        
+        snapshot = self._snapshot
+        staging_path = self.index_path + ".staging"
+        previous_path = self.index_path + ".previous"
+        shutil.rmtree(staging_path, ignore_errors=True)
+        os.makedirs(staging_path)
         
-        # Save FAISS index
-        faiss.write_index(self.index, os.path.join(self.index_path, "index.faiss"))
+        # Save FAISS index, re-encoded with the configured compression
+        full_vectors = None
+        if self.compression == 'none' or not snapshot.total:
+            index = self._compacted_index(snapshot)
+        else:
+            full_vectors = self._full_precision(snapshot)
+            index = self._compressed_index(full_vectors)
+            np.save(os.path.join(staging_path, "vectors.npy"), full_vectors)
+        faiss.write_index(index, os.path.join(staging_path, "index.faiss"))
         
         # Save documents and metadata
-        with open(os.path.join(self.index_path, "documents.pkl"), 'wb') as f:
-            pickle.dump(self.documents, f)
+        with open(os.path.join(staging_path, "documents.pkl"), 'wb') as f:
+            pickle.dump(snapshot.documents, f)
+        
+        with open(os.path.join(staging_path, "metadata.pkl"), 'wb') as f:
+            pickle.dump(snapshot.metadata, f)
+        
+        if snapshot.lexical_index is not None:
+            snapshot.lexical_index.save(os.path.join(staging_path, "lexical.pkl"))
         
-        with open(os.path.join(self.index_path, "metadata.pkl"), 'wb') as f:
-            pickle.dump(self.metadata, f)
+        # Carry over sidecar files written by other components
+        if os.path.isdir(self.index_path):
+            for name in os.listdir(self.index_path):
+                if name not in self.STORE_FILES:
+                    shutil.copy2(os.path.join(self.index_path, name), staging_path)
         
-        print(f"Vector store saved to {self.index_path}")
+        shutil.rmtree(previous_path, ignore_errors=True)
+        if os.path.exists(self.index_path):
+            os.rename(self.index_path, previous_path)
+        os.rename(staging_path, self.index_path)
+        shutil.rmtree(previous_path, ignore_errors=True)
+        self.saved_total = snapshot.total
+        
+        # Serve from the compact encoding from now on, unless writes raced the save
+        if full_vectors is not None:
+            with self._write_lock:
+                if self._snapshot is snapshot:
+                    mapped = np.load(os.path.join(self.index_path, "vectors.npy"), mmap_mode='r')
+                    segment = Segment(index, tuple(snapshot.documents), tuple(snapshot.metadata),
+                                      0, full_vectors=mapped)
+                    self._publish((segment,), snapshot.lexical_index)
+        
+        print(f"Shard saved to {self.index_path}")
     
     def load(self):
-        """Load vector store from disk"""
+        """Load the shard from disk"""
         if not os.path.exists(self.index_path):
             print(f"No saved index found at {self.index_path}")
             return False
         
-        # Load FAISS index
-        self.index = faiss.read_index(os.path.join(self.index_path, "index.faiss"))
+        import faiss
+        
+        # Load FAISS index, memory-mapping it so forked workers share pages
+        index_file = os.path.join(self.index_path, "index.faiss")
+        index = None
+        is_mapped = False
+        if Config.INDEX_MMAP:
+            try:
+                mmap_flag = getattr(faiss, 'IO_FLAG_MMAP_IFC', faiss.IO_FLAG_MMAP)
+                index = faiss.read_index(index_file, mmap_flag)
+                is_mapped = True
+            except RuntimeError as e:
+                print(f"Memory-mapped index load failed, reading into memory: {e}")
+        if index is None:
+            index = faiss.read_index(index_file)
+        self.metric = 'ip' if index.metric_type == faiss.METRIC_INNER_PRODUCT else 'l2'
+        if self._compression_of(index) != self.compression:
+            print(f"Shard at {self.index_path} is stored as {self._compression_of(index)}; "
+                  f"it is re-encoded as {self.compression} on the next save")
+        
+        full_vectors = None
+        vectors_path = os.path.join(self.index_path, "vectors.npy")
+        if os.path.exists(vectors_path):
+            full_vectors = np.load(vectors_path, mmap_mode='r')
         
         # Load documents and metadata
         with open(os.path.join(self.index_path, "documents.pkl"), 'rb') as f:
-            self.documents = pickle.load(f)
+            documents = pickle.load(f)
         
         with open(os.path.join(self.index_path, "metadata.pkl"), 'rb') as f:
-            self.metadata = pickle.load(f)
+            metadata = pickle.load(f)
+        
+        lexical_index = None
+        lexical_path = os.path.join(self.index_path, "lexical.pkl")
+        if os.path.exists(lexical_path):
+            lexical_index = LexicalIndex.load(lexical_path)
+        
+        with self._write_lock:
+            segments = (Segment(index, tuple(documents), tuple(metadata), 0, is_mapped, full_vectors),)
+            self._publish(segments if documents else (), lexical_index)
+        self.saved_total = len(documents)
+        
+        print(f"Shard loaded from {self.index_path}. Total documents: {len(documents)}")
+        return True
+    
+    def get_stats(self) -> Dict:
+        """Get shard statistics"""
+        snapshot = self._snapshot
+        # Encoded vector bytes; flat indexes store 4 bytes per dimension
+        index_bytes = sum(
+            segment.index.ntotal * getattr(segment.index, 'code_size', 4 * self.embedding_dim)
+            for segment in snapshot.segments
+        )
+        return {
+            'total_documents': snapshot.total,
+            'embedding_dimension': self.embedding_dim,
+            'index_size': sum(segment.index.ntotal for segment in snapshot.segments),
+            'segments': len(snapshot.segments),
+            'version': snapshot.version,
+            'memory_mapped': any(segment.is_mapped for segment in snapshot.segments),
+            'lexical_terms': len(snapshot.lexical_index.vocabulary) if snapshot.lexical_index else 0,
+            'metric': self.metric,
+            'compression': self.compression,
+            'index_bytes': index_bytes,
+            'bytes_per_vector': index_bytes / snapshot.total if snapshot.total else 0.0,
+            'full_precision_bytes': sum(segment.full_vectors.nbytes for segment in snapshot.segments
+                                        if segment.full_vectors is not None)
+        }
+
+
+class VectorStore:
+    """
+    Vector store using FAISS for similarity search, sharded by dataset
+    
+    Each document goes to the shard named by its metadata 'type' (and, with
+    SHARD_BY_STATE, its state as "type@state"), so a dataset can be rebuilt
+    or added without touching the others. Document ids encode the shard
+    number in their high bits and stay stable while other shards change.
+    
+    Searches fan out over the selected shards on a shared thread pool;
+    FAISS releases the GIL, so shards are scanned in parallel.
+    """
+    
+    MANIFEST = "shards.json"
+    SHARD_ID_STRIDE = 1 << 32
+    # Below this many vectors the thread hand-off costs more than the scan
+    PARALLEL_SEARCH_MIN_DOCS = 20000
+    
+    _executor = None
+    _executor_lock = threading.Lock()
+    
+    def __init__(self, embedding_dim: int, index_path: str = "vector_store",
+                 compression: str = None):
+        """
+        Initialize vector store
+        
+        Args:
+            embedding_dim: Dimension of embeddings
+            index_path: Path to save/load index
+            compression: Shard compression, see IndexShard (defaults to Config)
+        """
+        self.embedding_dim = embedding_dim
+        self.index_path = index_path
+        self.compression = compression or Config.INDEX_COMPRESSION
+        self._write_lock = threading.Lock()
+        # Shard dict and numbering are replaced, never mutated, once published
+        self._shards: Dict[str, IndexShard] = {}
+        self._numbers: Dict[str, int] = {}
+    
+    # --- Shards ---
+    
+    @staticmethod
+    def shard_key(metadata: Dict) -> str:
+        """Shard a document belongs to"""
+        dataset = metadata.get('type') or 'default'
+        state = metadata.get('state')
+        if Config.SHARD_BY_STATE and state:
+            return f"{dataset}@{state}"
+        return dataset
+    
+    @staticmethod
+    def dataset_of(shard_name: str) -> str:
+        return shard_name.split('@', 1)[0]
+    
+    @property
+    def shards(self) -> Dict[str, IndexShard]:
+        return self._shards
+    
+    def _shard_path(self, name: str) -> str:
+        return os.path.join(self.index_path, "shards", name)
+    
+    def new_shard(self, name: str) -> IndexShard:
+        """Empty shard that can be filled and handed to with_shards"""
+        return IndexShard(self.embedding_dim, self._shard_path(name), compression=self.compression)
+    
+    def _get_or_create_shard(self, name: str) -> IndexShard:
+        shard = self._shards.get(name)
+        if shard is not None:
+            return shard
+        with self._write_lock:
+            if name not in self._shards:
+                numbers = dict(self._numbers)
+                numbers.setdefault(name, max(numbers.values(), default=-1) + 1)
+                self._numbers = numbers
+                self._shards = {**self._shards, name: self.new_shard(name)}
+            return self._shards[name]
+    
+    def with_shards(self, shards: Dict[str, IndexShard],
+                    replace_datasets: Optional[List[str]] = None) -> 'VectorStore':
+        """
+        New store sharing this one's shards except those given
+        
+        The current store is left untouched, so callers can swap the
+        returned store in with a single reference assignment.
+        
+        Args:
+            shards: Shards to add or replace, by name
+            replace_datasets: Datasets whose existing shards are all dropped first
+        """
+        store = VectorStore(self.embedding_dim, self.index_path, self.compression)
+        numbers = dict(self._numbers)
+        for name in shards:
+            numbers.setdefault(name, max(numbers.values(), default=-1) + 1)
+        kept = {name: shard for name, shard in self._shards.items()
+                if self.dataset_of(name) not in (replace_datasets or ())}
+        store._numbers = numbers
+        store._shards = {**kept, **shards}
+        return store
+    
+    def route(self, datasets: Optional[List[str]] = None,
+              states: Optional[List[str]] = None) -> Optional[List[str]]:
+        """
+        Shards relevant to a query
+        
+        Args:
+            datasets: Datasets the query is about (all if omitted)
+            states: States named in the query; only narrows state-partitioned shards
+        
+        Returns:
+            Shard names, or None to search every shard
+        """
+        if not datasets and not states:
+            return None
+        selected = []
+        for name in self._shards:
+            dataset, _, state = name.partition('@')
+            if datasets and dataset not in datasets:
+                continue
+            if states and state and state not in states:
+                continue
+            selected.append(name)
+        return selected or None
+    
+    def _ordered(self, names: Optional[List[str]] = None) -> List[Tuple[str, IndexShard]]:
+        shards, numbers = self._shards, self._numbers
+        selected = shards if names is None else [name for name in names if name in shards]
+        return sorted(((name, shards[name]) for name in selected), key=lambda item: numbers[item[0]])
+    
+    def _encode_id(self, name: str, local_idx: int) -> int:
+        return self._numbers[name] * self.SHARD_ID_STRIDE + local_idx
+    
+    def _decode_id(self, idx: int) -> Tuple[str, IndexShard, int]:
+        number, local_idx = divmod(int(idx), self.SHARD_ID_STRIDE)
+        for name, shard_number in self._numbers.items():
+            if shard_number == number and name in self._shards:
+                return name, self._shards[name], local_idx
+        raise IndexError(f"Document id {idx} does not belong to any shard")
+    
+    # --- Read-side views ---
+    
+    @property
+    def documents(self) -> List[str]:
+        return [doc for _, shard in self._ordered() for doc in shard.documents]
+    
+    @property
+    def metadata(self) -> List[Dict]:
+        return [meta for _, shard in self._ordered() for meta in shard.metadata]
+    
+    def metadata_items(self) -> Iterator[Tuple[int, Dict]]:
+        """(document id, metadata) for every stored document"""
+        for name, shard in self._ordered():
+            for local_idx, meta in enumerate(shard.metadata):
+                yield self._encode_id(name, local_idx), meta
+    
+    @property
+    def has_lexical_index(self) -> bool:
+        return any(shard.lexical_index is not None for shard in self._shards.values())
+    
+    @property
+    def is_mapped(self) -> bool:
+        return any(shard.is_mapped for shard in self._shards.values())
+    
+    # --- Writes ---
+    
+    def add_documents(self, embeddings: np.ndarray, documents: List[str],
+                      metadata: List[Dict], shard: str = None) -> List[int]:
+        """
+        Add documents to vector store
+        
+        Args:
+            embeddings: Document embeddings
+            documents: Document texts
+            metadata: Document metadata
+            shard: Shard to add to (defaults to each document's shard_key)
+        
+        Returns:
+            Ids of the added documents, in input order
+        """
+        embeddings = np.ascontiguousarray(embeddings, dtype='float32')
+        groups: Dict[str, List[int]] = {}
+        for i, meta in enumerate(metadata):
+            groups.setdefault(shard or self.shard_key(meta), []).append(i)
+        
+        ids = [None] * len(documents)
+        for name, rows in groups.items():
+            target = self._get_or_create_shard(name)
+            if len(groups) == 1:
+                local_ids = target.add_documents(embeddings, documents, metadata)
+            else:
+                local_ids = target.add_documents(embeddings[rows], [documents[i] for i in rows],
+                                                 [metadata[i] for i in rows])
+            for row, local_idx in zip(rows, local_ids):
+                ids[row] = self._encode_id(name, local_idx)
+        return ids
+    
+    def build_lexical_index(self, shards: Optional[List[str]] = None):
+        """Rebuild the BM25 index of the given shards (all by default)"""
+        for _, shard in self._ordered(shards):
+            shard.build_lexical_index()
+    
+    # --- Reads ---
+    
+    @classmethod
+    def _pool(cls) -> ThreadPoolExecutor:
+        # One pool per process, created lazily so forked workers get their own
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(max_workers=Config.SEARCH_WORKERS,
+                                                       thread_name_prefix='shard-search')
+        return cls._executor
+    
+    def _fan_out(self, shards: List[Tuple[str, IndexShard]], search) -> List[List]:
+        """Run search(name, shard) on every shard, in parallel when worthwhile"""
+        total = sum(shard.snapshot().total for _, shard in shards)
+        if len(shards) < 2 or Config.SEARCH_WORKERS < 2 or total < self.PARALLEL_SEARCH_MIN_DOCS:
+            return [search(name, shard) for name, shard in shards]
+        # Pool threads do not see the request's deadline; bound the wait here
+        try:
+            return list(self._pool().map(lambda item: search(*item), shards, timeout=remaining_time()))
+        except FuturesTimeout as e:
+            raise DeadlineExceeded('shard search') from e
+    
+    @timed('vector_search')
+    def search(self, query_embedding: np.ndarray, k: int = 5, filters: Dict = None,
+               shards: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Search for similar documents
+        
+        Args:
+            query_embedding: Query embedding
+            k: Number of results to return
+            filters: Optional metadata filters, see matches_filters
+            shards: Shards to search (all by default), see route
+        
+        Returns:
+            List of dictionaries containing documents and metadata
+        """
+        def search_shard(name: str, shard: IndexShard) -> List[Dict]:
+            results = shard.search(query_embedding, k=k, filters=filters)
+            for result in results:
+                result['id'] = self._encode_id(name, result['id'])
+            return results
+        
+        # Each shard returns its results nearest first; merge the sorted runs
+        per_shard = self._fan_out(self._ordered(shards), search_shard)
+        return list(islice(heapq.merge(*per_shard, key=lambda result: result['distance']), k))
+    
+    @timed('vector_search_batch')
+    def search_batch(self, query_embeddings: np.ndarray, k: int = 5,
+                     filters: List[Optional[Dict]] = None,
+                     shards: Optional[List[str]] = None) -> List[List[Dict]]:
+        """
+        Search for several queries at once, one multi-query index call per shard segment
+        
+        Args:
+            query_embeddings: Query embeddings, one row per query
+            k: Number of results to return per query
+            filters: Optional metadata filters per query, see matches_filters
+            shards: Shards to search (all by default), see route
+        
+        Returns:
+            One result list per query, as returned by search
+        """
+        def search_shard(name: str, shard: IndexShard) -> List[List[Dict]]:
+            batch_results = shard.search_batch(query_embeddings, k=k, filters=filters)
+            for results in batch_results:
+                for result in results:
+                    result['id'] = self._encode_id(name, result['id'])
+            return batch_results
+        
+        per_shard = self._fan_out(self._ordered(shards), search_shard)
+        return [
+            list(islice(heapq.merge(*(runs[row] for runs in per_shard),
+                                    key=lambda result: result['distance']), k))
+            for row in range(len(query_embeddings))
+        ]
+    
+    matches_filters = staticmethod(IndexShard.matches_filters)
+    
+    def get_metadata(self, idx: int) -> Dict:
+        _, shard, local_idx = self._decode_id(idx)
+        segment, segment_idx = shard.snapshot().locate(local_idx)
+        return segment.metadata[segment_idx]
+    
+    def get_document(self, idx: int, query_embedding: np.ndarray = None) -> Dict:
+        """
+        Fetch a stored document by id
+        
+        Args:
+            idx: Document id
+            query_embedding: Optional query embedding to score the document against
+        
+        Returns:
+            Dictionary in the same shape as search results
+        """
+        _, shard, local_idx = self._decode_id(idx)
+        result = shard.get_document(local_idx, query_embedding)
+        result['id'] = int(idx)
+        return result
+    
+    def get_vectors(self, ids: List[int]) -> np.ndarray:
+        """
+        Stored vectors for document ids
+        
+        Args:
+            ids: Document ids from search or search_lexical
+        
+        Returns:
+            Array with one row per id, in the order given
+        """
+        vectors = np.zeros((len(ids), self.embedding_dim), dtype='float32')
+        by_shard = {}
+        for row, idx in enumerate(ids):
+            name, shard, local_idx = self._decode_id(idx)
+            by_shard.setdefault(name, (shard, [], []))
+            by_shard[name][1].append(row)
+            by_shard[name][2].append(local_idx)
+        for shard, rows, local_ids in by_shard.values():
+            vectors[rows] = shard.get_vectors(local_ids)
+        return vectors
+    
+    def search_lexical(self, query: str, k: int = 20,
+                       shards: Optional[List[str]] = None) -> List[Tuple[int, float]]:
+        """
+        Search the BM25 indexes
+        
+        Each shard scores with its own term statistics; scores are merged
+        as-is, which is close enough for rank fusion.
+        
+        Args:
+            query: Query text
+            k: Number of results to return
+            shards: Shards to search (all by default), see route
+        
+        Returns:
+            List of (document id, BM25 score)
+        """
+        def search_shard(name: str, shard: IndexShard) -> List[Tuple[int, float]]:
+            return [(self._encode_id(name, doc_id), -score)
+                    for doc_id, score in shard.search_lexical(query, k=k)]
+        
+        per_shard = self._fan_out(self._ordered(shards), search_shard)
+        merged = heapq.merge(*per_shard, key=lambda result: result[1])
+        return [(doc_id, -negative_score) for doc_id, negative_score in islice(merged, k)]
+    
+    # --- Persistence ---
+    
+    def _manifest_path(self) -> str:
+        return os.path.join(self.index_path, self.MANIFEST)
+    
+    def save(self, shards: Optional[List[str]] = None):
+        """
+        Save shards and the shard manifest to disk
+        
+        Args:
+            shards: Shards to write (all by default); others keep their saved files
+        """
+        os.makedirs(self.index_path, exist_ok=True)
+        ordered = self._ordered()
+        for name, shard in ordered:
+            if shards is None or name in shards:
+                shard.save()
+        
+        manifest = {
+            'embedding_dim': self.embedding_dim,
+            'shards': {
+                # Shards left unsaved report what their files hold, not rows appended since
+                name: {'number': self._numbers[name], 'documents': shard.saved_total,
+                       'metric': shard.metric, 'compression': shard.compression}
+                for name, shard in ordered
+            }
+        }
+        tmp_path = self._manifest_path() + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self._manifest_path())
+        
+        # Drop directories of shards that were replaced, e.g. after repartitioning
+        shards_root = os.path.join(self.index_path, "shards")
+        for name in os.listdir(shards_root) if os.path.isdir(shards_root) else []:
+            if name not in manifest['shards'] and not name.endswith(('.staging', '.previous')):
+                shutil.rmtree(os.path.join(shards_root, name), ignore_errors=True)
+        
+        print(f"Vector store saved to {self.index_path} ({len(ordered)} shards)")
+    
+    @classmethod
+    def exists(cls, index_path: str) -> bool:
+        """Whether a saved store (sharded or legacy) is present at index_path"""
+        return (os.path.exists(os.path.join(index_path, cls.MANIFEST))
+                or os.path.exists(os.path.join(index_path, "index.faiss")))
+    
+    def load(self):
+        """Load vector store from disk"""
+        if os.path.exists(self._manifest_path()):
+            with open(self._manifest_path()) as f:
+                manifest = json.load(f)
+            
+            shards, numbers = {}, {}
+            for name, entry in manifest['shards'].items():
+                shard = self.new_shard(name)
+                if not shard.load():
+                    continue
+                shards[name] = shard
+                numbers[name] = entry['number']
+            
+            with self._write_lock:
+                self._numbers = numbers
+                self._shards = shards
+            
+            # Shards saved with the old L2 metric get cosine scores from now on
+            migrated = [name for name, shard in shards.items() if shard.migrate_to_inner_product()]
+            if migrated:
+                print(f"Migrated shards to inner product: {', '.join(migrated)}")
+                self.save(shards=migrated)
+            print(f"Vector store loaded from {self.index_path}. "
+                  f"Shards: {len(shards)}, total documents: {self.get_stats()['total_documents']}")
+            return True
+        
+        if os.path.exists(os.path.join(self.index_path, "index.faiss")):
+            return self._load_unsharded()
+        
+        print(f"No saved index found at {self.index_path}")
+        return False
+    
+    def _load_unsharded(self):
+        """Split an index saved before sharding into per-dataset shards"""
+        legacy = IndexShard(self.embedding_dim, self.index_path, compression='none')
+        legacy.load()
+        snapshot = legacy.snapshot()
         
-        print(f"Vector store loaded from {self.index_path}. Total documents: {len(self.documents)}")
+        if snapshot.total:
+            print(f"Splitting unsharded index at {self.index_path} into per-dataset shards...")
+            vectors = np.concatenate([segment.index.reconstruct_n(0, segment.size)
+                                      for segment in snapshot.segments])
+            self.add_documents(vectors, snapshot.documents, snapshot.metadata)
+            if snapshot.lexical_index is not None:
+                self.build_lexical_index()
+            self.save()
+            for name in IndexShard.STORE_FILES:
+                path = os.path.join(self.index_path, name)
+                if os.path.exists(path):
+                    os.remove(path)
         return True
     
     def get_stats(self) -> Dict:
         """Get vector store statistics"""
+        shard_stats = {name: shard.get_stats() for name, shard in self._ordered()}
+        total = sum(s['total_documents'] for s in shard_stats.values())
+        index_bytes = sum(s['index_bytes'] for s in shard_stats.values())
         return {
-            'total_documents': len(self.documents),
+            'total_documents': total,
             'embedding_dimension': self.embedding_dim,
-            'index_size': self.index.ntotal
-        }
\ No newline at end of file
+            'index_size': sum(s['index_size'] for s in shard_stats.values()),
+            'segments': sum(s['segments'] for s in shard_stats.values()),
+            'version': sum(s['version'] for s in shard_stats.values()),
+            'memory_mapped': any(s['memory_mapped'] for s in shard_stats.values()),
+            'lexical_terms': sum(s['lexical_terms'] for s in shard_stats.values()),
+            'compression': self.compression,
+            'index_bytes': index_bytes,
+            'bytes_per_vector': index_bytes / total if total else 0.0,
+            'shards': shard_stats
+        }
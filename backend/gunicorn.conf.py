@@ -0,0 +1,41 @@
+# backend/gunicorn.conf.py
+import gc
+import os
+from config import Config
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+workers = int(os.getenv('WEB_CONCURRENCY', 1))
+# Threaded workers: queries beyond the admission limit are shed quickly and
+# the spare threads keep health checks answering while the LLM is slow
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS',
+                        Config.MAX_CONCURRENT_QUERIES + Config.QUERY_QUEUE_SIZE + 4))
+# Queries end at QUERY_DEADLINE_SECONDS; this only catches a wedged worker
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+
+# Load the model and index once in the master; workers share the pages
+preload_app = Config.PRELOAD_APP
+
+# Tokenizer thread pools created before fork can deadlock in the children
+os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
+
+
+def when_ready(server):
+    # Move everything allocated during preload out of the collector's reach so
+    # refcount/GC traffic in workers does not dirty the shared pages
+    if preload_app:
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    # Workers share VECTOR_STORE_PATH and the cache snapshot; startup indexing
+    # and snapshot writes take file locks so only one worker runs each at a time
+    if preload_app:
+        from app import start_background_tasks
+        start_background_tasks()
+
+
+def worker_exit(server, worker):
+    # atexit handlers do not run when gunicorn exits a worker; persist hot answers here
+    from app import cache_warmer
+    cache_warmer.stop()
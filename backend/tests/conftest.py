@@ -0,0 +1,77 @@
+# backend/tests/conftest.py
+"""
+Shared fixtures: a RAG pipeline over small hand-made datasets
+
+The pipeline uses the benchmark stand-ins for the embedding model, LLM and
+data.gov.in client, so tests run offline and deterministically.
+"""
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stubs import HashingEmbeddingGenerator, StaticDataClient, StubLLMHandler  # noqa: E402
+from config import Config  # noqa: E402
+
+YEARS = range(2000, 2010)
+
+
+def crop_record(state: str, district: str, crop: str, year: int, production: float) -> dict:
+    return {'state_name': state, 'district_name': district, 'crop_year': str(year),
+            'season': 'Kharif     ', 'crop': crop, 'area_': '1000.0', 'production_': str(production)}
+
+
+def rainfall_record(subdivision: str, year: int, annual: float) -> dict:
+    months = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+    record = {'SUBDIVISION': subdivision, 'YEAR': str(year), 'ANNUAL': f"{annual:.1f}"}
+    record.update({month: f"{annual / 12:.1f}" for month in months})
+    return record
+
+
+@pytest.fixture(scope='session')
+def crop_records():
+    records = []
+    for i, year in enumerate(YEARS):
+        # Punjab rice rises, Bihar rice falls, Kerala rice is reported in two years only
+        records.append(crop_record('Punjab', 'LUDHIANA', 'Rice', year, 1000 + 100 * i))
+        records.append(crop_record('Bihar', 'PATNA', 'Rice', year, 2000 - 100 * i))
+        records.append(crop_record('Punjab', 'LUDHIANA', 'Soyabean', year, 500 + 10 * i))
+    records.append(crop_record('Kerala', 'THRISSUR', 'Rice', 2000, 800))
+    records.append(crop_record('Kerala', 'THRISSUR', 'Rice', 2009, 900))
+    return records
+
+
+@pytest.fixture(scope='session')
+def rainfall_records():
+    return ([rainfall_record('KERALA', year, 3000 - 50 * i) for i, year in enumerate(YEARS)] +
+            [rainfall_record('PUNJAB', year, 600 + 20 * i) for i, year in enumerate(YEARS)])
+
+
+def make_pipeline(workdir, crop_records, rainfall_records):
+    """Unindexed pipeline over the given records, storing everything under workdir"""
+    from chatbot.rag_pipeline import RAGPipeline
+    from data_fetcher.data_lake import DataLake
+
+    with pytest.MonkeyPatch.context() as patch:
+        # Index from the records rather than any bundle on disk
+        patch.setattr(Config, 'INDEX_BUNDLE_PATH', '')
+        patch.setattr(Config, 'GAP_FETCH', False)
+        return RAGPipeline(embedding_generator=HashingEmbeddingGenerator(),
+                           llm_handler=StubLLMHandler(),
+                           data_client=StaticDataClient(crop_records, rainfall_records),
+                           index_path=str(workdir / 'vector_store'),
+                           data_lake=DataLake(str(workdir / 'data_lake')))
+
+
+@pytest.fixture
+def pipeline_factory(tmp_path, crop_records, rainfall_records):
+    """Builds unindexed pipelines sharing one test's directory, like forked workers"""
+    return lambda: make_pipeline(tmp_path, crop_records, rainfall_records)
+
+
+@pytest.fixture(scope='session')
+def pipeline(tmp_path_factory, crop_records, rainfall_records):
+    rag = make_pipeline(tmp_path_factory.mktemp('pipeline'), crop_records, rainfall_records)
+    rag.index_data()
+    return rag
@@ -0,0 +1,131 @@
+# backend/tests/test_admission.py
+"""Deadlines, concurrency limits and pacing for load shedding"""
+import threading
+import time
+import pytest
+from utils.admission import (ConcurrencyLimiter, DeadlineExceeded, Overloaded, RateLimiter,
+                             check_deadline, current_deadline, deadline, remaining_time)
+
+
+def test_deadline_is_scoped_to_the_block():
+    assert current_deadline() is None
+    assert remaining_time(7.0) == 7.0
+    check_deadline('anything')
+
+    with deadline(5.0) as active:
+        assert current_deadline() is active
+        assert 4.0 < remaining_time() <= 5.0
+    assert current_deadline() is None
+
+
+def test_nested_deadline_never_extends_the_outer_one():
+    with deadline(0.5) as outer:
+        with deadline(60.0) as inner:
+            assert inner is outer
+        with deadline(0.1) as tighter:
+            assert tighter is not outer
+            assert remaining_time() <= 0.1
+        assert current_deadline() is outer
+
+
+def test_expired_deadline_names_the_stage():
+    with deadline(0.0):
+        with pytest.raises(DeadlineExceeded) as error:
+            check_deadline('vector search')
+    assert error.value.stage == 'vector search'
+
+
+def test_deadlines_are_per_thread():
+    seen = []
+    with deadline(5.0):
+        worker = threading.Thread(target=lambda: seen.append(current_deadline()))
+        worker.start()
+        worker.join()
+    assert seen == [None]
+
+
+def test_expired_query_stops_before_the_next_stage(pipeline):
+    calls = pipeline.llm_handler.calls
+    with deadline(0.0):
+        with pytest.raises(DeadlineExceeded):
+            pipeline.answer_query('How has rainfall in Kerala changed compared to Punjab?', check_cache=False)
+    assert pipeline.llm_handler.calls == calls
+
+
+def hold_slots(limiter, count, release):
+    """Threads that each take a slot and keep it until release is set"""
+    holding = threading.Barrier(count + 1)
+
+    def hold():
+        with limiter.slot():
+            holding.wait()
+            release.wait()
+
+    threads = [threading.Thread(target=hold) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    holding.wait()
+    return threads
+
+
+def test_full_queue_is_rejected_at_once():
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=0, queue_timeout=5.0)
+    release = threading.Event()
+    threads = hold_slots(limiter, 1, release)
+
+    start = time.perf_counter()
+    with pytest.raises(Overloaded) as error:
+        limiter.acquire()
+    assert time.perf_counter() - start < 1.0
+    assert error.value.reason == 'queue_full'
+    assert error.value.retry_after >= 1
+
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert limiter.get_stats()['active'] == 0
+
+
+def test_queued_request_times_out():
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=1, queue_timeout=0.05)
+    release = threading.Event()
+    threads = hold_slots(limiter, 1, release)
+
+    with pytest.raises(Overloaded) as error:
+        limiter.acquire()
+    assert error.value.reason == 'queue_timeout'
+
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert limiter.get_stats() == {'active': 0, 'waiting': 0, 'max_concurrent': 1, 'max_queue': 1}
+
+
+def test_queued_request_gets_the_freed_slot():
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=1, queue_timeout=5.0)
+    release = threading.Event()
+    threads = hold_slots(limiter, 1, release)
+
+    threading.Timer(0.05, release.set).start()
+    with limiter.slot():
+        assert limiter.get_stats()['active'] == 1
+    for thread in threads:
+        thread.join()
+    assert limiter.get_stats()['active'] == 0
+
+
+def test_rate_limiter_paces_after_the_burst():
+    limiter = RateLimiter(rate=50.0, burst=2)
+    start = time.perf_counter()
+    for _ in range(4):
+        assert limiter.acquire()
+    # Two permits are immediate; the next two wait about 20 ms each
+    assert time.perf_counter() - start >= 0.035
+
+
+def test_rate_limiter_wait_is_abandoned_on_stop():
+    limiter = RateLimiter(rate=0.01, burst=1)
+    assert limiter.acquire()
+    stop = threading.Event()
+    stop.set()
+    assert limiter.acquire(stop) is False
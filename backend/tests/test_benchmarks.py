@@ -0,0 +1,92 @@
+# backend/tests/test_benchmarks.py
+"""Synthetic data, the benchmark suite at a tiny scale, and result comparison"""
+import argparse
+import json
+import sys
+import pytest
+
+from benchmarks import compare
+from benchmarks.run import ALL_CASES, SEARCH_KS, Suite
+from benchmarks.stubs import HashingEmbeddingGenerator
+from benchmarks.synthetic import (SCALES, generate_crop_records, generate_rainfall_records,
+                                  sample_queries)
+from data_fetcher.data_processor import DataProcessor
+
+
+def suite_args(**overrides) -> argparse.Namespace:
+    args = dict(embed_sample=50, queries=5, e2e_docs=100, llm_latency_ms=0.0, repeat=1, seed=0)
+    args.update(overrides)
+    return argparse.Namespace(**args)
+
+
+def test_synthetic_data_is_reproducible_by_seed():
+    assert generate_crop_records(50, seed=3) == generate_crop_records(50, seed=3)
+    assert generate_crop_records(50, seed=3) != generate_crop_records(50, seed=4)
+    assert generate_rainfall_records(50, seed=3) == generate_rainfall_records(50, seed=3)
+    assert sample_queries(10, seed=1) == sample_queries(10, seed=1)
+
+
+def test_synthetic_records_survive_cleaning():
+    processor = DataProcessor()
+    crop_df = processor.clean_crop_data(generate_crop_records(500, seed=0))
+    rainfall_df = processor.clean_rainfall_data(generate_rainfall_records(200, seed=0))
+
+    assert len(crop_df) == 500
+    assert crop_df['year'].between(1997, 2015).all()
+    # 'NA' production values become missing rather than dropping the row
+    assert 0 < crop_df['production_tonnes'].isna().sum() < 50
+    assert not crop_df['season'].astype(str).str.endswith(' ').any()
+    assert len(rainfall_df) == 200
+    assert rainfall_df['annual'].notna().all()
+
+
+def test_suite_records_every_case(monkeypatch):
+    monkeypatch.setitem(SCALES, 'tiny', 300)
+    suite = Suite('tiny', suite_args(), HashingEmbeddingGenerator())
+    results = suite.run(ALL_CASES)
+
+    cases = {r['case'] for r in results}
+    assert {'clean_crop', 'clean_rainfall', 'format_crop', 'embed', 'index_build',
+            'lexical_search_k20', 'answer_query'} <= cases
+    assert {f'search_k{k}' for k in SEARCH_KS} <= cases
+    assert all(r['scale'] == 'tiny' and r['rows'] == 300 for r in results)
+
+    by_case = {r['case']: r for r in results}
+    assert by_case['search_k5']['samples'] == 5
+    assert by_case['search_k5']['p50_ms'] <= by_case['search_k5']['p99_ms']
+    assert by_case['answer_query']['indexed_docs'] > 0
+
+
+def write_report(path, results):
+    path.write_text(json.dumps({'meta': {}, 'results': results}))
+    return str(path)
+
+
+def run_compare(monkeypatch, baseline, candidate, *extra):
+    monkeypatch.setattr(sys, 'argv', ['compare', baseline, candidate, *extra])
+    with pytest.raises(SystemExit) as exit_info:
+        compare.main()
+    return exit_info.value.code
+
+
+def test_compare_fails_only_on_regressions(tmp_path, monkeypatch, capsys):
+    base = write_report(tmp_path / 'base.json', [
+        {'case': 'search_k5', 'scale': '10k', 'p95_ms': 10.0},
+        {'case': 'embed', 'scale': '10k', 'docs_per_second': 1000.0},
+    ])
+    faster = write_report(tmp_path / 'faster.json', [
+        {'case': 'search_k5', 'scale': '10k', 'p95_ms': 8.0},
+        {'case': 'embed', 'scale': '10k', 'docs_per_second': 1200.0},
+    ])
+    slower = write_report(tmp_path / 'slower.json', [
+        {'case': 'search_k5', 'scale': '10k', 'p95_ms': 10.5},
+        {'case': 'embed', 'scale': '10k', 'docs_per_second': 800.0},
+    ])
+
+    assert run_compare(monkeypatch, base, faster) == 0
+    assert run_compare(monkeypatch, base, slower) == 1
+    output = capsys.readouterr().out
+    # 5% slower search is within the threshold, 20% lower throughput is not
+    assert 'search_k5' in output
+    assert output.count('REGRESSION') == 1
+    assert run_compare(monkeypatch, base, slower, '--threshold', '0.25') == 0
@@ -0,0 +1,87 @@
+# backend/tests/test_cache_manager.py
+"""Snapshots and restores of CacheManager entries"""
+import threading
+import time
+from data_fetcher.cache_manager import CacheManager
+
+
+def entry(key, value, written_at, hits=1):
+    return {'key': key, 'value': value, 'hits': hits, 'written_at': written_at}
+
+
+def key_for(name):
+    return CacheManager._generate_key('query', q=name)
+
+
+def test_hot_entries_are_most_hit_first():
+    cache = CacheManager(ttl=60)
+    for name in ['a', 'b', 'c']:
+        cache.set('query', name.upper(), q=name)
+    for _ in range(3):
+        cache.get('query', q='b')
+    cache.get('query', q='c')
+
+    entries = cache.hot_entries(limit=2)
+    assert [e['value'] for e in entries] == ['B', 'C']
+    assert entries[0]['hits'] == 3
+
+
+def test_restore_skips_entries_older_than_ttl():
+    cache = CacheManager(ttl=60)
+    now = time.time()
+    restored = cache.restore([entry(key_for('old'), 'old', now - 61), entry(key_for('new'), 'new', now - 1)])
+    assert restored == 1
+    assert cache.get('query', q='old') is None
+    assert cache.get('query', q='new') == 'new'
+
+
+def test_restored_entry_expires_at_original_deadline(monkeypatch):
+    cache = CacheManager(ttl=60)
+    now = time.time()
+    cache.restore([entry(key_for('a'), 'A', now - 50)])
+    assert cache.contains('query', q='a')
+
+    # Ten seconds later the entry is 60 s old, though the cache's own TTL has barely started
+    monkeypatch.setattr(time, 'time', lambda: now + 10)
+    assert not cache.contains('query', q='a')
+    assert cache.get('query', q='a') is None
+    assert cache.hot_entries(limit=10) == []
+
+
+def test_set_after_restore_gets_full_ttl(monkeypatch):
+    cache = CacheManager(ttl=60)
+    now = time.time()
+    cache.restore([entry(key_for('a'), 'A', now - 50)])
+    cache.set('query', 'A2', q='a')
+
+    monkeypatch.setattr(time, 'time', lambda: now + 10)
+    assert cache.get('query', q='a') == 'A2'
+
+
+def test_hot_entries_while_writing():
+    cache = CacheManager(maxsize=100, ttl=60)
+    done = threading.Event()
+    errors = []
+
+    def writer():
+        i = 0
+        while not done.is_set():
+            cache.set('query', i, q=str(i))
+            cache.get('query', q=str(i // 2))
+            i += 1
+
+    def snapshotter():
+        try:
+            for _ in range(200):
+                cache.hot_entries(limit=20)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    snapshotter()
+    done.set()
+    for thread in threads:
+        thread.join()
+    assert not errors
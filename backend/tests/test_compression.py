@@ -0,0 +1,68 @@
+# backend/tests/test_compression.py
+"""Compressed shards: save/load round trips and exact re-ranking"""
+import numpy as np
+import pytest
+from config import Config
+from embeddings.vector_store import IndexShard, VectorStore
+
+DIM = 16
+COUNT = 1000
+
+
+@pytest.fixture
+def vectors():
+    vectors = np.random.default_rng(0).standard_normal((COUNT, DIM)).astype('float32')
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture(autouse=True)
+def small_pq(monkeypatch):
+    # Let PQ train on a test-sized shard with subquantizers that divide DIM
+    monkeypatch.setattr(IndexShard, 'PQ_MIN_TRAIN', 256)
+    monkeypatch.setattr(Config, 'PQ_SUBQUANTIZERS', 4)
+
+
+def build(path, compression, vectors):
+    store = VectorStore(DIM, index_path=str(path), compression=compression)
+    metadata = [{'type': 'crop_production', 'year': 2000 + i % 10} for i in range(COUNT)]
+    store.add_documents(vectors, [f"doc {i}" for i in range(COUNT)], metadata)
+    return store
+
+
+@pytest.mark.parametrize('compression', ['fp16', 'sq8', 'pq'])
+def test_round_trip_keeps_top_k(tmp_path, vectors, compression):
+    store = build(tmp_path / compression, compression, vectors)
+    queries = np.random.default_rng(1).standard_normal((5, DIM)).astype('float32')
+    exact = [[result['id'] for result in results] for results in store.search_batch(queries, k=10)]
+    store.save()
+
+    loaded = VectorStore(DIM, index_path=str(tmp_path / compression), compression=compression)
+    loaded.load()
+    shard = loaded.shards['crop_production']
+    segment = shard.snapshot().segments[0]
+    assert IndexShard._compression_of(segment.index) == compression
+    assert segment.full_vectors is not None
+
+    # Candidates from the compressed codes are re-ranked with vectors.npy
+    reloaded = [[result['id'] for result in results] for results in loaded.search_batch(queries, k=10)]
+    assert reloaded == exact
+    filtered = loaded.search(queries[0], k=10, filters={'year': [2003]})
+    assert [result['id'] for result in filtered] == \
+        [result['id'] for result in store.search(queries[0], k=10, filters={'year': [2003]})]
+
+
+def test_compressed_index_is_smaller(tmp_path, vectors):
+    sizes = {}
+    for compression in ('none', 'fp16', 'sq8', 'pq'):
+        store = build(tmp_path / compression, compression, vectors)
+        store.save()
+        store.load()
+        sizes[compression] = store.shards['crop_production'].get_stats()['index_bytes']
+    assert sizes['none'] > sizes['fp16'] > sizes['sq8'] > sizes['pq']
+
+
+def test_pq_rejects_subquantizers_not_dividing_dim(tmp_path, vectors, monkeypatch):
+    monkeypatch.setattr(Config, 'PQ_SUBQUANTIZERS', 5)
+    store = build(tmp_path / 'pq', 'pq', vectors)
+    with pytest.raises(ValueError, match='must divide'):
+        store.save()
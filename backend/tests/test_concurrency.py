@@ -0,0 +1,10 @@
+# backend/tests/test_concurrency.py
+"""Searches racing appends on one shard never see torn state"""
+from benchmarks.vector_store_concurrency import run
+
+
+def test_readers_never_see_torn_results():
+    result = run(readers=4, writers=2, batches=150, batch_size=20, dim=32, k=10)
+    assert result['first_errors'] == []
+    assert result['documents'] == 2 * 150 * 20
+    assert result['searches'] > 0
@@ -0,0 +1,81 @@
+# backend/tests/test_data_lake.py
+"""Parquet snapshots of cleaned datasets, partitioned by year"""
+import os
+import pandas as pd
+import pytest
+
+from data_fetcher.data_lake import DataLake
+from data_fetcher.data_processor import DataProcessor
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def lake(tmp_path):
+    return DataLake(str(tmp_path / 'lake'))
+
+
+@pytest.fixture
+def crop_df(crop_records):
+    return DataProcessor.clean_crop_data(crop_records)
+
+
+def test_round_trip_keeps_rows_and_dtypes(lake, crop_df):
+    entry = lake.write('crop_production', crop_df, fetched_at='2024-01-01 00:00:00')
+    loaded = lake.load('crop_production')
+
+    assert entry['rows'] == len(crop_df)
+    assert entry['partitions'] == list(range(2000, 2010))
+    assert entry['fetched_at'] == '2024-01-01 00:00:00'
+    assert list(loaded.columns) == list(crop_df.columns)
+    assert dict(loaded.dtypes.astype(str)) == dict(crop_df.dtypes.astype(str))
+
+    key = ['state', 'crop', 'year']
+    expected = crop_df.astype({'state': str, 'crop': str}).sort_values(key).reset_index(drop=True)
+    actual = loaded.astype({'state': str, 'crop': str}).sort_values(key).reset_index(drop=True)
+    pd.testing.assert_frame_equal(actual[expected.columns], expected, check_categorical=False,
+                                  check_dtype=False)
+
+
+def test_load_reads_only_requested_columns_and_years(lake, crop_df):
+    lake.write('crop_production', crop_df)
+    df = lake.load('crop_production', columns=['state', 'production_tonnes', 'year'], years=[2008, 2009])
+
+    assert set(df.columns) == {'state', 'production_tonnes', 'year'}
+    assert sorted(df['year'].unique()) == [2008, 2009]
+    assert len(df) == len(crop_df[crop_df['year'] >= 2008])
+
+
+def test_load_recent_picks_the_latest_partitions(lake, crop_df):
+    lake.write('crop_production', crop_df)
+    df = DataProcessor.load_recent(lake, 'crop_production', years=3, columns=['production_tonnes'])
+
+    assert sorted(df['year'].unique()) == [2007, 2008, 2009]
+    assert 'year' in df.columns
+
+
+def test_rewrite_replaces_the_previous_snapshot(lake, crop_df):
+    lake.write('crop_production', crop_df)
+    lake.write('crop_production', crop_df[crop_df['year'] == 2005])
+
+    assert lake.get_stats() == {'crop_production': len(crop_df[crop_df['year'] == 2005])}
+    assert lake.load('crop_production')['year'].unique().tolist() == [2005]
+    assert sorted(os.listdir(lake.root)) == ['crop_production', DataLake.MANIFEST]
+
+
+def test_unknown_dataset_raises(lake):
+    assert not lake.has('crop_production')
+    with pytest.raises(KeyError):
+        lake.load('crop_production')
+
+
+def test_lake_reindex_skips_the_api(pipeline_factory):
+    rag = pipeline_factory()
+    rag.index_data()
+    assert rag.data_lake.has('crop_production') and rag.data_lake.has('rainfall')
+    documents = rag.vector_store.get_stats()['total_documents']
+
+    # Re-embedding from the lake must not touch the data.gov.in client
+    rag.data_client.fetch_dataset = None
+    rag.index_data(source='lake')
+    assert rag.vector_store.get_stats()['total_documents'] == documents
@@ -0,0 +1,113 @@
+# backend/tests/test_gap_filler.py
+"""Query-time fetches of entities missing from the index"""
+import json
+import threading
+import time
+import pytest
+from benchmarks.stubs import StaticDataClient
+from chatbot.gap_filler import GapFiller
+from config import Config
+from data_fetcher.registry import DATASETS
+
+GAP = {'district': ['Amritsar'], 'crop': ['Rice'], 'year': [2005]}
+
+
+class GatedDataClient(StaticDataClient):
+    """Serves its records once the gate is opened"""
+
+    def __init__(self, crop_records, rainfall_records):
+        super().__init__(crop_records, rainfall_records)
+        self.gate = threading.Event()
+
+    def fetch_dataset(self, name, **filters):
+        self.gate.wait(10)
+        return super().fetch_dataset(name, **filters)
+
+
+class ExactFilterClient(StaticDataClient):
+    """Matches filters against raw field values exactly, as data.gov.in does"""
+
+    def __init__(self, crop_records, rainfall_records):
+        super().__init__(crop_records, rainfall_records)
+        self.calls = []
+
+    def fetch_dataset(self, name, limit=1000, **filters):
+        self.calls.append((name, filters))
+        schema = DATASETS.get(name).schema
+        return [record for record in super().fetch_dataset(name)
+                if all(str(record.get(schema.column(field).source)) == str(value)
+                       for field, value in filters.items())]
+
+
+@pytest.fixture
+def rag(pipeline_factory, crop_records):
+    rag = pipeline_factory()
+    rag.index_data()
+    # Punjab rice in a district the index has never seen
+    amritsar = dict(crop_records[0], district_name='AMRITSAR', crop_year='2005')
+    rag.data_client = GatedDataClient(crop_records + [amritsar], [])
+    rag.gap_filler = GapFiller(rag)
+    rag.entity_coverage = rag._build_coverage(rag.vector_store)
+    return rag
+
+
+def test_default_budget_does_not_wait(rag, monkeypatch):
+    monkeypatch.setattr(Config, 'GAP_FETCH_BUDGET_MS', 0)
+    futures = rag.gap_filler.submit(GAP, ['crop_production'])
+    assert futures
+
+    start = time.perf_counter()
+    inserted, pending = rag.gap_filler.wait(futures)
+    assert time.perf_counter() - start < 0.1
+    assert (inserted, pending) == (0, True)
+
+    # The fetch finishes in the background and serves later queries
+    rag.data_client.gate.set()
+    assert sum(future.result(10) for future in futures) == 1
+    assert rag.entity_coverage.missing('crop_production', GAP) == []
+    assert rag.record_lookup.find(GAP, ['crop_production'])
+
+
+def test_budget_waits_for_fetch(rag, monkeypatch):
+    monkeypatch.setattr(Config, 'GAP_FETCH_BUDGET_MS', 5000)
+    futures = rag.gap_filler.submit(GAP, ['crop_production'])
+    threading.Timer(0.05, rag.data_client.gate.set).start()
+    assert rag.gap_filler.wait(futures) == (1, False)
+
+
+def test_answer_query_fetches_unindexed_district(rag, crop_records, monkeypatch):
+    monkeypatch.setattr(Config, 'GAP_FETCH_BUDGET_MS', 5000)
+    amritsar = dict(crop_records[0], district_name='AMRITSAR', crop_year='2005')
+    rag.data_client = ExactFilterClient(crop_records + [amritsar], [])
+
+    result = rag.answer_query("What was rice production in Amritsar in 2005?")
+
+    # The district is recognised from the shipped names and fetched in its raw spelling
+    assert ('crop_production', {'district': 'AMRITSAR', 'crop': 'Rice', 'year': '2005'}) in rag.data_client.calls
+    assert 'Amritsar' in result['answer']
+    assert rag.gap_filler.rows_inserted == 1
+
+
+def test_fetch_falls_back_to_other_spellings(rag, crop_records):
+    # A district missing from the shipped names, stored upper-case by the source
+    extra = dict(crop_records[0], district_name='NEW TOWN', crop_year='2005')
+    rag.data_client = ExactFilterClient(crop_records + [extra], [])
+    gap = {'district': ['New Town'], 'crop': ['Rice'], 'year': [2005]}
+
+    futures = rag.gap_filler.submit(gap, ['crop_production'])
+    assert sum(future.result(10) for future in futures) == 1
+    assert rag.data_client.calls[0][1]['district'] == 'New Town'
+    assert rag.data_client.calls[-1][1] == {'district': 'NEW TOWN', 'crop': 'Rice', 'year': '2005'}
+
+
+def test_saving_other_shards_keeps_saved_counts(rag):
+    rag.data_client.gate.set()
+    saved = rag.vector_store.shards['crop_production'].saved_total
+    futures = rag.gap_filler.submit(GAP, ['crop_production'])
+    assert sum(future.result(10) for future in futures) == 1
+
+    # Re-indexing one dataset rewrites the manifest; the hot insert is not on disk
+    rag.vector_store.save(shards=['rainfall'])
+    with open(rag.vector_store._manifest_path()) as f:
+        manifest = json.load(f)
+    assert manifest['shards']['crop_production']['documents'] == saved
@@ -0,0 +1,52 @@
+# backend/tests/test_gazetteer.py
+"""Entity extraction with the gazetteer built from indexed values"""
+from chatbot.gazetteer import Gazetteer
+from chatbot.query_processor import QueryProcessor
+
+SEEDS = QueryProcessor().seed_entities()
+
+
+def crops(gazetteer, query):
+    return gazetteer.extract(query)['crop']
+
+
+def test_alias_and_seed_follow_indexed_spelling():
+    gazetteer = Gazetteer.build([{'crop': 'Soyabean'}, {'crop': 'Rice'}], seeds=SEEDS)
+    assert crops(gazetteer, "soyabean production") == ['Soyabean']
+    assert crops(gazetteer, "soybean production") == ['Soyabean']
+    assert crops(gazetteer, "paddy yield") == ['Rice']
+
+
+def test_alias_keeps_its_canonical_name_when_nothing_is_indexed():
+    gazetteer = Gazetteer.build([], seeds=SEEDS)
+    assert crops(gazetteer, "soyabean production") == ['Soybean']
+    assert gazetteer.extract("rainfall in orissa")['state'] == ['Odisha']
+
+
+def test_old_state_name_in_data_wins():
+    gazetteer = Gazetteer.build([{'state': 'Orissa'}], seeds=SEEDS)
+    assert gazetteer.extract("rice in odisha")['state'] == ['Orissa']
+    assert gazetteer.extract("rice in orissa")['state'] == ['Orissa']
+
+
+def test_gazetteer_is_per_processor():
+    indexed = QueryProcessor(Gazetteer.build([{'crop': 'Soyabean'}], seeds=SEEDS))
+    default = QueryProcessor()
+    assert indexed.parse_query("soybean in Punjab")['crops'] == ['Soyabean']
+    assert default.parse_query("soybean in Punjab")['crops'] == ['Soybean']
+
+    default.set_gazetteer(Gazetteer.build([{'crop': 'Rice'}], seeds=SEEDS))
+    assert indexed.parse_query("soybean in Punjab")['crops'] == ['Soyabean']
+
+
+def test_pipeline_matches_indexed_crop_spelling(pipeline):
+    query_info = pipeline.query_processor.parse_query("soybean production in Punjab")
+    assert query_info['crops'] == ['Soyabean']
+    assert pipeline.query_processor.build_filters(query_info)['crop'] == ['Soyabean']
+
+
+def test_source_names_are_matched_only_as_spelled():
+    gazetteer = Gazetteer.build([], seeds=SEEDS, exact_seeds=QueryProcessor.source_entities())
+    assert gazetteer.extract("rice in Amritsar")['district'] == ['Amritsar']
+    assert gazetteer.extract("rainfall in Vidarbha")['subdivision'] == ['VIDARBHA']
+    assert gazetteer.extract("sugar prices")['district'] == []
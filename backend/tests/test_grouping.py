@@ -0,0 +1,81 @@
+# backend/tests/test_grouping.py
+"""Consolidating cleaned rows into one document per group"""
+import pytest
+from config import Config
+from data_fetcher.data_processor import DataProcessor
+from data_fetcher.registry import CROP_BY_DISTRICT_YEAR, DATASETS, RAINFALL_BY_DECADE
+from embeddings.vector_store import VectorStore
+from conftest import crop_record, rainfall_record
+
+
+@pytest.fixture
+def seasonal_crop_df():
+    records = [
+        crop_record('Punjab', 'LUDHIANA', 'Rice', 2001, 100),
+        dict(crop_record('Punjab', 'LUDHIANA', 'Rice', 2001, 300), season='Rabi       '),
+        crop_record('Punjab', 'LUDHIANA', 'Rice', 2002, 50),
+        crop_record('Bihar', 'PATNA', 'Rice', 2001, 70),
+    ]
+    return DataProcessor.clean_crop_data(records)
+
+
+def test_seasons_are_summed_per_district_crop_and_year(seasonal_crop_df):
+    out = DataProcessor.consolidate(seasonal_crop_df, CROP_BY_DISTRICT_YEAR)
+    groups = {(row.state, row.year): row for row in out.itertuples()}
+
+    assert len(out) == 3
+    ludhiana = groups[('Punjab', 2001)]
+    assert ludhiana.production_tonnes == 400
+    assert ludhiana.area_hectares == 2000
+    assert ludhiana.yield_tonnes_per_hectare == pytest.approx(0.2)
+    assert ludhiana.row_count == 2
+    assert ludhiana.season == ['Kharif', 'Rabi']
+    assert ludhiana.details == ('Kharif 100.00 tonnes from 1000.00 hectares; '
+                                'Rabi 300.00 tonnes from 1000.00 hectares')
+    # source_rows point back at the cleaned rows the group came from
+    assert sorted(ludhiana.source_rows) == [0, 1]
+    assert groups[('Bihar', 2001)].source_rows == [3]
+
+
+def test_rainfall_is_grouped_by_decade():
+    records = [rainfall_record('KERALA', year, 2000 + 10 * (year - 1995)) for year in range(1995, 2012)]
+    out = DataProcessor.consolidate(DataProcessor.clean_rainfall_data(records), RAINFALL_BY_DECADE)
+
+    assert out['decade'].tolist() == [1990, 2000, 2010]
+    assert out['row_count'].tolist() == [5, 10, 2]
+    nineties = out.iloc[0]
+    assert (nineties['first_year'], nineties['last_year']) == (1995, 1999)
+    assert nineties['annual'] == pytest.approx(2020.0)
+    assert (nineties['annual_min'], nineties['annual_max']) == (2000.0, 2040.0)
+    assert nineties['year'] == [1995, 1996, 1997, 1998, 1999]
+
+
+def test_grouped_documents_record_the_policy(seasonal_crop_df, monkeypatch):
+    monkeypatch.setattr(Config, 'DOCUMENT_GROUPING', 'crop_production:district_crop_year')
+    docs = DataProcessor.format_for_embedding(seasonal_crop_df, 'crop')
+
+    assert len(docs) == 3
+    meta = docs[0]['metadata']
+    assert meta['grouping'] == 'district_crop_year'
+    assert meta['row_count'] == 2 and meta['season'] == ['Kharif', 'Rabi']
+    assert 'across 2 season records' in docs[0]['text']
+
+
+def test_grouping_can_be_switched_off(seasonal_crop_df, monkeypatch):
+    monkeypatch.setattr(Config, 'DOCUMENT_GROUPING', 'crop_production:none')
+    docs = DataProcessor.format_for_embedding(seasonal_crop_df, 'crop')
+    assert len(docs) == 4
+    assert 'grouping' not in docs[0]['metadata']
+
+
+def test_unknown_policy_is_rejected(monkeypatch):
+    monkeypatch.setattr(Config, 'DOCUMENT_GROUPING', 'rainfall:by_month')
+    with pytest.raises(ValueError):
+        DATASETS.get('rainfall').grouping()
+
+
+def test_list_metadata_matches_any_allowed_value():
+    meta = {'season': ['Kharif', 'Rabi'], 'year': 2001}
+    assert VectorStore.matches_filters(meta, {'season': ['Rabi']})
+    assert VectorStore.matches_filters(meta, {'season': ['Summer', 'Kharif'], 'year': [2001]})
+    assert not VectorStore.matches_filters(meta, {'season': ['Summer']})
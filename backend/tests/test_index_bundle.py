@@ -0,0 +1,69 @@
+# backend/tests/test_index_bundle.py
+"""Verification, selection and building of prebuilt index bundles"""
+import os
+import pytest
+import chatbot.rag_pipeline
+from benchmarks.stubs import HashingEmbeddingGenerator, StaticDataClient, StubLLMHandler
+from config import Config
+from embeddings.index_bundle import BundleError, IndexBundle, build
+
+MODEL = HashingEmbeddingGenerator().model_name
+
+
+@pytest.fixture
+def bundle(tmp_path, pipeline):
+    return IndexBundle.create(str(tmp_path / 'bundles'), pipeline.vector_store.index_path, MODEL, 384,
+                              lake_path=pipeline.data_lake.root, version='v1')
+
+
+def largest_file(bundle):
+    files = bundle.manifest()['files']
+    return os.path.join(bundle.path, max(files, key=lambda name: files[name]['bytes']))
+
+
+def test_fresh_bundle_verifies(bundle):
+    bundle.verify(MODEL, 384)
+    assert bundle.manifest()['datasets']['rainfall']['documents'] > 0
+
+
+def test_wrong_model_or_dimension_is_rejected(bundle):
+    with pytest.raises(BundleError):
+        bundle.verify('another-model', 384)
+    with pytest.raises(BundleError):
+        bundle.verify(MODEL, 768)
+
+
+def test_same_size_corruption_needs_checksums(bundle):
+    path = largest_file(bundle)
+    with open(path, 'r+b') as f:
+        first = f.read(1)
+        f.seek(0)
+        f.write(bytes([first[0] ^ 0xFF]))
+
+    bundle.verify(MODEL, 384, checksums=False)
+    with pytest.raises(BundleError, match='checksum'):
+        bundle.verify(MODEL, 384, checksums=True)
+
+
+def test_select_skips_truncated_bundle(tmp_path, pipeline, bundle):
+    root = str(tmp_path / 'bundles')
+    newer = IndexBundle.create(root, pipeline.vector_store.index_path, MODEL, 384, version='v2')
+    with open(largest_file(newer), 'r+b') as f:
+        f.truncate(1)
+
+    assert IndexBundle.select(root, MODEL, 384, checksums=False).version == 'v1'
+
+
+def test_build_contains_only_what_it_fetched(tmp_path, monkeypatch, bundle, crop_records):
+    # The served bundle has rainfall; this build's rainfall fetch comes back empty
+    monkeypatch.setattr(Config, 'INDEX_BUNDLE_PATH', os.path.dirname(bundle.path))
+    monkeypatch.setattr(Config, 'GAP_FETCH', False)
+    monkeypatch.setattr(chatbot.rag_pipeline, 'EmbeddingGenerator', HashingEmbeddingGenerator)
+    monkeypatch.setattr(chatbot.rag_pipeline, 'LLMHandler', StubLLMHandler)
+    monkeypatch.setattr(chatbot.rag_pipeline, 'DataGovClient', lambda: StaticDataClient(crop_records, []))
+
+    built = build(os.path.dirname(bundle.path), source='api', keep=3)
+    datasets = built.manifest()['datasets']
+    assert datasets['crop_production']['documents'] > 0
+    assert 'rainfall' not in datasets
+    built.verify(MODEL, 384)
@@ -0,0 +1,58 @@
+# backend/tests/test_indexing_jobs.py
+"""Startup indexing shared by workers serving one index directory"""
+import time
+import pytest
+from chatbot.indexing_jobs import IndexingJobManager
+
+
+def wait_for(job, timeout=30):
+    deadline = time.time() + timeout
+    while job.is_active and time.time() < deadline:
+        time.sleep(0.01)
+    return job.status
+
+
+def count_index_runs(rag, runs):
+    index_data = rag.index_data
+
+    def counted(*args, **kwargs):
+        runs.append(rag)
+        return index_data(*args, **kwargs)
+    rag.index_data = counted
+
+
+def test_second_worker_loads_the_index_instead_of_rebuilding(pipeline_factory):
+    workers = [pipeline_factory(), pipeline_factory()]
+    runs = []
+    for rag in workers:
+        count_index_runs(rag, runs)
+
+    jobs = [IndexingJobManager(rag).start()[0] for rag in workers]
+    assert [wait_for(job) for job in jobs] == ['completed', 'completed']
+    assert len(runs) == 1
+    assert all(rag.is_indexed and rag.trend_engine.has('production') for rag in workers)
+    assert (workers[0].vector_store.get_stats()['total_documents'] ==
+            workers[1].vector_store.get_stats()['total_documents'])
+
+
+def test_forced_job_rebuilds(pipeline_factory):
+    rag = pipeline_factory()
+    runs = []
+    count_index_runs(rag, runs)
+    manager = IndexingJobManager(rag)
+    assert wait_for(manager.start()[0]) == 'completed'
+    assert wait_for(manager.start(force=True)[0]) == 'completed'
+    assert len(runs) == 2
+
+
+@pytest.mark.parametrize('options', [{'datasets': ['rainfall']}, {'source': 'lake'}])
+def test_job_naming_source_or_datasets_is_not_replaced_by_reload(pipeline_factory, options):
+    first, second = pipeline_factory(), pipeline_factory()
+    assert wait_for(IndexingJobManager(first).start()[0]) == 'completed'
+
+    runs = []
+    count_index_runs(second, runs)
+    reloads = []
+    second.reload_index = lambda: reloads.append(True) or True
+    assert wait_for(IndexingJobManager(second).start(**options)[0]) == 'completed'
+    assert (len(runs), reloads) == (1, [])
@@ -0,0 +1,79 @@
+# backend/tests/test_intent_classifier.py
+"""Query type classification and how far it may override the keyword rules"""
+import numpy as np
+import pytest
+from benchmarks.stubs import HashingEmbeddingGenerator
+from chatbot.intent_classifier import IntentClassifier
+
+TYPES = ['agriculture_query', 'ranking', 'trend_analysis']
+
+
+def classifier(keyword_prior=1.0):
+    """Three orthogonal type centroids; intents mirror the types"""
+    centroids = np.eye(3, 4, dtype=np.float32)
+    return IntentClassifier({'type': centroids, 'intent': centroids},
+                            {'type': TYPES, 'intent': ['find', 'rank', 'analyze']},
+                            temperature=0.05, keyword_prior=keyword_prior)
+
+
+def unit(*values):
+    vector = np.array(values + (0.0,) * (4 - len(values)), dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_nearest_centroid_wins():
+    prediction = classifier().classify(unit(0.1, 1.0, 0.2))
+    assert prediction['type'] == 'ranking'
+    assert prediction['intent'] == 'rank'
+    assert prediction['confidence'] > 0.9
+
+
+def test_keyword_prior_breaks_near_ties():
+    ranking_leaning = unit(1.0, 1.02)
+    assert classifier().classify(ranking_leaning)['type'] == 'ranking'
+    assert classifier().classify(ranking_leaning, keyword_type='agriculture_query')['type'] == 'agriculture_query'
+    # but does not outvote a clear margin
+    assert classifier().classify(unit(0.2, 1.0), keyword_type='agriculture_query')['type'] == 'ranking'
+
+
+def test_trained_on_shipped_examples():
+    examples = IntentClassifier.load_examples()
+    trained = IntentClassifier.train(HashingEmbeddingGenerator(), examples)
+    assert set(trained.labels['type']) == {example['type'] for example in examples}
+    embedding = HashingEmbeddingGenerator().generate_embedding(examples[0]['query'])
+    assert trained.classify(embedding)['type'] == examples[0]['type']
+
+
+class ConfidentClassifier:
+    """Always predicts one type with full confidence"""
+
+    def __init__(self, query_type):
+        self.query_type = query_type
+
+    def classify(self, query_embedding, keyword_type=None):
+        return {'type': self.query_type, 'intent': 'rank', 'confidence': 1.0}
+
+
+@pytest.mark.parametrize('query, expected', [
+    ("What is the trend of rice production in Punjab?", 'trend_analysis'),
+    ("Compare rice production in Punjab and Bihar", 'comparison'),
+    ("Tell me about rice in Punjab", 'ranking'),
+])
+def test_classifier_overrides_only_non_structural_types(pipeline, monkeypatch, query, expected):
+    monkeypatch.setattr(pipeline, 'intent_classifier', ConfidentClassifier('ranking'))
+    query_info = pipeline.query_processor.parse_query(query)
+    pipeline.classify_query(query, query_info, llm_fallback=False)
+    assert query_info['query_type'] == expected
+    assert query_info['intent'] == 'rank'
+
+
+def test_trend_query_reaches_trend_engine_despite_classifier(pipeline, monkeypatch):
+    monkeypatch.setattr(pipeline, 'intent_classifier', ConfidentClassifier('agriculture_query'))
+    answers = []
+    trend_answer = pipeline.trend_answer
+    monkeypatch.setattr(pipeline, 'trend_answer',
+                        lambda query, query_info: answers.append(trend_answer(query, query_info)) or answers[-1])
+
+    result = pipeline.answer_query("How has rice production in Punjab changed over time?", check_cache=False)
+    assert answers and answers[0] is not None
+    assert result['answer'] == answers[0]['answer']
@@ -0,0 +1,117 @@
+# backend/tests/test_llm_routing.py
+"""Routing LLM calls between the fast and large models"""
+import sys
+import types
+import pytest
+
+from chatbot.llm_handler import LLMHandler
+from config import Config
+from utils.admission import DeadlineExceeded, deadline
+from utils.metrics import metrics, trace
+
+
+class FakeCompletions:
+    """Records chat completion calls; models in failing raise instead of answering"""
+
+    def __init__(self):
+        self.calls = []
+        self.failing = set()
+
+    def create(self, model, messages, temperature, max_tokens, timeout):
+        self.calls.append({'model': model, 'max_tokens': max_tokens, 'prompt': messages[-1]['content']})
+        if model in self.failing:
+            raise RuntimeError(f"{model} unavailable")
+        usage = types.SimpleNamespace(prompt_tokens=100, completion_tokens=20)
+        message = types.SimpleNamespace(content=f"answer from {model}")
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=usage)
+
+
+@pytest.fixture
+def completions(monkeypatch):
+    fake = FakeCompletions()
+
+    class FakeGroq:
+        def __init__(self, api_key=None, **options):
+            self.chat = types.SimpleNamespace(completions=fake)
+
+    monkeypatch.setitem(sys.modules, 'groq', types.SimpleNamespace(Groq=FakeGroq))
+    monkeypatch.setattr(Config, 'LLM_PROVIDER', 'groq')
+    monkeypatch.setattr(Config, 'LLM_MODEL', 'large-model')
+    monkeypatch.setattr(Config, 'LLM_FAST_MODEL', 'fast-model')
+    monkeypatch.setattr(Config, 'LLM_MAX_TOKENS', 1024)
+    monkeypatch.setattr(Config, 'LLM_FAST_MAX_TOKENS', 384)
+    monkeypatch.setattr(Config, 'LLM_FAST_MAX_CONTEXT_CHARS', 100)
+    monkeypatch.setattr(Config, 'LLM_ROUTING', 'agriculture_query:fast, comparison:large')
+    return fake
+
+
+def test_query_types_pick_their_route(completions):
+    handler = LLMHandler()
+    assert handler.route('agriculture_query').name == 'fast'
+    assert handler.route('comparison').name == 'large'
+    # Unlisted types and long contexts go to the large model
+    assert handler.route('policy').name == 'large'
+    assert handler.route('agriculture_query', context_chars=101).name == 'large'
+
+
+def test_unknown_route_in_the_table_is_rejected(completions):
+    handler = LLMHandler()
+    with pytest.raises(ValueError):
+        handler.parse_routing('agriculture_query:medium')
+
+
+def test_fast_route_uses_its_model_budget_and_instruction(completions):
+    handler = LLMHandler()
+    with trace('query', force_sample=True) as active:
+        answer = handler.generate_response('Rice in Punjab?', 'short context', query_type='agriculture_query')
+
+    assert answer == 'answer from fast-model'
+    [call] = completions.calls
+    assert call['max_tokens'] == 384
+    assert 'answer concisely' in call['prompt']
+    assert active.fields['llm_route'] == 'fast'
+
+    handler.generate_response('Compare rice in Punjab and Bihar', 'short context', query_type='comparison')
+    assert completions.calls[-1]['model'] == 'large-model'
+    assert completions.calls[-1]['max_tokens'] == 1024
+
+
+def test_failing_fast_model_falls_back_to_the_large_one(completions):
+    handler = LLMHandler()
+    completions.failing.add('fast-model')
+    before = metrics.get_counter('samarth_llm_requests_total', route='fast', model='fast-model', outcome='error')
+
+    with trace('query', force_sample=True) as active:
+        answer = handler.generate_response('Rice in Punjab?', 'ctx', query_type='agriculture_query')
+
+    assert answer == 'answer from large-model'
+    assert [call['model'] for call in completions.calls] == ['fast-model', 'large-model']
+    assert active.fields['llm_fallback'] == 'fast'
+    assert metrics.get_counter('samarth_llm_requests_total', route='fast', model='fast-model',
+                               outcome='error') == before + 1
+
+
+def test_large_model_failure_is_not_retried(completions):
+    handler = LLMHandler()
+    completions.failing.add('large-model')
+    with pytest.raises(RuntimeError):
+        handler.generate_response('Compare', 'ctx', query_type='comparison', raise_errors=True)
+    assert len(completions.calls) == 1
+
+
+def test_expired_deadline_skips_the_call(completions):
+    handler = LLMHandler()
+    with deadline(0.0):
+        with pytest.raises(DeadlineExceeded):
+            handler.generate_response('Rice in Punjab?', 'ctx', query_type='agriculture_query')
+    assert completions.calls == []
+
+
+def test_pipeline_routes_on_the_classified_query_type(pipeline, monkeypatch):
+    seen = []
+    generate = pipeline.llm_handler.generate_response
+    monkeypatch.setattr(pipeline.llm_handler, 'generate_response',
+                        lambda *args, **kwargs: seen.append(kwargs) or generate(*args, **kwargs))
+
+    pipeline.answer_query('Tell me about soyabean in Ludhiana', check_cache=False)
+    assert seen and seen[-1].get('query_type') == 'agriculture_query'
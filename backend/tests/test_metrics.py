@@ -0,0 +1,101 @@
+# backend/tests/test_metrics.py
+"""Counters, stage spans and Prometheus rendering in utils.metrics"""
+from config import Config
+from data_fetcher.cache_manager import CacheManager
+from utils.metrics import MetricsRegistry, metrics, span, timed, trace
+
+
+def test_counters_are_kept_per_label_set():
+    registry = MetricsRegistry()
+    registry.inc('requests_total', endpoint='/api/query', status=200)
+    registry.inc('requests_total', endpoint='/api/query', status=200)
+    registry.inc('requests_total', amount=3, endpoint='/api/health', status=200)
+
+    assert registry.get_counter('requests_total', endpoint='/api/query', status=200) == 2
+    assert registry.get_counter('requests_total', status=200, endpoint='/api/health') == 3
+    assert registry.get_counter('requests_total', endpoint='/api/other', status=200) == 0
+
+
+def test_prometheus_output_has_types_labels_and_cumulative_buckets():
+    registry = MetricsRegistry()
+    registry.describe('stage_seconds', 'Latency of pipeline stages')
+    registry.inc('hits_total', prefix='query')
+    registry.set_gauge('documents', 42)
+    registry.observe('stage_seconds', 0.003, stage='vector_search')
+    registry.observe('stage_seconds', 0.2, stage='vector_search')
+
+    lines = registry.render_prometheus().splitlines()
+    assert '# TYPE hits_total counter' in lines
+    assert 'hits_total{prefix="query"} 1' in lines
+    assert '# TYPE documents gauge' in lines
+    assert 'documents 42' in lines
+    assert '# HELP stage_seconds Latency of pipeline stages' in lines
+    assert '# TYPE stage_seconds histogram' in lines
+    assert 'stage_seconds_bucket{stage="vector_search",le="0.001"} 0' in lines
+    assert 'stage_seconds_bucket{stage="vector_search",le="0.005"} 1' in lines
+    assert 'stage_seconds_bucket{stage="vector_search",le="0.25"} 2' in lines
+    assert 'stage_seconds_bucket{stage="vector_search",le="+Inf"} 2' in lines
+    assert 'stage_seconds_count{stage="vector_search"} 2' in lines
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.inc('errors_total', message='say "hi"\nback\\slash')
+    assert 'errors_total{message="say \\"hi\\"\\nback\\\\slash"} 1' in registry.render_prometheus()
+
+
+def test_spans_are_recorded_in_the_active_trace(monkeypatch):
+    monkeypatch.setattr(Config, 'METRICS_SAMPLE_RATE', 1.0)
+
+    @timed('decorated')
+    def work():
+        return 'done'
+
+    with trace('request') as active:
+        with span('first'):
+            pass
+        assert work() == 'done'
+
+    assert [s['stage'] for s in active.spans] == ['first', 'decorated']
+    assert all(s['ms'] >= 0 for s in active.spans)
+    assert 'samarth_stage_seconds_count{stage="decorated"}' in metrics.render_prometheus()
+
+
+def test_unsampled_traces_record_no_spans(monkeypatch):
+    monkeypatch.setattr(Config, 'METRICS_SAMPLE_RATE', 0.0)
+    with trace('request') as active:
+        with span('skipped'):
+            pass
+    assert not active.sampled
+    assert active.spans == []
+
+    with trace('request', force_sample=True) as forced:
+        with span('kept'):
+            pass
+    assert [s['stage'] for s in forced.spans] == ['kept']
+
+
+def test_pipeline_stages_show_up_in_the_trace(pipeline, monkeypatch):
+    monkeypatch.setattr(Config, 'METRICS_SAMPLE_RATE', 1.0)
+    with trace('query') as active:
+        pipeline.answer_query('Rice production in Punjab', check_cache=False)
+
+    stages = [s['stage'] for s in active.spans]
+    assert {'intent_classify', 'vector_search', 'lexical_search', 'retrieve_context'} <= set(stages)
+    # Nested spans close first, so the outermost stage is recorded last
+    assert stages[-1] == 'answer_query'
+
+
+def test_cache_lookups_are_counted_as_hits_and_misses():
+    prefix = 'metrics_test'
+    before_hit = metrics.get_counter('samarth_cache_requests_total', prefix=prefix, result='hit')
+    before_miss = metrics.get_counter('samarth_cache_requests_total', prefix=prefix, result='miss')
+
+    cache = CacheManager(ttl=60)
+    cache.get(prefix, q='a')
+    cache.set(prefix, 'A', q='a')
+    cache.get(prefix, q='a')
+    cache.get(prefix, q='a')
+
+    assert metrics.get_counter('samarth_cache_requests_total', prefix=prefix, result='miss') == before_miss + 1
+    assert metrics.get_counter('samarth_cache_requests_total', prefix=prefix, result='hit') == before_hit + 2
@@ -0,0 +1,100 @@
+# backend/tests/test_query_log.py
+"""Capturing sampled queries and replaying them against a server"""
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+from benchmarks.replay import Replayer, load_queries, summarize
+from config import Config
+from utils.metrics import trace
+from utils.query_log import QueryLog
+
+
+def test_disabled_without_a_directory_or_sample_rate(tmp_path):
+    assert not QueryLog(directory='', sample_rate=1.0).sample()
+    assert not QueryLog(directory=str(tmp_path), sample_rate=0.0).sample()
+    assert QueryLog(directory=str(tmp_path), sample_rate=1.0).sample()
+
+
+def test_records_carry_trace_fields_and_summed_stages(monkeypatch):
+    monkeypatch.setattr(Config, 'METRICS_SAMPLE_RATE', 1.0)
+    with trace('query_request', cache='miss', llm_route='fast') as request_trace:
+        request_trace.spans.extend([{'stage': 'vector_search', 'ms': 1.5},
+                                    {'stage': 'vector_search', 'ms': 2.0},
+                                    {'stage': 'llm_generate', 'ms': 300.0}])
+
+    record = QueryLog.make_record(1700000000.12345, 'Rice in Punjab', 200, 0.4567, request_trace)
+    assert record == {'t': 1700000000.123, 'q': 'Rice in Punjab', 'ms': 456.7, 'st': 200,
+                      'c': 'miss', 'r': 'fast', 'sp': {'vector_search': 3.5, 'llm_generate': 300.0}}
+    assert QueryLog.make_record(1.0, 'q', 429, 0.001) == {'t': 1.0, 'q': 'q', 'ms': 1.0, 'st': 429}
+
+
+def test_written_logs_load_back_in_arrival_order(tmp_path):
+    log = QueryLog(directory=str(tmp_path / 'node1'), sample_rate=1.0)
+    log.write(30.0, 'third', 200, 0.1)
+    log.write(10.0, 'first', 200, 0.1)
+    # Another worker's file, plus a line cut off by a crash
+    other = tmp_path / 'node2'
+    other.mkdir()
+    (other / 'queries-1.jsonl').write_text('{"t": 20.0, "q": "second", "st": 503}\n{"t": 40.0, "q": "cut')
+
+    [written] = os.listdir(tmp_path / 'node1')
+    assert written == f"queries-{os.getpid()}.jsonl"
+    records = load_queries([str(tmp_path / 'node1'), str(other)])
+    assert [r['q'] for r in records] == ['first', 'second', 'third']
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """Answers every third query with a 429 so shedding shows up in the summary"""
+
+    received = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.received.append(body['query'])
+        if body['query'].startswith('shed'):
+            payload = json.dumps({'error': 'busy', 'reason': 'queue_full'}).encode()
+            self.send_response(429)
+            self.send_header('Retry-After', '1')
+        else:
+            payload = json.dumps({'answer': 'ok'}).encode()
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    QueryHandler.received = []
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), QueryHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_replay_keeps_the_schedule_and_counts_shed_requests(server):
+    records = [{'t': 100.0 + i * 0.2, 'q': f"{'shed' if i % 3 == 2 else 'query'} {i}", 'ms': 50.0}
+               for i in range(6)]
+    replayer = Replayer(server, concurrency=4, timeout=5.0)
+    seconds = replayer.run(records, speed=4.0)
+
+    assert sorted(QueryHandler.received) == sorted(r['q'] for r in records)
+    # One second of traffic replayed at 4x takes about a quarter of a second
+    assert 0.2 <= seconds < 2.0
+
+    summary = summarize(records, replayer.outcomes, seconds, speed=4.0)
+    assert summary['requests'] == 6
+    assert summary['statuses'] == {'200': 4, '429': 2}
+    assert summary['shed'] == {'queue_full': 2}
+    assert summary['error_rate'] == pytest.approx(2 / 6)
+    assert summary['offered_rps'] == pytest.approx(6 / 0.25)
+    assert summary['logged_p95_ms'] == pytest.approx(50.0)
@@ -0,0 +1,81 @@
+# backend/tests/test_record_lookup.py
+"""Composite-key lookups and the fast path that answers them"""
+import numpy as np
+import pytest
+from chatbot.record_lookup import RecordLookup
+from config import Config
+from data_fetcher.registry import DATASETS
+from embeddings.vector_store import VectorStore
+
+DOCUMENTS = [
+    ('Ludhiana rice 2005', {'type': 'crop_production', 'state': 'Punjab', 'district': 'Ludhiana',
+                            'crop': 'Rice', 'year': 2005, 'season': 'Kharif'}),
+    ('Ludhiana rice 2006', {'type': 'crop_production', 'state': 'Punjab', 'district': 'Ludhiana',
+                            'crop': 'Rice', 'year': 2006, 'season': ['Kharif', 'Rabi']}),
+    ('Patna rice 2005', {'type': 'crop_production', 'state': 'Bihar', 'district': 'Patna',
+                         'crop': 'Rice', 'year': 2005, 'season': 'Kharif'}),
+    ('Kerala 2000s', {'type': 'rainfall', 'subdivision': 'KERALA', 'decade': 2000,
+                      'year': list(range(2000, 2010))}),
+]
+
+
+@pytest.fixture(scope='module')
+def lookup(tmp_path_factory):
+    store = VectorStore(8, index_path=str(tmp_path_factory.mktemp('lookup')), compression='none')
+    vectors = np.eye(len(DOCUMENTS), 8, dtype='float32')
+    store.add_documents(vectors, [text for text, _ in DOCUMENTS], [meta for _, meta in DOCUMENTS])
+    return RecordLookup.build(store, DATASETS.lookup_keys())
+
+
+def texts(docs):
+    return [doc['document'] for doc in docs]
+
+
+def test_composite_key_match(lookup):
+    entities = {'district': ['Ludhiana'], 'crop': ['Rice'], 'year': [2005]}
+    assert texts(lookup.find(entities, ['crop_production'])) == ['Ludhiana rice 2005']
+
+
+@pytest.mark.parametrize('entities', [
+    {'district': ['Ludhiana'], 'crop': ['Rice']},
+    {'district': ['Ludhiana'], 'crop': ['Rice'], 'year': [2005, 2006]},
+])
+def test_key_must_be_fully_specified(lookup, entities):
+    assert lookup.find(entities, ['crop_production']) == []
+
+
+@pytest.mark.parametrize('extra', [{'state': ['Bihar']}, {'season': ['Rabi']}])
+def test_extra_filters_reject_key_hit(lookup, extra):
+    entities = dict({'district': ['Ludhiana'], 'crop': ['Rice'], 'year': [2005]}, **extra)
+    assert lookup.find(entities, ['crop_production']) == []
+
+
+def test_list_valued_metadata(lookup):
+    # A grouped crop document matches any of its seasons
+    entities = {'district': ['Ludhiana'], 'crop': ['Rice'], 'year': [2006], 'season': ['Rabi']}
+    assert texts(lookup.find(entities, ['crop_production'])) == ['Ludhiana rice 2006']
+    # A decade rainfall document is keyed under each of its years
+    assert texts(lookup.find({'subdivision': ['KERALA'], 'year': [2004]}, ['rainfall'])) == ['Kerala 2000s']
+
+
+def test_datasets_are_tried_in_order(lookup):
+    entities = {'subdivision': ['KERALA'], 'district': ['Patna'], 'crop': ['Rice'], 'year': [2005]}
+    assert texts(lookup.find(entities, ['rainfall', 'crop_production'])) == ['Kerala 2000s']
+    assert texts(lookup.find(entities, ['crop_production', 'rainfall'])) == ['Patna rice 2005']
+
+
+def lookup_answer(pipeline, query):
+    query_info = pipeline.query_processor.parse_query(query)
+    filters = pipeline.query_processor.build_filters(query_info)
+    return pipeline.lookup_answer(query, query_info, filters, DATASETS.for_query_type(query_info['query_type']))
+
+
+def test_lookup_answer_respects_retrieval_k(pipeline, monkeypatch):
+    query = "rice production in Ludhiana in 2005"
+    result = lookup_answer(pipeline, query)
+    assert result is not None
+    assert [source['metadata']['district'] for source in result['sources']] == ['Ludhiana']
+
+    # More matching records than a retrieval would return go to retrieval instead
+    monkeypatch.setattr(Config, 'RETRIEVAL_K', 0)
+    assert lookup_answer(pipeline, query) is None
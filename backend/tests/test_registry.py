@@ -0,0 +1,98 @@
+# backend/tests/test_registry.py
+"""Dataset specs, the registry, and one index shard per registered dataset"""
+import json
+import pytest
+
+from benchmarks.stubs import StaticDataClient
+from data_fetcher.data_processor import DataProcessor
+from data_fetcher.registry import DATASETS, DatasetRegistry, DatasetSpec
+from data_fetcher.schemas import ColumnSpec, DatasetSchema
+
+GROUNDWATER = DatasetSpec(
+    name='groundwater',
+    resource_id='groundwater-test',
+    schema=DatasetSchema(
+        name='groundwater',
+        columns=[ColumnSpec('state', 'State', 'category', normalize='title'),
+                 ColumnSpec('year', 'Year', 'int16'),
+                 ColumnSpec('depth_m', 'Depth', 'float32')],
+        required=['state', 'year']
+    ),
+    text_template="In {state}, the groundwater level was {depth_m:.1f} m below ground in {year}.",
+    metadata_fields=['state', 'year'],
+    source='data.gov.in - Central Ground Water Board',
+    filter_fields={'state': 'State', 'year': 'Year'},
+    aliases=('wells',),
+    query_types=('groundwater_query',)
+)
+
+
+class GroundwaterClient(StaticDataClient):
+    def fetch_dataset(self, name, **filters):
+        if name == 'groundwater':
+            return [{'State': 'PUNJAB', 'Year': str(year), 'Depth': str(20 + year % 10)}
+                    for year in range(2000, 2005)]
+        return super().fetch_dataset(name, **filters)
+
+
+def test_lookup_by_name_and_alias():
+    assert DATASETS.get('crop') is DATASETS.get('crop_production')
+    assert 'crop' in DATASETS and 'rainfall' in DATASETS
+    assert DATASETS.names() == ['crop_production', 'rainfall']
+    with pytest.raises(KeyError):
+        DATASETS.get('groundwater')
+
+
+def test_query_types_route_to_datasets():
+    assert DATASETS.for_query_type('agriculture_query') == ['crop_production']
+    assert DATASETS.for_query_type('climate_query') == ['rainfall']
+    assert DATASETS.for_query_type('comparison') == []
+
+
+def test_api_filters_translate_keyword_names():
+    spec = DATASETS.get('crop_production')
+    assert spec.api_filters(state='Punjab', crop='Rice', year=None) == {'State Name': 'Punjab', 'Crop': 'Rice'}
+    with pytest.raises(ValueError):
+        spec.api_filters(subdivision='KERALA')
+
+
+def test_registering_a_name_again_replaces_it():
+    registry = DatasetRegistry([GROUNDWATER])
+    replacement = DatasetSpec('groundwater', 'other-id', GROUNDWATER.schema, '{state}', ['state'], 'test')
+    registry.register(replacement)
+
+    assert len(registry) == 1
+    assert registry.get('groundwater').resource_id == 'other-id'
+    assert registry.resource_ids() == {'groundwater': 'other-id'}
+
+
+def test_documents_follow_the_spec():
+    spec = DATASETS.get('rainfall')
+    df = DataProcessor.clean_rainfall_data([{'SUBDIVISION': 'KERALA', 'YEAR': '2001', 'ANNUAL': '3000'}])
+    [doc] = spec.format_documents(df)
+
+    assert doc['text'].startswith('In KERALA, the annual rainfall was 3000.00 mm in year 2001.')
+    assert doc['metadata'] == {'type': 'rainfall', 'subdivision': 'KERALA', 'year': 2001,
+                               'source': spec.source}
+    json.dumps(doc['metadata'])
+
+
+def test_a_registered_dataset_is_indexed_into_its_own_shard(pipeline_factory, monkeypatch):
+    # Swap in copies so the new dataset does not leak into other tests
+    monkeypatch.setattr(DATASETS, '_specs', dict(DATASETS._specs))
+    monkeypatch.setattr(DATASETS, '_aliases', dict(DATASETS._aliases))
+    DATASETS.register(GROUNDWATER)
+
+    rag = pipeline_factory()
+    rag.data_client = GroundwaterClient(rag.data_client.crop_records, rag.data_client.rainfall_records)
+    rag.index_data()
+
+    shards = rag.vector_store.shards
+    assert set(shards) == {'crop_production', 'rainfall', 'groundwater'}
+    assert [m['type'] for m in shards['groundwater'].metadata] == ['groundwater'] * 5
+
+    # Re-indexing one dataset rebuilds its shard and shares the others
+    crop_shard = shards['crop_production']
+    rag.index_data(datasets=['wells'])
+    assert rag.vector_store.shards['crop_production'] is crop_shard
+    assert rag.vector_store.shards['groundwater'] is not shards['groundwater']
@@ -0,0 +1,159 @@
+# backend/tests/test_reranker.py
+"""Hybrid ranking: BM25, rank fusion, cross-encoder reranking and context selection"""
+import time
+import numpy as np
+import pytest
+from config import Config
+from embeddings.lexical_index import LexicalIndex
+from embeddings.reranker import Reranker, reciprocal_rank_fusion, select_diverse
+from utils.admission import deadline
+
+
+def doc(name, similarity, state):
+    return {'document': name, 'similarity': similarity, 'metadata': {'state': state}}
+
+
+def unit_rows(*rows):
+    vectors = np.array(rows, dtype='float32')
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def names(docs):
+    return [d['document'] for d in docs]
+
+
+# Four near-identical Punjab documents outrank two Haryana ones
+POOL = [doc('p1', 0.9, 'Punjab'), doc('p2', 0.89, 'Punjab'), doc('p3', 0.88, 'Punjab'),
+        doc('p4', 0.87, 'Punjab'), doc('h1', 0.6, 'Haryana'), doc('h2', 0.5, 'Haryana')]
+VECTORS = unit_rows([1, 0.01, 0], [1, 0.02, 0], [1, 0.03, 0], [1, 0.04, 0], [0, 1, 0], [0, 1, 0.2])
+
+
+def test_zero_diversity_is_relevance_order():
+    shuffled = [POOL[i] for i in (4, 0, 5, 2, 1, 3)]
+    picked = select_diverse(shuffled, VECTORS[[4, 0, 5, 2, 1, 3]], k=4, diversity=0.0)
+    assert names(picked) == ['p1', 'p2', 'p3', 'p4']
+
+
+def test_diversity_swaps_in_different_documents():
+    picked = select_diverse(POOL, VECTORS, k=2, diversity=0.5)
+    assert names(picked) == ['p1', 'h1']
+
+
+def test_quotas_give_each_entity_its_share():
+    picked = select_diverse(POOL, VECTORS, k=4, diversity=0.0, quotas={'state': ['Punjab', 'Haryana']})
+    assert sorted(names(picked)) == ['h1', 'h2', 'p1', 'p2']
+
+
+def test_quota_for_an_absent_entity_does_not_block_picks():
+    picked = select_diverse(POOL, VECTORS, k=3, diversity=0.0, quotas={'state': ['Punjab', 'Gujarat']})
+    assert names(picked) == ['p1', 'p2', 'p3']
+
+
+def test_empty_pool():
+    assert select_diverse([], np.zeros((0, 3), dtype='float32'), k=5) == []
+
+
+def test_all_duplicate_pool_picks_each_document_once():
+    pool = [doc(f"d{i}", 0.8, 'Punjab') for i in range(4)]
+    picked = select_diverse(pool, unit_rows(*[[1, 1, 0]] * 4), k=3, diversity=0.7)
+    assert len(picked) == 3
+    assert len(set(names(picked))) == 3
+    assert len(select_diverse(pool, unit_rows(*[[1, 1, 0]] * 4), k=10, diversity=0.7)) == 4
+
+
+CORPUS = [
+    "rice production in punjab",
+    "rice production in bihar rice",
+    "wheat production in punjab during rabi season with irrigation from canals",
+    "rainfall in kerala",
+]
+
+
+def test_bm25_ranks_by_matched_terms_rarity_and_length():
+    index = LexicalIndex()
+    index.build(CORPUS)
+    # Both terms beat either alone; the rare 'punjab' beats a repeated common 'rice'
+    assert [doc_id for doc_id, _ in index.search("rice punjab")] == [0, 1, 2]
+    # Same term frequency, so the shorter document scores higher
+    assert [doc_id for doc_id, _ in index.search("punjab")] == [0, 2]
+    assert index.search("monsoon") == []
+
+
+def test_bm25_score_matches_formula():
+    index = LexicalIndex(k1=1.5, b=0.75)
+    index.build(CORPUS)
+    lengths = [len(text.split()) for text in CORPUS]
+    n, df, tf = len(CORPUS), 2, 1
+    idf = np.log(1 + (n - df + 0.5) / (df + 0.5))
+    norm = 1.5 * (1 - 0.75 + 0.75 * lengths[0] / np.mean(lengths))
+    expected = idf * tf * 2.5 / (tf + norm)
+    assert dict(index.search("punjab"))[0] == pytest.approx(expected, rel=1e-5)
+
+
+def test_rrf_rewards_agreement_across_rankings():
+    fused = reciprocal_rank_fusion([[1, 2, 3], [3, 1, 4]], k=60)
+    assert [doc_id for doc_id, _ in fused] == [1, 3, 2, 4]
+    assert fused[0][1] == pytest.approx(1 / 61 + 1 / 62)
+
+
+def test_rrf_single_ranking_keeps_order():
+    assert [doc_id for doc_id, _ in reciprocal_rank_fusion([[5, 4, 9]])] == [5, 4, 9]
+
+
+class FakeCrossEncoder:
+    """Scores a pair by document length; each predict call takes `delay` seconds"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batches = 0
+
+    def predict(self, pairs):
+        self.batches += 1
+        time.sleep(self.delay)
+        return [len(document) for _, document in pairs]
+
+
+def candidates(count):
+    return [{'document': 'x' * (i + 1)} for i in range(count)]
+
+
+def reranker(model, budget_ms=1000):
+    reranker = Reranker(model_name='fake', budget_ms=budget_ms, batch_size=2)
+    reranker.model = model
+    return reranker
+
+
+def test_rerank_orders_by_cross_encoder_score():
+    ranked = reranker(FakeCrossEncoder()).rerank("q", candidates(5))
+    assert [len(doc['document']) for doc in ranked] == [5, 4, 3, 2, 1]
+
+
+def test_rerank_stops_before_a_batch_that_would_overrun():
+    model = FakeCrossEncoder(delay=0.03)
+    ranked = reranker(model, budget_ms=50).rerank("q", candidates(8))
+    # One batch takes 30 ms, so a second would end past the 50 ms budget
+    assert model.batches == 1
+    assert [len(doc['document']) for doc in ranked] == [2, 1, 3, 4, 5, 6, 7, 8]
+
+
+def test_rerank_skips_scoring_when_request_deadline_has_passed():
+    model = FakeCrossEncoder()
+    with deadline(0):
+        ranked = reranker(model).rerank("q", candidates(4))
+    assert model.batches == 0
+    assert [len(doc['document']) for doc in ranked] == [1, 2, 3, 4]
+
+
+def test_unloaded_model_leaves_order_unchanged():
+    assert Reranker(model_name='').load() is None
+    docs = candidates(3)
+    assert Reranker(model_name='fake').rerank("q", docs) == docs
+
+
+def test_pipeline_loads_rerank_model_at_startup(pipeline_factory, monkeypatch):
+    loads = []
+    monkeypatch.setattr(Config, 'RERANK_MODEL', 'fake')
+    monkeypatch.setattr(Reranker, 'load', lambda self: loads.append(self.model_name))
+    rag = pipeline_factory()
+    assert loads == ['fake']
+    assert 'rerank_model' in rag.startup_timings
@@ -0,0 +1,84 @@
+# backend/tests/test_schemas.py
+"""Typed, schema-driven cleaning of raw data.gov.in records"""
+import json
+import numpy as np
+import pandas as pd
+
+from data_fetcher.data_processor import DataProcessor
+from data_fetcher.schemas import CROP_SCHEMA, RAINFALL_SCHEMA
+from conftest import crop_record, rainfall_record
+
+
+def test_crop_columns_are_typed_and_normalised():
+    df = DataProcessor.clean_crop_data([
+        crop_record('  PUNJAB ', 'LUDHIANA', 'rice', 2001, 1200),
+        crop_record('Punjab', 'Ludhiana', 'Rice', 2002, 1300),
+    ])
+
+    assert isinstance(df['state'].dtype, pd.CategoricalDtype)
+    assert isinstance(df['crop'].dtype, pd.CategoricalDtype)
+    assert df['year'].dtype == np.int16
+    assert df['production_tonnes'].dtype == np.float32
+    # Different raw spellings collapse into one category
+    assert list(df['state'].cat.categories) == ['Punjab']
+    assert list(df['district'].cat.categories) == ['Ludhiana']
+    assert list(df['season']) == ['Kharif', 'Kharif']
+    assert np.allclose(df['yield_tonnes_per_hectare'], [1.2, 1.3])
+
+
+def test_missing_markers_become_nan_and_required_fields_drop_rows():
+    records = [
+        crop_record('Punjab', 'LUDHIANA', 'Rice', 2001, 1200),
+        dict(crop_record('Punjab', 'LUDHIANA', 'Rice', 2002, 0), production_='NA'),
+        dict(crop_record('Punjab', 'LUDHIANA', 'Rice', 2003, 0), production_='nan'),
+        dict(crop_record('Nan', 'LUDHIANA', 'Rice', 2004, 100)),
+        dict(crop_record('Punjab', 'LUDHIANA', 'Rice', 2005, 100), crop_year='NA'),
+        dict(crop_record('Punjab', 'LUDHIANA', 'Rice', 2006, 100), area_='0'),
+    ]
+    df = DataProcessor.clean_crop_data(records)
+
+    # Rows without a state or year are dropped; missing measures stay as NaN
+    assert df['year'].tolist() == [2001, 2002, 2003, 2006]
+    assert df['production_tonnes'].isna().tolist() == [False, True, True, False]
+    assert 'Nan' not in df['state'].cat.categories
+    # Zero area gives a missing yield rather than infinity
+    assert np.isnan(df['yield_tonnes_per_hectare'].iloc[-1])
+
+
+def test_rainfall_columns_are_typed():
+    df = DataProcessor.clean_rainfall_data([rainfall_record('KERALA', 2001, 3000.0),
+                                            dict(rainfall_record('KERALA', 2002, 2900.0), JAN='NA')])
+
+    assert list(df['subdivision'].cat.categories) == ['KERALA']
+    assert df['year'].dtype == np.int16
+    assert df['annual'].dtype == np.float32
+    assert df['annual'].tolist() == [3000.0, 2900.0]
+    assert df['jan'].isna().tolist() == [False, True]
+
+
+def test_parse_pages_unions_categories():
+    pages = [
+        [crop_record('Punjab', 'LUDHIANA', 'Rice', 2001, 100)],
+        [],
+        [crop_record('Bihar', 'PATNA', 'Wheat', 2002, 200)],
+    ]
+    df = CROP_SCHEMA.parse_pages(pages)
+
+    assert len(df) == 2
+    assert isinstance(df['state'].dtype, pd.CategoricalDtype)
+    assert set(df['state'].cat.categories) == {'Punjab', 'Bihar'}
+    assert df['state'].tolist() == ['Punjab', 'Bihar']
+    assert df['year'].tolist() == [2001, 2002]
+
+
+def test_empty_input_gives_an_empty_frame():
+    assert DataProcessor.clean_crop_data([]).empty
+    assert RAINFALL_SCHEMA.parse_pages([[], []]).empty
+
+
+def test_embedding_metadata_is_json_serialisable(crop_records):
+    df = DataProcessor.clean_crop_data(crop_records)
+    docs = DataProcessor.format_for_embedding(df, 'crop')
+
+    assert docs
+    json.dumps([doc['metadata'] for doc in docs])
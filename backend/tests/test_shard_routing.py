@@ -0,0 +1,110 @@
+# backend/tests/test_shard_routing.py
+"""Routing queries to shards, global document ids and parallel fan-out"""
+import numpy as np
+import pytest
+from config import Config
+from embeddings.vector_store import VectorStore
+
+DIM = 16
+STATES = ['Punjab', 'Bihar', 'Kerala']
+
+
+def random_vectors(count, seed):
+    vectors = np.random.default_rng(seed).standard_normal((count, DIM)).astype('float32')
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def fill(store, count=300):
+    metadata = [{'type': 'crop_production', 'state': STATES[i % 3]} for i in range(count)]
+    metadata += [{'type': 'rainfall', 'subdivision': 'KERALA'} for _ in range(count)]
+    texts = [f"doc {i}" for i in range(2 * count)]
+    vectors = random_vectors(2 * count, 1)
+    ids = store.add_documents(vectors, texts, metadata)
+    return ids, vectors, texts
+
+
+@pytest.fixture
+def store(tmp_path):
+    return VectorStore(DIM, index_path=str(tmp_path / 'store'), compression='none')
+
+
+@pytest.fixture
+def state_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'SHARD_BY_STATE', True)
+    return VectorStore(DIM, index_path=str(tmp_path / 'state_store'), compression='none')
+
+
+def test_documents_go_to_their_dataset_shard(store):
+    fill(store)
+    assert set(store.shards) == {'crop_production', 'rainfall'}
+    assert store.route(datasets=['rainfall']) == ['rainfall']
+    assert store.route() is None
+    # A route that matches nothing falls back to every shard
+    assert store.route(datasets=['groundwater']) is None
+
+
+def test_state_partitioned_shards_narrow_by_state(state_store):
+    fill(state_store)
+    assert set(state_store.shards) == {'crop_production@Punjab', 'crop_production@Bihar',
+                                       'crop_production@Kerala', 'rainfall'}
+    assert sorted(state_store.route(datasets=['crop_production'], states=['Punjab', 'Kerala'])) == \
+        ['crop_production@Kerala', 'crop_production@Punjab']
+    # Shards without a state are never excluded by the state filter
+    assert sorted(state_store.route(states=['Bihar'])) == ['crop_production@Bihar', 'rainfall']
+
+    results = state_store.search(random_vectors(1, 2)[0], k=10,
+                                 shards=state_store.route(states=['Bihar'], datasets=['crop_production']))
+    assert len(results) == 10
+    assert {r['metadata']['state'] for r in results} == {'Bihar'}
+
+
+def test_ids_round_trip_across_shards(state_store):
+    ids, vectors, texts = fill(state_store)
+    assert len(set(ids)) == len(ids)
+    for i in (0, 1, 2, 299, 300, 599):
+        document = state_store.get_document(ids[i])
+        assert document['document'] == texts[i]
+        assert document['id'] == ids[i]
+    np.testing.assert_allclose(state_store.get_vectors([ids[5], ids[400]]), vectors[[5, 400]], atol=1e-6)
+
+
+def test_merged_results_match_a_single_index(store):
+    ids, vectors, texts = fill(store)
+    query = random_vectors(1, 3)[0]
+
+    results = store.search(query, k=20)
+    expected = np.argsort(-(vectors @ query))[:20]
+    assert [r['document'] for r in results] == [texts[i] for i in expected]
+    distances = [r['distance'] for r in results]
+    assert distances == sorted(distances)
+
+
+def test_parallel_fan_out_matches_sequential(store, monkeypatch):
+    fill(store)
+    queries = random_vectors(4, 5)
+    sequential = store.search_batch(queries, k=10)
+
+    monkeypatch.setattr(VectorStore, 'PARALLEL_SEARCH_MIN_DOCS', 0)
+    monkeypatch.setattr(Config, 'SEARCH_WORKERS', 4)
+    pool = VectorStore._pool()
+    calls = []
+    pool_map = pool.map
+    monkeypatch.setattr(pool, 'map', lambda *args, **kwargs: calls.append(args) or pool_map(*args, **kwargs))
+
+    parallel = store.search_batch(queries, k=10)
+    assert calls
+    assert [[r['id'] for r in rows] for rows in parallel] == [[r['id'] for r in rows] for rows in sequential]
+
+
+def test_rebuilding_a_dataset_replaces_all_of_its_shards(state_store):
+    fill(state_store)
+    replacement = state_store.new_shard('crop_production')
+    replacement.add_documents(random_vectors(5, 6), [f"new {i}" for i in range(5)],
+                              [{'type': 'crop_production'}] * 5)
+
+    rebuilt = state_store.with_shards({'crop_production': replacement}, replace_datasets=['crop_production'])
+    assert set(rebuilt.shards) == {'crop_production', 'rainfall'}
+    assert rebuilt.shards['rainfall'] is state_store.shards['rainfall']
+    # The old store keeps serving until the new one is swapped in
+    assert len(state_store.shards) == 4
+    assert len(rebuilt.search(random_vectors(1, 7)[0], k=50, shards=['crop_production'])) == 5
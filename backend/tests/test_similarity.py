@@ -0,0 +1,84 @@
+# backend/tests/test_similarity.py
+"""Cosine scores from the inner-product index and the relevance cut-off"""
+import json
+import os
+import numpy as np
+import pytest
+from config import Config
+from embeddings.reranker import select_by_relevance
+from embeddings.vector_store import IndexShard, VectorStore
+
+DIM = 8
+
+
+def unit(*values):
+    vector = np.zeros(DIM, dtype='float32')
+    vector[:len(values)] = values
+    return vector / np.linalg.norm(vector)
+
+
+def docs(*similarities):
+    return [{'id': i, 'similarity': s} for i, s in enumerate(similarities)]
+
+
+def test_similarity_is_cosine_whatever_the_vector_length(tmp_path):
+    store = VectorStore(DIM, index_path=str(tmp_path / 'store'), compression='none')
+    # Unnormalised inputs: only the direction should matter
+    store.add_documents(np.stack([10 * unit(1, 0), 0.1 * unit(1, 1), 3 * unit(0, 1)]),
+                        ['east', 'north-east', 'north'], [{'type': 'test'}] * 3)
+
+    results = store.search(5 * unit(1, 0), k=3)
+    assert [r['document'] for r in results] == ['east', 'north-east', 'north']
+    assert [round(r['similarity'], 4) for r in results] == [1.0, round(np.sqrt(0.5), 4), 0.0]
+    assert all(abs(r['distance'] - (1 - r['similarity'])) < 1e-6 for r in results)
+
+
+def test_l2_shards_are_migrated_on_load(tmp_path):
+    path = str(tmp_path / 'store')
+    legacy = IndexShard(DIM, f"{path}/shards/test", metric='l2', compression='none')
+    legacy.add_documents(np.stack([2 * unit(1, 0), unit(0, 1)]), ['east', 'north'], [{'type': 'test'}] * 2)
+    VectorStore(DIM, index_path=path).with_shards({'test': legacy}).save()
+
+    store = VectorStore(DIM, index_path=path)
+    assert store.load()
+    assert store.shards['test'].metric == 'ip'
+    [top] = store.search(unit(1, 0), k=1)
+    assert top['document'] == 'east'
+    assert top['similarity'] == pytest.approx(1.0, abs=1e-5)
+
+    # The converted shard was written back, so the next load needs no migration
+    with open(os.path.join(path, VectorStore.MANIFEST)) as f:
+        assert json.load(f)['shards']['test']['metric'] == 'ip'
+    reloaded = IndexShard(DIM, f"{path}/shards/test", compression='none')
+    reloaded.load()
+    assert reloaded.metric == 'ip'
+
+
+def test_documents_below_the_floor_are_dropped():
+    kept = select_by_relevance(docs(0.9, 0.5, 0.15), k=5, min_similarity=0.2, cliff=1.0, min_docs=1)
+    assert [d['id'] for d in kept] == [0, 1]
+    assert select_by_relevance(docs(0.1, 0.05), k=5, min_similarity=0.2) == []
+
+
+def test_list_is_cut_at_the_first_cliff():
+    ranked = docs(0.82, 0.80, 0.45, 0.44)
+    assert [d['id'] for d in select_by_relevance(ranked, k=5, min_similarity=0.2, cliff=0.1, min_docs=1)] == [0, 1]
+    # min_docs keeps documents past a cliff
+    assert [d['id'] for d in select_by_relevance(ranked, k=5, min_similarity=0.2, cliff=0.1, min_docs=3)] == [0, 1, 2, 3]
+    assert [d['id'] for d in select_by_relevance(ranked, k=3, min_similarity=0.2, cliff=1.0, min_docs=1)] == [0, 1, 2]
+
+
+def test_incoming_order_is_kept():
+    # A cross-encoder may reorder documents away from their similarity order
+    ranked = [{'id': 'a', 'similarity': 0.5}, {'id': 'b', 'similarity': 0.9}, {'id': 'c', 'similarity': 0.1}]
+    assert [d['id'] for d in select_by_relevance(ranked, k=5, min_similarity=0.2, cliff=1.0)] == ['a', 'b']
+
+
+def test_retrieval_keeps_only_relevant_documents(pipeline, monkeypatch):
+    monkeypatch.setattr(Config, 'DIVERSITY', 0.0)
+    monkeypatch.setattr(Config, 'RELEVANCE_CLIFF', 1.0)
+    loose = pipeline.retrieve_context('Rice production in Punjab LUDHIANA', k=8)
+    assert len(loose) == 8
+
+    monkeypatch.setattr(Config, 'MIN_SIMILARITY', 0.99)
+    assert pipeline.retrieve_context('Rice production in Punjab LUDHIANA', k=8) == []
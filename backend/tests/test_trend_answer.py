@@ -0,0 +1,53 @@
+# backend/tests/test_trend_answer.py
+"""Routing of trend questions between the trend engine and retrieval"""
+import pytest
+
+
+def trend(pipeline, query):
+    query_info = pipeline.query_processor.parse_query(query)
+    query_info['query_type'] = 'trend_analysis'
+    return pipeline.trend_answer(query, query_info)
+
+
+def test_named_state_is_reported(pipeline):
+    result = trend(pipeline, "rice production trend in Punjab")
+    assert result is not None
+    assert "Punjab" in result['answer']
+    assert "Bihar" not in result['answer']
+
+
+def test_unnamed_query_ranks_entities_in_asked_direction(pipeline):
+    result = trend(pipeline, "which states saw declining rice production")
+    assert result is not None
+    assert "Bihar" in result['answer']
+    assert "Punjab" not in result['answer']
+
+
+@pytest.mark.parametrize('query', [
+    "rice production trend in Ludhiana",
+    "rainfall trend in Rajasthan over the last decade",
+])
+def test_place_the_engine_does_not_group_by_falls_back(pipeline, query):
+    assert trend(pipeline, query) is None
+
+
+def test_entity_missing_from_engine_falls_back(pipeline):
+    # Gujarat has no rows, so its name must not be dropped in favour of a ranking
+    assert trend(pipeline, "rice production trend in Gujarat") is None
+
+
+def test_sparse_entity_is_not_given_a_trend(pipeline):
+    assert trend(pipeline, "rice production trend in Kerala") is None
+
+    result = trend(pipeline, "rice production trend in Punjab and Kerala")
+    assert result is not None
+    assert "Punjab: " in result['answer']
+    assert "Not enough" in result['answer'] and "Kerala" in result['answer']
+    assert "nan" not in result['answer']
+
+
+def test_trend_cache_is_bounded(pipeline):
+    engine = pipeline.trend_engine
+    for end in range(2002, 2002 + engine._cache.maxsize + 10):
+        engine.trends('production', crop='Rice', start=2000, end=end)
+    assert len(engine._cache) <= engine._cache.maxsize
@@ -0,0 +1,71 @@
+# backend/tests/test_vector_store.py
+"""Dense search over sharded, segmented vector stores"""
+import numpy as np
+import pytest
+from embeddings.vector_store import VectorStore
+
+DIM = 16
+
+
+def random_vectors(count, seed):
+    vectors = np.random.default_rng(seed).standard_normal((count, DIM)).astype('float32')
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def documents(count, start=0):
+    # One document in 500 is from the rare district; every tenth is grouped over seasons
+    metadata = []
+    for i in range(start, start + count):
+        meta = {'type': 'crop_production', 'district': 'Rare' if i % 500 == 7 else 'Common', 'year': 2000 + i % 10}
+        if i % 10 == 3:
+            meta['season'] = ['Kharif', 'Rabi']
+        metadata.append(meta)
+    return [f"doc {i}" for i in range(start, start + count)], metadata
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = VectorStore(DIM, index_path=str(tmp_path / 'store'), compression='none')
+    # Two appends leave two segments in the shard
+    for start, seed in ((0, 1), (2000, 2)):
+        texts, metadata = documents(2000, start)
+        store.add_documents(random_vectors(2000, seed), texts, metadata)
+    return store
+
+
+def brute_force(store, query, k, filters):
+    ids, metadata = zip(*store.metadata_items())
+    order = np.argsort(-(store.get_vectors(list(ids)) @ query))
+    return [ids[i] for i in order if store.matches_filters(metadata[i], filters)][:k]
+
+
+@pytest.mark.parametrize('filters', [
+    {'district': ['Rare']},
+    {'district': ['Rare'], 'year': [2007]},
+    {'season': ['Rabi'], 'year': [2003, 2005]},
+])
+def test_filtered_search_finds_every_match(store, filters):
+    query = random_vectors(1, 3)[0]
+    results = store.search(query, k=8, filters=filters)
+    assert [result['id'] for result in results] == brute_force(store, query, 8, filters)
+    assert all(store.matches_filters(result['metadata'], filters) for result in results)
+
+
+def test_rare_matches_are_not_crowded_out(store):
+    # 8 of 4000 documents match; the old over-fetch of 100 candidates missed most of them
+    results = store.search(random_vectors(1, 4)[0], k=20, filters={'district': ['Rare']})
+    assert len(results) == 8
+
+
+def test_documents_without_the_field_are_unconstrained(store):
+    results = store.search(random_vectors(1, 5)[0], k=50, filters={'season': ['Kharif']})
+    assert len(results) == 50
+    assert any('season' not in result['metadata'] for result in results)
+
+
+def test_batch_mixes_filtered_and_unfiltered_queries(store):
+    queries = random_vectors(3, 6)
+    filters = [None, {'district': ['Rare']}, {'district': ['Missing']}]
+    batch = store.search_batch(queries, k=5, filters=filters)
+    assert [len(results) for results in batch] == [5, 5, 0]
+    assert [result['id'] for result in batch[0]] == [result['id'] for result in store.search(queries[0], k=5)]
@@ -0,0 +1,223 @@
+# backend/utils/admission.py
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+from utils.metrics import metrics
+
+metrics.describe('samarth_shed_requests_total', 'Requests rejected or cut short under load, by reason')
+metrics.describe('samarth_queries_inflight', 'Queries holding a concurrency slot')
+metrics.describe('samarth_queries_queued', 'Queries waiting for a concurrency slot')
+
+
+class DeadlineExceeded(Exception):
+    """The request ran out of time before a stage could start or finish"""
+
+    def __init__(self, stage: str):
+        super().__init__(f"Deadline exceeded before {stage}")
+        self.stage = stage
+
+
+class Overloaded(Exception):
+    """The request was shed by a concurrency limiter"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Server overloaded ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Deadline:
+    """Absolute point in time by which a request must be answered"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self, stage: str):
+        """Raise DeadlineExceeded if no time is left to start stage"""
+        if self.expired:
+            raise DeadlineExceeded(stage)
+
+
+_local = threading.local()
+
+
+def current_deadline() -> Optional[Deadline]:
+    return getattr(_local, 'deadline', None)
+
+
+def remaining_time(default: float = None) -> Optional[float]:
+    """Seconds left on the active deadline, or default when none is set"""
+    active = current_deadline()
+    return active.remaining() if active is not None else default
+
+
+def check_deadline(stage: str):
+    """Raise DeadlineExceeded if the active deadline, if any, has passed"""
+    active = current_deadline()
+    if active is not None:
+        active.check(stage)
+
+
+@contextmanager
+def deadline(seconds: float):
+    """
+    Set the deadline for the work done on this thread
+
+    Stages read it with current_deadline() instead of taking a timeout
+    argument, the same way spans find the active trace. A nested deadline
+    never extends an outer one.
+    """
+    parent = current_deadline()
+    current = Deadline(seconds)
+    if parent is not None and parent.expires_at < current.expires_at:
+        current = parent
+    _local.deadline = current
+    try:
+        yield current
+    finally:
+        _local.deadline = parent
+
+
+class RateLimiter:
+    """Token bucket pacing background work, e.g. warm-up LLM calls"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initialize rate limiter
+
+        Args:
+            rate: Permits per second
+            burst: Permits that may be taken back to back
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, stop: threading.Event = None) -> bool:
+        """
+        Block until a permit is available
+
+        Args:
+            stop: Event that abandons the wait when set
+
+        Returns:
+            True once a permit was taken, False if stop was set first
+        """
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return True
+                wait = (1.0 - self.tokens) / self.rate
+            if stop is not None:
+                if stop.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+
+class ConcurrencyLimiter:
+    """Bounded number of concurrent requests with a short, bounded wait queue"""
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float,
+                 name: str = 'query'):
+        """
+        Initialize limiter
+
+        Args:
+            max_concurrent: Requests allowed to run at once
+            max_queue: Requests allowed to wait for a slot; more are rejected at once
+            queue_timeout: Longest wait for a slot in seconds
+            name: Label for metrics
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.name = name
+        self.active = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+        # Smoothed service time, used to suggest a Retry-After
+        self._service_seconds = 1.0
+
+    def retry_after(self) -> int:
+        """Seconds a shed client should wait: roughly one queue's worth of work"""
+        backlog = (self.waiting + 1) / max(1, self.max_concurrent)
+        return max(1, math.ceil(backlog * self._service_seconds))
+
+    def _publish(self):
+        metrics.set_gauge('samarth_queries_inflight', self.active, limiter=self.name)
+        metrics.set_gauge('samarth_queries_queued', self.waiting, limiter=self.name)
+
+    def acquire(self, timeout: float = None):
+        """
+        Take a slot, waiting up to timeout (and the queue timeout) in the queue
+
+        Raises:
+            Overloaded: The queue is full, or no slot freed up in time
+        """
+        wait = self.queue_timeout if timeout is None else min(timeout, self.queue_timeout)
+        with self._condition:
+            if self.active < self.max_concurrent and not self.waiting:
+                self.active += 1
+                self._publish()
+                return
+            if self.waiting >= self.max_queue:
+                metrics.inc('samarth_shed_requests_total', reason='queue_full', limiter=self.name)
+                raise Overloaded('queue_full', self.retry_after())
+
+            self.waiting += 1
+            self._publish()
+            try:
+                acquired = self._condition.wait_for(lambda: self.active < self.max_concurrent, wait)
+            finally:
+                self.waiting -= 1
+            if not acquired:
+                self._publish()
+                metrics.inc('samarth_shed_requests_total', reason='queue_timeout', limiter=self.name)
+                raise Overloaded('queue_timeout', self.retry_after())
+            self.active += 1
+            self._publish()
+
+    def release(self, service_seconds: float = None):
+        with self._condition:
+            self.active -= 1
+            if service_seconds is not None:
+                self._service_seconds = 0.8 * self._service_seconds + 0.2 * service_seconds
+            self._publish()
+            self._condition.notify()
+
+    @contextmanager
+    def slot(self, timeout: float = None):
+        """Hold a slot for the duration of the block; see acquire"""
+        self.acquire(timeout)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - start)
+
+    def get_stats(self) -> dict:
+        return {
+            'active': self.active,
+            'waiting': self.waiting,
+            'max_concurrent': self.max_concurrent,
+            'max_queue': self.max_queue
+        }
@@ -1,8 +1,15 @@
 # backend/utils/helpers.py
 import json
+import os
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Any, Dict
 
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
 def format_timestamp() -> str:
     """Get current timestamp in ISO format"""
     return datetime.now().isoformat()
@@ -26,4 +33,26 @@ def extract_year_range(query: str) -> tuple:
         return (int(years[0]), int(years[-1]))
     elif len(years) == 1:
         return (int(years[0]), int(years[0]))
-    return (None, None)
\ No newline at end of file
+    return (None, None)
+
+@contextmanager
+def file_lock(path: str):
+    """
+    Hold an exclusive lock on path across processes, e.g. gunicorn workers
+
+    Blocks until the lock is free. Without fcntl (Windows) nothing is locked.
+
+    Args:
+        path: Lock file, created if missing
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
\ No newline at end of file
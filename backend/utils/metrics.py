@@ -0,0 +1,211 @@
+# backend/utils/metrics.py
+import bisect
+import functools
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+from config import Config
+
+logger = logging.getLogger("samarth.metrics")
+
+# Latency buckets in seconds, from sub-millisecond lookups to slow LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Tuple[str, str] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Process-wide counters, gauges and histograms with Prometheus text output"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._help = {}
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def inc(self, name: str, amount: float = 1.0, **labels):
+        """Increment a counter"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """Set a gauge to an absolute value"""
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = float(value)
+
+    def observe(self, name: str, value: float, **labels):
+        """Record one observation in a histogram"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def get_counter(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0.0)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def render_prometheus(self) -> str:
+        """Render all series in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for kind, store in (('counter', self._counters), ('gauge', self._gauges)):
+                for name in sorted(store):
+                    if name in self._help:
+                        lines.append(f"# HELP {name} {self._help[name]}")
+                    lines.append(f"# TYPE {name} {kind}")
+                    for key, value in sorted(store[name].items()):
+                        lines.append(f"{name}{_format_labels(key)} {value:g}")
+
+            for name in sorted(self._histograms):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', f'{bound:g}'))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {histogram.sum:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+metrics.describe('samarth_stage_seconds', 'Latency of pipeline stages')
+metrics.describe('samarth_http_request_seconds', 'Latency of HTTP requests by endpoint')
+metrics.describe('samarth_http_requests_total', 'HTTP requests by endpoint and status')
+metrics.describe('samarth_cache_requests_total', 'Cache lookups by prefix and result')
+metrics.describe('samarth_vector_index_bytes', 'Memory held by encoded vectors across shards')
+
+_local = threading.local()
+
+
+class Trace:
+    """Stage spans collected for one sampled request"""
+
+    def __init__(self, name: str, sampled: bool):
+        self.name = name
+        self.sampled = sampled
+        self.spans: List[Dict] = []
+        self.fields: Dict = {}
+        self.start = time.perf_counter()
+
+    def annotate(self, **fields):
+        """Attach extra fields to the structured log line"""
+        self.fields.update(fields)
+
+
+def _sample() -> bool:
+    rate = Config.METRICS_SAMPLE_RATE
+    return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+
+def current_trace() -> Optional[Trace]:
+    return getattr(_local, 'trace', None)
+
+
+@contextmanager
+def trace(name: str, force_sample: bool = False, **fields):
+    """
+    Collect spans for one request and emit them as a structured log line
+
+    Whether the request is sampled is decided once here; spans inside an
+    unsampled trace cost a single attribute lookup. force_sample times the
+    request regardless of the sample rate, for callers that need its spans.
+    """
+    parent = current_trace()
+    current = Trace(name, force_sample or _sample())
+    current.annotate(**fields)
+    _local.trace = current
+    try:
+        yield current
+    finally:
+        _local.trace = parent
+        if current.sampled:
+            total = time.perf_counter() - current.start
+            metrics.observe('samarth_stage_seconds', total, stage=name)
+            logger.info(json.dumps({
+                'event': name,
+                'duration_ms': round(total * 1000, 3),
+                'spans': current.spans,
+                **current.fields
+            }, default=str))
+
+
+@contextmanager
+def span(stage: str):
+    """Time a pipeline stage into samarth_stage_seconds and the active trace"""
+    active = current_trace()
+    sampled = active.sampled if active is not None else _sample()
+    if not sampled:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.observe('samarth_stage_seconds', elapsed, stage=stage)
+        if active is not None:
+            active.spans.append({'stage': stage, 'ms': round(elapsed * 1000, 3)})
+
+
+def timed(stage: str):
+    """Decorator form of span()"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
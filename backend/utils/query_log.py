@@ -0,0 +1,103 @@
+# backend/utils/query_log.py
+"""
+Sampled, rotating log of /api/query requests for load replay
+
+One compact JSON object per line:
+    t   wall-clock time the request arrived (epoch seconds)
+    q   query text
+    ms  total request time in milliseconds
+    st  HTTP status
+    c   cache outcome: 'hit', 'miss' or absent when the request never got that far
+    p   answer path ('lookup', 'trend') when not plain retrieval
+    r   LLM route ('fast', 'large') when the LLM was called
+    sh  shed reason ('queue_full', 'queue_timeout', 'deadline')
+    sp  stage timings, {stage: ms}
+
+Each process writes its own file (queries-<pid>.jsonl) so gunicorn workers
+never interleave lines; benchmarks/replay.py merges them by time.
+"""
+import json
+import logging
+import os
+import random
+from logging.handlers import RotatingFileHandler
+from typing import Dict, Optional
+from config import Config
+from utils.metrics import Trace
+
+
+class QueryLog:
+    """Appends sampled query records to a size-rotated file"""
+
+    def __init__(self, directory: str = None, sample_rate: float = None):
+        """
+        Initialize query log
+
+        Args:
+            directory: Log directory; empty disables logging
+            sample_rate: Fraction of queries recorded
+        """
+        self.directory = Config.QUERY_LOG_PATH if directory is None else directory
+        self.sample_rate = Config.QUERY_LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+        self._logger = None
+        self._pid = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory) and self.sample_rate > 0.0
+
+    def sample(self) -> bool:
+        """Decide once per request whether it is recorded"""
+        return self.enabled and (self.sample_rate >= 1.0 or random.random() < self.sample_rate)
+
+    def _get_logger(self) -> logging.Logger:
+        # Opened lazily and per pid: a file opened in the preloading master
+        # would be shared by every forked worker
+        pid = os.getpid()
+        if self._logger is None or self._pid != pid:
+            os.makedirs(self.directory, exist_ok=True)
+            handler = RotatingFileHandler(os.path.join(self.directory, f"queries-{pid}.jsonl"),
+                                          maxBytes=Config.QUERY_LOG_MAX_BYTES,
+                                          backupCount=Config.QUERY_LOG_BACKUPS,
+                                          encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger = logging.getLogger(f"samarth.query_log.{pid}")
+            logger.handlers = [handler]
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            self._logger, self._pid = logger, pid
+        return self._logger
+
+    @staticmethod
+    def make_record(arrived_at: float, query: str, status: int, seconds: float,
+                    request_trace: Optional[Trace] = None) -> Dict:
+        record = {'t': round(arrived_at, 3), 'q': query, 'ms': round(seconds * 1000, 2), 'st': status}
+        if request_trace is not None:
+            fields = request_trace.fields
+            for key, field in (('c', 'cache'), ('p', 'path'), ('r', 'llm_route'), ('sh', 'shed')):
+                if field in fields:
+                    record[key] = fields[field]
+            if request_trace.spans:
+                stages = {}
+                for s in request_trace.spans:
+                    stages[s['stage']] = round(stages.get(s['stage'], 0.0) + s['ms'], 2)
+                record['sp'] = stages
+        return record
+
+    def write(self, arrived_at: float, query: str, status: int, seconds: float,
+              request_trace: Optional[Trace] = None):
+        """
+        Append one request
+
+        Args:
+            arrived_at: time.time() when the request arrived
+            query: Query text
+            status: HTTP status returned
+            seconds: Total request time
+            request_trace: Trace holding the stage spans and annotations
+        """
+        try:
+            record = self.make_record(arrived_at, query, status, seconds, request_trace)
+            self._get_logger().info(json.dumps(record, separators=(',', ':'), ensure_ascii=False))
+        except Exception as e:
+            print(f"Error writing query log: {e}")